@@ -1,20 +1,84 @@
+import asyncio
+
+from decouple import config
 from fastapi import FastAPI
 from sqladmin import Admin
 from sqladmin import ModelView
+from sqlalchemy import literal_column, select
+from sqlalchemy.orm import load_only, selectinload
 from db.models.input import ProductInput
 from db.models.raw_data import PriceRaw
 from db.models.transformed import PriceStandardized
 from db.models.metadata import Source, Product, Location, Unit, Currency, WebConfig
-from utility.database import engine
+from utility.cache import invalidate_source, invalidate_sources
+from utility.database import get_engine, get_session
+
+# Above this many estimated rows the list views show the planner estimate instead of COUNT(*)
+APPROX_COUNT_THRESHOLD = config("PR_ADMIN_APPROX_COUNT_THRESHOLD", default=100000, cast=int)
+
+def approximate_count_query(model):
+    """
+    Row count from planner statistics (pg_class.reltuples) for large tables.
+    Falls back to an exact COUNT(*) when the estimate is below the threshold or the
+    table was never analysed (reltuples < 0); CASE only evaluates the branch it needs.
+    """
+    table = f"{model.__table__.schema}.{model.__tablename__}"
+    estimate = f"(SELECT reltuples::bigint FROM pg_class WHERE oid = '{table}'::regclass)"
+    return select(literal_column(
+        f"CASE WHEN {estimate} >= {APPROX_COUNT_THRESHOLD} THEN {estimate} "
+        f"ELSE (SELECT count(*) FROM {table}) END"
+    ))
+
+class FastListMixin:
+    """
+    List view with explicit loader options and approximate counts.
+    `list_columns` restricts the loaded columns of the model itself and `list_loaders`
+    eager-loads (and projects) every relationship shown in `column_list`, so a page
+    costs a fixed number of queries instead of one per row.
+    """
+    list_columns = ()
+    list_loaders = ()
+
+    def list_query(self, request):
+        stmt = select(self.model)
+        if self.list_columns:
+            stmt = stmt.options(load_only(*self.list_columns))
+        return stmt.options(*self.list_loaders)
+
+    def count_query(self, request):
+        return approximate_count_query(self.model)
+
+def invalidate_cached_responses(model) -> None:
+    """
+    Bump the API cache generations an admin edit of `model` makes stale: the source a row
+    belongs to, or every source for shared metadata (a product renamed in the admin shows
+    up in the responses of all of them).
+    """
+    if isinstance(model, Source):
+        invalidate_source(model.id)
+    elif getattr(model, "source_id", None) is not None:
+        invalidate_source(model.source_id)
+    else:
+        session = get_session()
+        try:
+            source_ids = session.execute(select(Source.id)).scalars().all()
+        finally:
+            session.close()
+        invalidate_sources(source_ids)
+
+class CacheInvalidationMixin:
+    """Invalidates the cached API responses after every create, edit and delete."""
+
+    async def after_model_change(self, data, model, is_created, request):
+        await asyncio.to_thread(invalidate_cached_responses, model)
 
-print(f"Engine: {engine}")  # Add this in your setup_admin function to verify engine
-print(f"Product Input Table: {ProductInput.__table__}")  # Check if the table is mapped properly
-print(f"Product Input Table Columns: {ProductInput.__table__.columns}")  # Check if the table is mapped properly
+    async def after_model_delete(self, model, request):
+        await asyncio.to_thread(invalidate_cached_responses, model)
 
 def setup_admin(app: FastAPI):
-    admin = Admin(app, engine)
+    admin = Admin(app, get_engine())
 
-    class ProductInputAdmin(ModelView, model=ProductInput):
+    class ProductInputAdmin(CacheInvalidationMixin, ModelView, model=ProductInput):
         column_list = [
             "id",
             "source.name",
@@ -26,7 +90,19 @@ def setup_admin(app: FastAPI):
             "last_update"
         ]
 
-    class PriceRawAdmin(ModelView, model=PriceRaw):
+    class PriceRawAdmin(CacheInvalidationMixin, FastListMixin, ModelView, model=PriceRaw):
+        list_columns = (
+            PriceRaw.id, PriceRaw.source_id, PriceRaw.product_config_id, PriceRaw.price_date,
+            PriceRaw.price_value, PriceRaw.product_category, PriceRaw.last_update,
+        )
+        list_loaders = (
+            selectinload(PriceRaw.source).load_only(Source.name),
+            selectinload(PriceRaw.product_input).options(
+                load_only(ProductInput.product_id, ProductInput.location_id),
+                selectinload(ProductInput.product).load_only(Product.name),
+                selectinload(ProductInput.location).load_only(Location.name),
+            ),
+        )
         column_list = [
             "id",
             "source.name",
@@ -38,7 +114,18 @@ def setup_admin(app: FastAPI):
             "last_update"
         ]
 
-    class PriceStandardizedAdmin(ModelView, model=PriceStandardized):
+    class PriceStandardizedAdmin(CacheInvalidationMixin, FastListMixin, ModelView, model=PriceStandardized):
+        list_columns = (
+            PriceStandardized.id, PriceStandardized.source_id, PriceStandardized.product_id,
+            PriceStandardized.location_id, PriceStandardized.unit_id, PriceStandardized.price_usd,
+            PriceStandardized.source_date, PriceStandardized.last_update,
+        )
+        list_loaders = (
+            selectinload(PriceStandardized.source).load_only(Source.name),
+            selectinload(PriceStandardized.product).load_only(Product.name),
+            selectinload(PriceStandardized.location).load_only(Location.name),
+            selectinload(PriceStandardized.unit).load_only(Unit.code),
+        )
         column_list = [
             "id",
             "source.name",
@@ -50,21 +137,21 @@ def setup_admin(app: FastAPI):
             "last_update"
         ]
     
-    class SourceAdmin(ModelView, model=Source):
+    class SourceAdmin(CacheInvalidationMixin, ModelView, model=Source):
         column_list = [
             "id",
             "name",
             "last_update"
         ]
     
-    class ProductAdmin(ModelView, model=Product):
+    class ProductAdmin(CacheInvalidationMixin, ModelView, model=Product):
         column_list = [
             "id",
             "name",
             "last_update"
         ]
     
-    class LocationAdmin(ModelView, model=Location):
+    class LocationAdmin(CacheInvalidationMixin, ModelView, model=Location):
         column_list = [
             "id",
             "name",
@@ -72,7 +159,7 @@ def setup_admin(app: FastAPI):
             "last_update"
         ]
     
-    class UnitAdmin(ModelView, model=Unit):
+    class UnitAdmin(CacheInvalidationMixin, ModelView, model=Unit):
         column_list = [
             "id",
             "code",
@@ -80,7 +167,7 @@ def setup_admin(app: FastAPI):
             "last_update"
         ]
     
-    class CurrencyAdmin(ModelView, model=Currency):
+    class CurrencyAdmin(CacheInvalidationMixin, ModelView, model=Currency):
         column_list = [
             "id",
             "code",
@@ -88,7 +175,7 @@ def setup_admin(app: FastAPI):
             "last_update"
         ]
     
-    class WebConfigAdmin(ModelView, model=WebConfig):
+    class WebConfigAdmin(CacheInvalidationMixin, ModelView, model=WebConfig):
         column_list = [
             "source.name",
             "start_date",
@@ -0,0 +1,20 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException
+
+from api_server.app.dashboard.schemas import SourceKpiOut
+from api_server.app.dashboard.service import kpi_store
+from api_server.core.responses import FastJSONResponse
+
+router = APIRouter()
+
+@router.get("/kpis", response_model=List[SourceKpiOut])
+async def fetch_kpis():
+    return FastJSONResponse(kpi_store.all())
+
+@router.get("/kpis/{source_id}", response_model=SourceKpiOut)
+async def fetch_source_kpis(source_id: int):
+    data = kpi_store.get(source_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="No KPIs computed for this source yet")
+    return FastJSONResponse(data)
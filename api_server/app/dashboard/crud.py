@@ -0,0 +1,105 @@
+from datetime import date, datetime, timedelta
+from typing import List
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models.metadata import Source
+from db.models.raw_data import PriceRaw
+from db.models.transformed import PriceStandardized, SourceKpi
+
+# Arbitrary application-wide key for pg_try_advisory_xact_lock, one KPI refresh at a time
+KPI_REFRESH_LOCK_KEY = 720131
+
+KPI_COLUMNS = (
+    SourceKpi.source_id,
+    SourceKpi.latest_raw_date,
+    SourceKpi.latest_source_date,
+    SourceKpi.transform_lag_days,
+    SourceKpi.untransformed_rows,
+    SourceKpi.missing_days,
+    SourceKpi.daily_counts,
+    SourceKpi.gap_dates,
+    SourceKpi.computed_at,
+)
+
+
+async def try_kpi_refresh_lock(db: AsyncSession) -> bool:
+    """Take the transaction-scoped refresh lock so only one API worker recomputes KPIs."""
+    result = await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": KPI_REFRESH_LOCK_KEY})
+    return bool(result.scalar())
+
+
+async def compute_source_kpis(db: AsyncSession, window_days: int) -> List[dict]:
+    """
+    Compute freshness, daily row counts, coverage gaps and transform lag for every source.
+    This is the only place that scans the price tables; it runs in the background job.
+    Daily counts, gaps and untransformed rows are limited to the last `window_days` days.
+    """
+    today = date.today()
+    window_start = today - timedelta(days=window_days - 1)
+
+    sources = (await db.execute(select(Source.id))).scalars().all()
+    latest_raw = dict((await db.execute(
+        select(PriceRaw.source_id, func.max(PriceRaw.price_date)).group_by(PriceRaw.source_id)
+    )).all())
+    latest_std = dict((await db.execute(
+        select(PriceStandardized.source_id, func.max(PriceStandardized.source_date)).group_by(PriceStandardized.source_id)
+    )).all())
+
+    daily = {}
+    for source_id, day, count in (await db.execute(
+        select(PriceStandardized.source_id, PriceStandardized.source_date, func.count())
+        .where(PriceStandardized.source_date >= window_start)
+        .group_by(PriceStandardized.source_id, PriceStandardized.source_date)
+    )).all():
+        daily.setdefault(source_id, {})[day.isoformat()] = count
+
+    untransformed = dict((await db.execute(
+        select(PriceRaw.source_id, func.count())
+        .outerjoin(PriceStandardized, PriceStandardized.raw_data_id == PriceRaw.id)
+        .where(PriceRaw.price_date >= window_start)
+        .where(PriceStandardized.id.is_(None))
+        .group_by(PriceRaw.source_id)
+    )).all())
+
+    window = [(window_start + timedelta(days=i)).isoformat() for i in range(window_days)]
+    rows = []
+    for source_id in sources:
+        raw_date, std_date = latest_raw.get(source_id), latest_std.get(source_id)
+        counts = daily.get(source_id, {})
+        gaps = [day for day in window if day not in counts]
+        rows.append({
+            "source_id": source_id,
+            "latest_raw_date": raw_date,
+            "latest_source_date": std_date,
+            "transform_lag_days": (raw_date - std_date).days if raw_date and std_date else None,
+            "untransformed_rows": untransformed.get(source_id, 0),
+            "missing_days": len(gaps),
+            "daily_counts": counts,
+            "gap_dates": gaps,
+            "computed_at": datetime.utcnow(),
+        })
+    return rows
+
+
+async def upsert_source_kpis(db: AsyncSession, rows: List[dict]) -> None:
+    if not rows:
+        return
+    stmt = insert(SourceKpi.__table__).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["source_id"],
+        set_={column: stmt.excluded[column] for column in rows[0] if column != "source_id"},
+    )
+    await db.execute(stmt)
+
+
+async def latest_kpi_computed_at(db: AsyncSession):
+    return (await db.execute(select(func.max(SourceKpi.computed_at)))).scalar()
+
+
+async def load_source_kpis(db: AsyncSession) -> List[dict]:
+    """Read the (small) KPI table."""
+    result = await db.execute(select(*KPI_COLUMNS))
+    return [dict(row) for row in result.mappings().all()]
@@ -0,0 +1,16 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class SourceKpiOut(BaseModel):
+    source_id: int
+    latest_raw_date: Optional[date] = None
+    latest_source_date: Optional[date] = None
+    transform_lag_days: Optional[int] = None
+    untransformed_rows: int
+    missing_days: int
+    daily_counts: Dict[str, int] = {}
+    gap_dates: List[str] = []
+    computed_at: Optional[datetime] = None
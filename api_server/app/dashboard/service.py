@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from decouple import config
+
+from api_server.app.dashboard.crud import (
+    compute_source_kpis,
+    latest_kpi_computed_at,
+    load_source_kpis,
+    try_kpi_refresh_lock,
+    upsert_source_kpis,
+)
+from api_server.core.database import AsyncSessionLocal, get_async_engine
+from utility.logger import get_logger
+
+logger = get_logger()
+
+KPI_REFRESH_SECONDS = config("PR_KPI_REFRESH_SECONDS", default=300, cast=int)
+KPI_WINDOW_DAYS = config("PR_KPI_WINDOW_DAYS", default=30, cast=int)
+
+
+class KpiStore:
+    """In-memory copy of the KPI table; dashboard requests only ever read from here."""
+
+    def __init__(self):
+        self._kpis = {}
+        self.loaded_at: Optional[datetime] = None
+
+    def replace(self, rows: List[dict]) -> None:
+        # Swap the whole mapping so readers never see a half-updated store
+        self._kpis = {row["source_id"]: row for row in rows}
+        self.loaded_at = datetime.utcnow()
+
+    def all(self) -> List[dict]:
+        return list(self._kpis.values())
+
+    def get(self, source_id: int) -> Optional[dict]:
+        return self._kpis.get(source_id)
+
+
+kpi_store = KpiStore()
+
+
+async def refresh_kpis() -> bool:
+    """
+    Recompute the KPI table and reload it into memory. The table is only recomputed when
+    no other worker holds the refresh lock and nobody recomputed it during this interval,
+    so N API workers still cost one computation per interval.
+    Returns True when this worker recomputed the table.
+    """
+    get_async_engine()
+    computed = False
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            if await try_kpi_refresh_lock(db):
+                last = await latest_kpi_computed_at(db)
+                stale = last is None or datetime.utcnow() - last > timedelta(seconds=KPI_REFRESH_SECONDS * 0.9)
+            else:
+                stale = False
+            if stale:
+                rows = await compute_source_kpis(db, KPI_WINDOW_DAYS)
+                await upsert_source_kpis(db, rows)
+                computed = True
+        kpi_store.replace(await load_source_kpis(db))
+    logger.info(f"KPI store refreshed ({len(kpi_store.all())} sources, recomputed={computed})")
+    return computed
+
+
+async def run_kpi_refresher(interval: int = KPI_REFRESH_SECONDS) -> None:
+    """Background loop started with the API; failures are logged and retried next interval."""
+    while True:
+        try:
+            await refresh_kpis()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"KPI refresh failed: {e}")
+        await asyncio.sleep(interval)
@@ -1,19 +1,167 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from utility.database import SessionLocal
-from api_server.app.data.service import get_all_input_data
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from api_server.core.cache import cache_stats, cached_response
+from api_server.core.coalesce import single_flight
+from api_server.core.database import get_async_db, run_in_session
+from api_server.core.metadata_cache import metadata_cache
+from api_server.core.price_feed import price_feed
+from api_server.app.data.export import EXPORT_DATASETS, EXPORT_FORMATS, stream_export
+from api_server.app.data.schemas import InputDataPage, LatestPriceOut, PriceChangePage, PriceLookupRequest, PriceLookupResult, PriceSeries
+from api_server.core.responses import FastJSONResponse
+from api_server.app.data.stream import stream_prices
+from api_server.app.data.service import decode_change_cursor, get_all_input_data, get_latest_price, get_latest_prices, get_price_changes, get_price_series, lookup_prices
 
 router = APIRouter()
 
-# Dependency
-def get_db():
-    db = SessionLocal()
+@router.get("/input-data", response_model=InputDataPage)
+async def fetch_input_data(
+    request: Request,
+    after_id: Optional[int] = Query(None, description="Cursor: return configs with id greater than this"),
+    limit: int = Query(100, ge=1, le=1000),
+    source: Optional[str] = None,
+    product: Optional[str] = None,
+    location: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return"),
+):
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+    # Coalesced producers outlive the leader's request, so they open a session of their own
+    async def produce():
+        try:
+            return await run_in_session(
+                lambda db: get_all_input_data(
+                    db, after_id=after_id, limit=limit, source=source, product=product, location=location, fields=field_list
+                )
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return await cached_response(request, produce)
+
+@router.get("/latest-prices", response_model=List[LatestPriceOut])
+async def fetch_latest_prices(
+    request: Request,
+    source_id: Optional[int] = None,
+    product_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+):
+    return await cached_response(
+        request,
+        lambda: run_in_session(
+            lambda db: get_latest_prices(db, source_id=source_id, product_id=product_id, location_id=location_id)
+        ),
+        source_id=source_id,
+    )
+
+@router.get("/latest-prices/{source_id}/{product_id}/{location_id}", response_model=LatestPriceOut)
+async def fetch_latest_price(source_id: int, product_id: int, location_id: int, db: AsyncSession = Depends(get_async_db)):
+    data = await get_latest_price(db, source_id, product_id, location_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="No price found for this source, product and location")
+    return FastJSONResponse(data)
+
+@router.get("/prices", response_model=List[PriceSeries])
+async def fetch_prices(
+    request: Request,
+    product_id: List[int] = Query(..., description="One or more product ids"),
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    location_id: Optional[int] = None,
+    source_id: Optional[int] = None,
+    resolution: Optional[str] = Query(None, description="day, week or month"),
+    max_points: Optional[int] = Query(None, ge=1, le=5000, description="Upper bound on points per series"),
+):
+    async def produce():
+        try:
+            return await run_in_session(
+                lambda db: get_price_series(
+                    db,
+                    product_ids=product_id,
+                    start_date=start_date,
+                    end_date=end_date,
+                    location_id=location_id,
+                    source_id=source_id,
+                    resolution=resolution,
+                    max_points=max_points,
+                )
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return await cached_response(request, produce, source_id=source_id)
+
+@router.post("/prices/lookup", response_model=List[PriceLookupResult])
+async def fetch_price_lookup(payload: PriceLookupRequest, db: AsyncSession = Depends(get_async_db)):
+    keys = [key.model_dump() for key in payload.keys]
+    return FastJSONResponse(await lookup_prices(db, keys, source_id=payload.source_id))
+
+@router.get("/prices/changes", response_model=PriceChangePage)
+async def fetch_price_changes(
+    since: Optional[str] = Query(None, description="Cursor from a previous page; omit for a full initial sync"),
+    limit: int = Query(1000, ge=1, le=10000),
+    source_id: Optional[int] = None,
+    product_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
     try:
-        yield db
-    finally:
-        db.close()
-
-@router.get("/input-data")
-async def fetch_input_data(db: Session = Depends(get_db)):
-    data = get_all_input_data(db)
-    return data
+        page = await get_price_changes(db, since=since, limit=limit, source_id=source_id, product_id=product_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(page)
+
+@router.get("/prices/stream")
+async def stream_new_prices(
+    source_id: Optional[List[int]] = Query(None),
+    product_id: Optional[List[int]] = Query(None),
+    last_event_id: Optional[str] = Header(None),
+):
+    if last_event_id:
+        try:
+            decode_change_cursor(last_event_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        stream_prices(source_ids=source_id, product_ids=product_id, last_event_id=last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/export/{dataset}")
+async def export_prices(
+    dataset: str,
+    format: str = Query("csv", description="csv, ndjson, parquet or arrow"),
+    source_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+):
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset '{dataset}'")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{format}'")
+
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream_export(dataset, format, source_id=source_id, start_date=start_date, end_date=end_date),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{dataset}_prices.{extension}"'},
+    )
+
+@router.get("/cache/stats")
+async def fetch_cache_stats():
+    return await cache_stats()
+
+@router.get("/coalescing/stats")
+async def fetch_coalescing_stats():
+    return single_flight.stats()
+
+@router.get("/metadata-cache/stats")
+async def fetch_metadata_cache_stats():
+    return metadata_cache.stats()
+
+@router.get("/prices/stream/stats")
+async def fetch_price_stream_stats():
+    return price_feed.stats()
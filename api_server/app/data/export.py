@@ -0,0 +1,144 @@
+import csv
+import io
+from datetime import date
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import Date, DateTime, DECIMAL, Integer, select
+
+from api_server.core.database import AsyncSessionLocal, get_async_engine
+from api_server.core.responses import dumps
+from db.models.raw_data import PriceRaw
+from db.models.transformed import PriceStandardized
+
+# Dataset name -> (model, date column used for range filters)
+EXPORT_DATASETS = {
+    "standardized": (PriceStandardized, PriceStandardized.source_date),
+    "raw": (PriceRaw, PriceRaw.price_date),
+}
+
+# Format name -> (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+EXPORT_CHUNK_SIZE = 10000
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only sink that hands out whatever has been written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema(columns):
+    """Map SQLAlchemy column types of an export dataset to an Arrow schema."""
+    import pyarrow as pa
+
+    fields = []
+    for column in columns:
+        if isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, DECIMAL):
+            arrow_type = pa.decimal128(column.type.precision, column.type.scale)
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        elif isinstance(column.type, Date):
+            arrow_type = pa.date32()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+async def _iter_partitions(dataset: str, source_id: Optional[int], start_date: Optional[date], end_date: Optional[date]):
+    """Read the dataset through a server-side cursor, EXPORT_CHUNK_SIZE rows at a time."""
+    model, date_column = EXPORT_DATASETS[dataset]
+    query = select(*model.__table__.columns).order_by(model.id)
+    if source_id is not None:
+        query = query.where(model.source_id == source_id)
+    if start_date is not None:
+        query = query.where(date_column >= start_date)
+    if end_date is not None:
+        query = query.where(date_column <= end_date)
+
+    # The session lives as long as the stream, not the request dependency
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for partition in result.partitions(EXPORT_CHUNK_SIZE):
+            yield partition
+
+
+async def stream_export(
+    dataset: str,
+    fmt: str,
+    source_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a price dataset in the requested format, one encoded chunk per cursor partition.
+    Memory is bounded by EXPORT_CHUNK_SIZE rows regardless of the size of the export.
+    """
+    columns = list(EXPORT_DATASETS[dataset][0].__table__.columns)
+    names = [column.name for column in columns]
+    partitions = _iter_partitions(dataset, source_id, start_date, end_date)
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        async for partition in partitions:
+            writer.writerows(partition)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    elif fmt == "ndjson":
+        async for partition in partitions:
+            yield b"".join(dumps(dict(zip(names, row))) + b"\n" for row in partition)
+
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = _arrow_schema(columns)
+        sink = _ChunkBuffer()
+        if fmt == "parquet":
+            writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+        else:
+            writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+        try:
+            async for partition in partitions:
+                batch = pa.RecordBatch.from_arrays(
+                    [pa.array([row[i] for row in partition], type=schema.field(i).type) for i in range(len(names))],
+                    schema=schema,
+                )
+                if fmt == "parquet":
+                    writer.write_batch(batch)
+                else:
+                    writer.write(batch)
+                data = sink.drain()
+                if data:
+                    yield data
+        finally:
+            writer.close()
+        yield sink.drain()
@@ -0,0 +1,89 @@
+from datetime import date, datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class PriceLookupKey(BaseModel):
+    product_id: int
+    location_id: Optional[int] = None
+    date: date
+    # exact: price on that date only, asof: latest price on or before that date
+    mode: Literal["exact", "asof"] = "exact"
+
+
+class PriceLookupRequest(BaseModel):
+    keys: List[PriceLookupKey] = Field(..., min_length=1, max_length=5000)
+    source_id: Optional[int] = None
+
+
+class InputDataRow(BaseModel):
+    # Every field but id is optional, `fields=` may project any subset
+    id: int
+    source: Optional[str] = None
+    source_url: Optional[str] = None
+    product: Optional[str] = None
+    upload_on_pr: Optional[bool] = None
+    currency: Optional[str] = None
+    unit: Optional[str] = None
+    expected_unit: Optional[str] = None
+    input_quantity: Optional[float] = None
+    location: Optional[str] = None
+    last_update: Optional[datetime] = None
+
+
+class InputDataPage(BaseModel):
+    items: List[InputDataRow]
+    next_cursor: Optional[int] = None
+
+
+class LatestPriceOut(BaseModel):
+    source_id: int
+    product_id: int
+    location_id: int
+    quantity: Optional[float] = None
+    unit_id: Optional[int] = None
+    price_usd: float
+    source_date: date
+    last_update: Optional[datetime] = None
+
+
+class PricePoint(BaseModel):
+    date: date
+    min: float
+    max: float
+    avg: float
+    last: float
+    count: int
+
+
+class PriceSeries(BaseModel):
+    product_id: int
+    location_id: Optional[int] = None
+    points: List[PricePoint]
+
+
+class PriceChange(BaseModel):
+    id: int
+    source_id: int
+    product_id: int
+    location_id: Optional[int] = None
+    quantity: Optional[float] = None
+    unit_id: Optional[int] = None
+    price_usd: float
+    source_date: date
+    last_update: datetime
+
+
+class PriceChangePage(BaseModel):
+    items: List[PriceChange]
+    # Opaque; pass back as `since`. Persist it to resume the sync later
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+
+class PriceLookupResult(PriceLookupKey):
+    source_id: Optional[int] = None
+    unit_id: Optional[int] = None
+    price_usd: Optional[float] = None
+    source_date: Optional[date] = None
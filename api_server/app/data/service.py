@@ -1,5 +1,338 @@
-from sqlalchemy.orm import Session
-from db.models.input import ProductInput
+import base64
+import math
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Sequence
 
-def get_all_input_data(db: Session):
-    return db.query(ProductInput).all()
+from decouple import config
+from sqlalchemy import Boolean, Date, Integer, and_, cast, column, func, literal, literal_column, or_, select, true, tuple_, values
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api_server.core.metadata_cache import DISPLAY_COLUMNS, metadata_cache
+from db.models.transformed import LatestPrice, PriceStandardized
+
+# Public field name -> (input config column, dimension table it is resolved through or None)
+INPUT_DATA_FIELDS = {
+    "id": ("id", None),
+    "source": ("source_id", "source"),
+    "source_url": ("source_url", None),
+    "product": ("product_id", "product"),
+    "upload_on_pr": ("upload_on_pr", None),
+    "currency": ("input_currency_id", "currency"),
+    "unit": ("input_unit_id", "unit"),
+    "expected_unit": ("expected_unit_id", "unit"),
+    "input_quantity": ("input_quantity", None),
+    "location": ("location_id", "location"),
+    "last_update": ("last_update", None),
+}
+
+async def get_all_input_data(
+    db: AsyncSession,
+    after_id: Optional[int] = None,
+    limit: int = 100,
+    source: Optional[str] = None,
+    product: Optional[str] = None,
+    location: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> dict:
+    """
+    Keyset-paginated page of input configs, served from the in-process metadata cache.
+    Dimension names are resolved from the cached metadata tables instead of joins, and
+    only the requested `fields` are returned. Pass the returned `next_cursor` as `after_id`
+    to fetch the next page.
+    Raises:
+        ValueError: If `fields` contains an unknown field name.
+    """
+    fields = fields or list(INPUT_DATA_FIELDS)
+    unknown = [f for f in fields if f not in INPUT_DATA_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # id is always returned, it is the pagination cursor
+    if "id" not in fields:
+        fields = ["id"] + fields
+
+    # Name filters become id filters; an unknown name matches nothing
+    filters = {}
+    for column, table, value in (("source_id", "source", source), ("product_id", "product", product), ("location_id", "location", location)):
+        if value is not None:
+            filters[column] = await metadata_cache.id_of(db, table, value)
+            if filters[column] is None:
+                return {"items": [], "next_cursor": None}
+
+    # Ids and rows from one snapshot: a NOTIFY may replace the cached table while dimensions load
+    configs = await metadata_cache.snapshot(db, "input_config")
+    dimensions = {table: await metadata_cache.table(db, table) for _, table in INPUT_DATA_FIELDS.values() if table}
+
+    items = []
+    for config_id in configs.ids_after(after_id):
+        config = configs.rows[config_id]
+        if any(config[column] != value for column, value in filters.items()):
+            continue
+        item = {}
+        for field in fields:
+            column, table = INPUT_DATA_FIELDS[field]
+            if table is None:
+                item[field] = config[column]
+            else:
+                dimension = dimensions[table].get(config[column])
+                item[field] = dimension[DISPLAY_COLUMNS[table]] if dimension else None
+        items.append(item)
+        if len(items) == limit:
+            break
+
+    next_cursor = items[-1]["id"] if len(items) == limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+LATEST_PRICE_COLUMNS = (
+    LatestPrice.source_id,
+    LatestPrice.product_id,
+    LatestPrice.location_id,
+    LatestPrice.quantity,
+    LatestPrice.unit_id,
+    LatestPrice.price_usd,
+    LatestPrice.source_date,
+    LatestPrice.last_update,
+)
+
+async def get_latest_price(db: AsyncSession, source_id: int, product_id: int, location_id: int) -> Optional[dict]:
+    """Primary-key lookup of the current price for one (source, product, location)."""
+    query = (
+        select(*LATEST_PRICE_COLUMNS)
+        .where(LatestPrice.source_id == source_id)
+        .where(LatestPrice.product_id == product_id)
+        .where(LatestPrice.location_id == location_id)
+    )
+    row = (await db.execute(query)).mappings().first()
+    return dict(row) if row else None
+
+async def get_latest_prices(db: AsyncSession, source_id: Optional[int] = None, product_id: Optional[int] = None, location_id: Optional[int] = None) -> List[dict]:
+    """Current prices from the snapshot table, optionally narrowed by any part of its key."""
+    query = select(*LATEST_PRICE_COLUMNS)
+    if source_id is not None:
+        query = query.where(LatestPrice.source_id == source_id)
+    if product_id is not None:
+        query = query.where(LatestPrice.product_id == product_id)
+    if location_id is not None:
+        query = query.where(LatestPrice.location_id == location_id)
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings().all()]
+
+PRICE_RESOLUTIONS = ("day", "week", "month")
+
+async def get_price_series(
+    db: AsyncSession,
+    product_ids: List[int],
+    start_date: date,
+    end_date: date,
+    location_id: Optional[int] = None,
+    source_id: Optional[int] = None,
+    resolution: Optional[str] = None,
+    max_points: Optional[int] = None,
+) -> List[dict]:
+    """
+    Downsampled price series per (product, location), aggregated in the database.
+    Rows are bucketed either by calendar `resolution` (day/week/month) or into equal-width
+    day buckets so that each series has at most `max_points` points. Every bucket carries
+    min/max/avg/last `price_usd` and the number of source rows it covers.
+    Raises:
+        ValueError: On an unknown resolution, both/neither bucketing option or a reversed range.
+    """
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+    if resolution and max_points:
+        raise ValueError("Use either resolution or max_points, not both")
+    if max_points is not None:
+        # Equal width buckets anchored at start_date: start + ((d - start) / width) * width
+        width = max(1, math.ceil(((end_date - start_date).days + 1) / max_points))
+        offset = cast(PriceStandardized.source_date - literal(start_date), Integer)
+        bucket = literal(start_date) + (offset / width) * width
+    else:
+        resolution = resolution or "day"
+        if resolution not in PRICE_RESOLUTIONS:
+            raise ValueError(f"Unknown resolution '{resolution}', expected one of {', '.join(PRICE_RESOLUTIONS)}")
+        bucket = func.date_trunc(resolution, PriceStandardized.source_date)
+    bucket = func.date(bucket).label("bucket")
+
+    query = (
+        select(
+            PriceStandardized.product_id,
+            PriceStandardized.location_id,
+            bucket,
+            func.min(PriceStandardized.price_usd).label("min"),
+            func.max(PriceStandardized.price_usd).label("max"),
+            func.avg(PriceStandardized.price_usd).label("avg"),
+            func.array_agg(
+                aggregate_order_by(PriceStandardized.price_usd, PriceStandardized.source_date.desc())
+            )[1].label("last"),
+            func.count().label("count"),
+        )
+        .where(PriceStandardized.product_id.in_(product_ids))
+        .where(PriceStandardized.source_date.between(start_date, end_date))
+    )
+    if location_id is not None:
+        query = query.where(PriceStandardized.location_id == location_id)
+    if source_id is not None:
+        query = query.where(PriceStandardized.source_id == source_id)
+    query = (
+        # Group by the output name so the bucket's bound parameters are not repeated
+        query.group_by(PriceStandardized.product_id, PriceStandardized.location_id, literal_column("bucket"))
+        .order_by(PriceStandardized.product_id, PriceStandardized.location_id, bucket)
+    )
+
+    result = await db.execute(query)
+    series = {}
+    for row in result.all():
+        key = (row.product_id, row.location_id)
+        if key not in series:
+            series[key] = {"product_id": row.product_id, "location_id": row.location_id, "points": []}
+        series[key]["points"].append({
+            "date": row.bucket,
+            "min": float(row.min),
+            "max": float(row.max),
+            "avg": float(row.avg),
+            "last": float(row.last),
+            "count": row.count,
+        })
+    return list(series.values())
+
+async def lookup_prices(db: AsyncSession, keys: List[dict], source_id: Optional[int] = None) -> List[dict]:
+    """
+    Resolve many (product, location, date) keys in one set-based query.
+    The keys are sent as a VALUES list and each one is matched through a LATERAL subquery,
+    `exact` keys on their date and `asof` keys on the latest price at or before it.
+    Results come back in request order; unmatched keys have `price_usd` set to None.
+    """
+    rows = [
+        (idx, key["product_id"], key["location_id"], key["date"], key["mode"] == "asof")
+        for idx, key in enumerate(keys)
+    ]
+    lookup_keys = values(
+        column("idx", Integer),
+        column("product_id", Integer),
+        column("location_id", Integer),
+        column("price_date", Date),
+        column("as_of", Boolean),
+        name="lookup_keys",
+    ).data(rows)
+
+    match = (
+        select(
+            PriceStandardized.source_id,
+            PriceStandardized.unit_id,
+            PriceStandardized.price_usd,
+            PriceStandardized.source_date,
+        )
+        .where(PriceStandardized.product_id == lookup_keys.c.product_id)
+        .where(or_(
+            PriceStandardized.location_id == lookup_keys.c.location_id,
+            and_(lookup_keys.c.location_id.is_(None), PriceStandardized.location_id.is_(None)),
+        ))
+        .where(or_(
+            PriceStandardized.source_date == lookup_keys.c.price_date,
+            and_(lookup_keys.c.as_of, PriceStandardized.source_date <= lookup_keys.c.price_date),
+        ))
+    )
+    if source_id is not None:
+        match = match.where(PriceStandardized.source_id == source_id)
+    match = match.order_by(PriceStandardized.source_date.desc()).limit(1).lateral("match")
+
+    query = (
+        select(lookup_keys.c.idx, match.c.source_id, match.c.unit_id, match.c.price_usd, match.c.source_date)
+        .select_from(lookup_keys.outerjoin(match, true()))
+    )
+    result = await db.execute(query)
+    found = {row.idx: row for row in result.all()}
+
+    response = []
+    for idx, key in enumerate(keys):
+        row = found.get(idx)
+        matched = row is not None and row.price_usd is not None
+        response.append({
+            **key,
+            "source_id": row.source_id if matched else None,
+            "unit_id": row.unit_id if matched else None,
+            "price_usd": float(row.price_usd) if matched else None,
+            "source_date": row.source_date if matched else None,
+        })
+    return response
+
+
+# Rows newer than this are not handed out yet, so a writer committing slightly later with
+# an earlier `last_update` cannot slip behind a cursor a client already holds
+CHANGE_FEED_SETTLE_SECONDS = config("PR_CHANGE_FEED_SETTLE_SECONDS", default=5, cast=int)
+
+CHANGE_FEED_COLUMNS = (
+    PriceStandardized.id,
+    PriceStandardized.source_id,
+    PriceStandardized.product_id,
+    PriceStandardized.location_id,
+    PriceStandardized.quantity,
+    PriceStandardized.unit_id,
+    PriceStandardized.price_usd,
+    PriceStandardized.source_date,
+    PriceStandardized.last_update,
+)
+
+def encode_change_cursor(last_update: datetime, row_id: int) -> str:
+    """Opaque cursor for the (last_update, id) position of a change-feed row."""
+    raw = f"{last_update.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_change_cursor(cursor: str) -> tuple:
+    """
+    Raises:
+        ValueError: If the cursor was not produced by `encode_change_cursor`.
+    """
+    try:
+        last_update, row_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(last_update), int(row_id)
+    except Exception:
+        raise ValueError("Invalid change-feed cursor")
+
+async def get_price_changes(
+    db: AsyncSession,
+    since: Optional[str] = None,
+    limit: int = 1000,
+    source_id: Optional[int] = None,
+    product_id: Optional[int] = None,
+    source_ids: Optional[Sequence[int]] = None,
+    product_ids: Optional[Sequence[int]] = None,
+    settled: bool = True,
+) -> dict:
+    """
+    Standardized prices inserted or updated after the `since` cursor, oldest first.
+    Rows are ordered by (last_update, id) and read through the matching index, so a sync
+    costs proportional to the delta. `next_cursor` is always returned (unchanged when there
+    is nothing new) and `has_more` tells the client to fetch again straight away.
+    Deleted rows are not reported.
+    Args:
+        source_ids (Optional[Sequence[int]]): Only these sources (on top of `source_id`).
+        product_ids (Optional[Sequence[int]]): Only these products (on top of `product_id`).
+        settled (bool): Leave out the rows of the last CHANGE_FEED_SETTLE_SECONDS. Only a
+                        caller that covers later commits itself (the live stream) turns it off.
+    Raises:
+        ValueError: If `since` is not a valid cursor.
+    """
+    query = (
+        select(*CHANGE_FEED_COLUMNS)
+        .order_by(PriceStandardized.last_update, PriceStandardized.id)
+        .limit(limit + 1)
+    )
+    if settled:
+        query = query.where(PriceStandardized.last_update <= datetime.utcnow() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS))
+    if since:
+        query = query.where(tuple_(PriceStandardized.last_update, PriceStandardized.id) > tuple_(*decode_change_cursor(since)))
+    if source_id is not None:
+        query = query.where(PriceStandardized.source_id == source_id)
+    if product_id is not None:
+        query = query.where(PriceStandardized.product_id == product_id)
+    if source_ids:
+        query = query.where(PriceStandardized.source_id.in_(list(source_ids)))
+    if product_ids:
+        query = query.where(PriceStandardized.product_id.in_(list(product_ids)))
+
+    items = [dict(row) for row in (await db.execute(query)).mappings().all()]
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = encode_change_cursor(items[-1]["last_update"], items[-1]["id"]) if items else since
+    return {"items": items, "next_cursor": next_cursor, "has_more": has_more}
@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional, Set
+
+from decouple import config
+
+from api_server.app.data.service import CHANGE_FEED_SETTLE_SECONDS, encode_change_cursor, get_price_changes
+from api_server.core.database import AsyncSessionLocal, get_async_engine
+from api_server.core.price_feed import price_feed
+from api_server.core.responses import dumps
+
+# Comment line sent when idle so proxies keep the connection open
+SSE_HEARTBEAT_SECONDS = config("PR_SSE_HEARTBEAT_SECONDS", default=15, cast=int)
+
+
+def _last_update(event: dict) -> datetime:
+    # Live events carry last_update as the text the NOTIFY trigger wrote
+    last_update = event["last_update"]
+    return datetime.fromisoformat(last_update) if isinstance(last_update, str) else last_update
+
+
+def _sse_event(event: dict, settled_before: Optional[datetime] = None) -> bytes:
+    """
+    Encode one price as an SSE `price` event; its id is the change-feed cursor to resume from.
+    A row newer than `settled_before` may still be followed by commits with an earlier
+    last_update, so its id is held back to that point: resuming replays it again instead of
+    skipping the late rows.
+    """
+    position = (_last_update(event), event["id"])
+    if settled_before is not None and position > (settled_before, 0):
+        position = (settled_before, 0)
+    cursor = encode_change_cursor(*position)
+    return b"id: " + cursor.encode("ascii") + b"\nevent: price\ndata: " + dumps(event) + b"\n\n"
+
+
+async def _replay(since: str, source_ids: List[int], product_ids: List[int]) -> AsyncIterator[dict]:
+    """
+    Catch up from a Last-Event-ID through the change feed, one page at a time, up to the
+    latest commit: the rows of the settle window too, the live subscription covers later ones.
+    """
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        has_more = True
+        while has_more:
+            page = await get_price_changes(
+                db, since=since, limit=1000, source_ids=source_ids, product_ids=product_ids, settled=False
+            )
+            for item in page["items"]:
+                yield item
+            since, has_more = page["next_cursor"], page["has_more"]
+
+
+async def stream_prices(
+    source_ids: Optional[List[int]] = None,
+    product_ids: Optional[List[int]] = None,
+    last_event_id: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Server-sent events of standardized prices as the transform commits them.
+    With `last_event_id` the rows missed since that event are replayed from the change feed
+    before going live. The subscription is taken first and the replay reads up to the latest
+    commit, so every row is in one or the other; rows in both are sent once. Event ids are
+    held back by CHANGE_FEED_SETTLE_SECONDS (see `_sse_event`), so a row may be delivered
+    twice across a reconnect (clients dedupe on `id`), never lost. The stream ends when the
+    client falls too far behind; reconnecting with Last-Event-ID resumes it.
+    """
+    source_ids, product_ids = source_ids or [], product_ids or []
+    settle = timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+    subscription = price_feed.subscribe(source_ids, product_ids)
+    subscribed_at = datetime.utcnow()
+    try:
+        yield f"retry: {SSE_HEARTBEAT_SECONDS * 1000}\n\n".encode("ascii")
+        # Replayed rows recent enough to have committed after subscribing, also queued live
+        replayed: Set[int] = set()
+        if last_event_id:
+            async for item in _replay(last_event_id, source_ids, product_ids):
+                if item["last_update"] >= subscribed_at - settle:
+                    replayed.add(item["id"])
+                yield _sse_event(item, settled_before=subscribed_at - settle)
+        while True:
+            try:
+                queued = await asyncio.wait_for(subscription.queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if queued is None:
+                return
+            received_at, event = queued
+            if event["id"] in replayed:
+                continue
+            # Rows committed after this one was received cannot be older than this
+            yield _sse_event(event, settled_before=received_at - settle)
+    finally:
+        price_feed.unsubscribe(subscription)
@@ -0,0 +1,96 @@
+import hashlib
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from api_server.core.coalesce import single_flight
+from api_server.core.responses import dumps
+from utility.cache import CACHE_ENABLED, CACHE_TTL, HITS_KEY, MISSES_KEY, generation_key, get_async_redis
+from utility.logger import get_logger
+
+logger = get_logger()
+
+
+def normalise_query(request: Request) -> str:
+    """Canonical query string: keys and repeated values sorted, empty values dropped."""
+    items = sorted((key, value) for key, value in request.query_params.multi_items() if value != "")
+    return urlencode(items)
+
+
+async def _encode(producer: Callable[[], Awaitable[Any]]) -> bytes:
+    return dumps(await producer())
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def _response(body: bytes, etag: str, request: Request, status: str) -> Response:
+    headers = {"ETag": etag, "X-Cache": status, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def cached_response(
+    request: Request,
+    producer: Callable[[], Awaitable[Any]],
+    source_id: Optional[int] = None,
+    ttl: int = CACHE_TTL,
+) -> Response:
+    """
+    Serve a read endpoint from Redis, computing it with `producer` on a miss.
+    The key is the route path plus the normalised query string and the current cache
+    generation of `source_id` (or the global generation), which the ETL writers bump when
+    they commit new data. Responses carry an ETag and honour If-None-Match with a 304.
+    Concurrent misses for the same key share one `producer` call (single flight).
+    Redis being unavailable degrades to an uncached response.
+    """
+    if not CACHE_ENABLED:
+        flight_key = f"{request.url.path}?{normalise_query(request)}"
+        body = await single_flight.do(flight_key, lambda: _encode(producer))
+        return _response(body, make_etag(body), request, "BYPASS")
+
+    redis = get_async_redis()
+    key = None
+    try:
+        generation = await redis.get(generation_key(source_id))
+        generation = int(generation) if generation else 0
+        key = f"pr:cache:{request.url.path}:{generation}:{normalise_query(request)}"
+        cached = await redis.get(key)
+        if cached is not None:
+            await redis.incr(HITS_KEY)
+            etag = make_etag(cached)
+            return _response(cached, etag, request, "HIT")
+        await redis.incr(MISSES_KEY)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {request.url.path}: {e}")
+
+    async def produce_and_store() -> bytes:
+        body = await _encode(producer)
+        if key is not None:
+            try:
+                await redis.set(key, body, ex=ttl)
+            except Exception as e:
+                logger.warning(f"Cache write failed for {request.url.path}: {e}")
+        return body
+
+    flight_key = key or f"{request.url.path}?{normalise_query(request)}"
+    body = await single_flight.do(flight_key, produce_and_store)
+    return _response(body, make_etag(body), request, "MISS")
+
+
+async def cache_stats() -> dict:
+    """
+    Hit/miss counters and hit ratio since the counters were last reset.
+    Redis being unavailable is reported (`available` False) rather than raised.
+    """
+    try:
+        hits, misses = await get_async_redis().mget([HITS_KEY, MISSES_KEY])
+    except Exception as e:
+        logger.warning(f"Cache stats unavailable: {e}")
+        return {"available": False, "hits": None, "misses": None, "hit_ratio": None}
+    hits, misses = int(hits or 0), int(misses or 0)
+    total = hits + misses
+    return {"available": True, "hits": hits, "misses": misses, "hit_ratio": round(hits / total, 4) if total else None}
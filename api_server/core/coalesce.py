@@ -0,0 +1,50 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into one in-flight execution.
+    The first caller for a key starts the coroutine as a task of its own; every caller,
+    that one included, awaits the same task and gets the same result (or exception).
+    Callers await it shielded, so a cancelled caller (i.e. a client that hung up) neither
+    cancels the shared call nor fails the others. Nothing is kept once the call finishes,
+    so results are never stale.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark retrieved so a failure whose callers were all cancelled is not reported as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._done, key))
+            self.executed += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        total = self.executed + self.coalesced
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "coalesced_ratio": round(self.coalesced / total, 4) if total else None,
+        }
+
+
+# Process-wide instance shared by the API endpoints
+single_flight = SingleFlight()
@@ -0,0 +1,74 @@
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from decouple import config
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from utility.database import POOL_SIZE, MAX_OVERFLOW, POOL_RECYCLE, POOL_TIMEOUT, get_database_url
+
+# Async session factory for the API, bound to the engine on first use.
+# expire_on_commit=False so returned objects stay readable after the request commits.
+AsyncSessionLocal = sessionmaker(class_=AsyncSession, autocommit=False, autoflush=False, expire_on_commit=False)
+
+_async_engine: Optional[AsyncEngine] = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_database_url() -> str:
+    """
+    Resolve the async database URL for the API.
+    Uses `PR_ASYNC_DATABASE_URL` when set, otherwise rewrites `PR_DATABASE_URL`
+    (postgresql / postgresql+psycopg2) to the asyncpg driver.
+    """
+    url = config("PR_ASYNC_DATABASE_URL", default=None)
+    if url:
+        return url
+    sync_url = make_url(get_database_url())
+    return str(sync_url.set(drivername="postgresql+asyncpg"))
+
+
+def get_async_engine() -> AsyncEngine:
+    """Return the API's async engine, created lazily with the shared pool settings."""
+    global _async_engine
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                _async_engine = create_async_engine(
+                    get_async_database_url(),
+                    echo=False,
+                    pool_pre_ping=True,
+                    pool_size=POOL_SIZE,
+                    max_overflow=MAX_OVERFLOW,
+                    pool_recycle=POOL_RECYCLE,
+                    pool_timeout=POOL_TIMEOUT,
+                )
+                AsyncSessionLocal.configure(bind=_async_engine)
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """Close all pooled async connections, called on API shutdown."""
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
+
+# Dependency for FastAPI
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def run_in_session(func: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+    """
+    Await `func` with a session of its own, for work that may outlive the request that
+    started it: a coalesced producer keeps running for its followers after the leader's
+    client hangs up and its `get_async_db` session is closed.
+    """
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        return await func(db)
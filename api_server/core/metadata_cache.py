@@ -0,0 +1,140 @@
+import asyncio
+import bisect
+from typing import Dict, List, NamedTuple, Optional
+
+from decouple import config
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api_server.core.notify import listen_channel
+from db.models.input import ProductInput
+from db.models.metadata import Currency, Location, Product, Source, Unit
+from utility.logger import get_logger
+
+logger = get_logger()
+
+# Channel the metadata triggers notify on, payload is "<schema>.<table>"
+METADATA_CHANNEL = config("PR_METADATA_CHANNEL", default="pr_metadata_changed")
+
+# Cached table -> (notify payload, columns to load)
+CACHED_TABLES = {
+    "source": ("metadata.source", (Source.id, Source.name)),
+    "product": ("metadata.product", (Product.id, Product.name)),
+    "location": ("metadata.location", (Location.id, Location.name, Location.region)),
+    "unit": ("metadata.unit", (Unit.id, Unit.code, Unit.description)),
+    "currency": ("metadata.currency", (Currency.id, Currency.code, Currency.name)),
+    "input_config": ("input.products_input_data", (
+        ProductInput.id,
+        ProductInput.source_id,
+        ProductInput.source_url,
+        ProductInput.product_id,
+        ProductInput.upload_on_pr,
+        ProductInput.input_currency_id,
+        ProductInput.input_unit_id,
+        ProductInput.expected_unit_id,
+        ProductInput.input_quantity,
+        ProductInput.location_id,
+        ProductInput.last_update,
+    )),
+}
+
+# Column holding the display name of each dimension
+DISPLAY_COLUMNS = {"source": "name", "product": "name", "location": "name", "unit": "code", "currency": "code"}
+
+
+class CachedTable(NamedTuple):
+    """One load of a table: its rows by id, their ids sorted and, for dimensions, ids by name."""
+
+    rows: Dict[int, dict]
+    ids: List[int]
+    by_name: Dict[str, int]
+
+    def ids_after(self, after_id: Optional[int]) -> List[int]:
+        """Sorted ids greater than `after_id` (keyset pagination over the cache)."""
+        return self.ids[bisect.bisect_right(self.ids, after_id):] if after_id is not None else self.ids
+
+
+class MetadataCache:
+    """
+    Read-through, per-process cache of the metadata dimensions and input configs.
+    Each table is loaded on first use and reloaded only after a Postgres NOTIFY marks it
+    dirty, so every uvicorn worker stays coherent without polling.
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, CachedTable] = {}
+        # Bumped on every invalidation so a load racing with a NOTIFY is not kept
+        self._versions: Dict[str, int] = {table: 0 for table in CACHED_TABLES}
+        self._locks = {table: asyncio.Lock() for table in CACHED_TABLES}
+        self._listener: Optional[asyncio.Task] = None
+        self.loads = 0
+        self.invalidations = 0
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Drop one cached table (or all of them); it is reloaded on next access."""
+        for name in [table] if table else list(CACHED_TABLES):
+            self._versions[name] += 1
+            self._tables.pop(name, None)
+        self.invalidations += 1
+
+    async def snapshot(self, db: AsyncSession, table: str) -> CachedTable:
+        """
+        The cached load of `table`, loading it first if needed. Rows, ids and names come from
+        the same load, so read everything a request needs from one snapshot: a NOTIFY between
+        two calls may replace the table. A load that raced an invalidation is returned to its
+        caller but not kept.
+        """
+        cached = self._tables.get(table)
+        if cached is not None:
+            return cached
+        async with self._locks[table]:
+            cached = self._tables.get(table)
+            if cached is None:
+                version = self._versions[table]
+                result = await db.execute(select(*CACHED_TABLES[table][1]))
+                rows = {row["id"]: dict(row) for row in result.mappings().all()}
+                by_name = {}
+                if table in DISPLAY_COLUMNS:
+                    column = DISPLAY_COLUMNS[table]
+                    by_name = {row[column]: key for key, row in rows.items()}
+                cached = CachedTable(rows, sorted(rows), by_name)
+                if version == self._versions[table]:
+                    self._tables[table] = cached
+                self.loads += 1
+        return cached
+
+    async def table(self, db: AsyncSession, table: str) -> Dict[int, dict]:
+        return (await self.snapshot(db, table)).rows
+
+    async def name_of(self, db: AsyncSession, table: str, key: Optional[int]) -> Optional[str]:
+        row = (await self.table(db, table)).get(key)
+        return row[DISPLAY_COLUMNS[table]] if row else None
+
+    async def id_of(self, db: AsyncSession, table: str, name: str) -> Optional[int]:
+        return (await self.snapshot(db, table)).by_name.get(name)
+
+    def _on_notify(self, payload: str) -> None:
+        for table, (notify_name, _) in CACHED_TABLES.items():
+            if notify_name == payload:
+                logger.info(f"Metadata cache invalidated by NOTIFY: {payload}")
+                self.invalidate(table)
+
+    async def listen(self) -> None:
+        """
+        LISTEN on METADATA_CHANNEL in the background.
+        Everything is invalidated on (re)connect since notifications may have been missed.
+        """
+        await listen_channel(METADATA_CHANNEL, self._on_notify, on_reset=self.invalidate)
+
+    def start(self) -> None:
+        self._listener = asyncio.create_task(self.listen())
+
+    def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+
+    def stats(self) -> dict:
+        return {"loaded_tables": sorted(self._tables), "loads": self.loads, "invalidations": self.invalidations}
+
+
+metadata_cache = MetadataCache()
@@ -0,0 +1,47 @@
+import asyncio
+from typing import Callable, Optional
+
+from sqlalchemy.engine import make_url
+
+from api_server.core.database import get_async_database_url
+from utility.logger import get_logger
+
+logger = get_logger()
+
+LISTENER_RETRY_SECONDS = 5
+
+
+async def listen_channel(
+    channel: str,
+    callback: Callable[[str], None],
+    on_reset: Optional[Callable[[], None]] = None,
+) -> None:
+    """
+    LISTEN on a Postgres channel over a dedicated asyncpg connection until cancelled.
+    `callback` gets each notification payload. The connection is re-established after a
+    failure, and `on_reset` is called on every (re)connect and disconnect because
+    notifications sent while not listening are lost.
+    """
+    import asyncpg
+
+    dsn = str(make_url(get_async_database_url()).set(drivername="postgresql"))
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(dsn)
+            await connection.add_listener(channel, lambda conn, pid, chan, payload: callback(payload))
+            if on_reset:
+                on_reset()
+            logger.info(f"Listening for notifications on '{channel}'")
+            while not connection.is_closed():
+                await asyncio.sleep(LISTENER_RETRY_SECONDS)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Listener on '{channel}' failed, retrying: {e}")
+        finally:
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+        if on_reset:
+            on_reset()
+        await asyncio.sleep(LISTENER_RETRY_SECONDS)
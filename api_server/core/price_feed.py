@@ -0,0 +1,96 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Iterable, Optional, Set
+
+from decouple import config
+
+from api_server.core.notify import listen_channel
+from utility.logger import get_logger
+
+logger = get_logger()
+
+# Channel the products_standard_data insert trigger notifies on, payload is the row as JSON
+PRICE_CHANNEL = config("PR_PRICE_CHANNEL", default="pr_price_inserted")
+# Events buffered per subscriber before it is considered too slow and disconnected
+SUBSCRIBER_QUEUE_SIZE = config("PR_PRICE_FEED_QUEUE_SIZE", default=1000, cast=int)
+
+
+class Subscription:
+    """One consumer of the price feed, optionally narrowed to some sources and products."""
+
+    def __init__(self, source_ids: Optional[Iterable[int]] = None, product_ids: Optional[Iterable[int]] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.source_ids = set(source_ids or ())
+        self.product_ids = set(product_ids or ())
+
+    def matches(self, event: dict) -> bool:
+        if self.source_ids and event["source_id"] not in self.source_ids:
+            return False
+        if self.product_ids and event["product_id"] not in self.product_ids:
+            return False
+        return True
+
+
+class PriceFeed:
+    """
+    In-process fan-out of newly committed standardized prices.
+    One LISTEN connection per API worker receives the NOTIFY sent by the insert trigger and
+    pushes each row to the queues of the matching subscribers, as `(received_at, event)`
+    with the (UTC) time it arrived. A subscriber whose queue is full gets a `None` sentinel
+    instead and is expected to reconnect and catch up.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        self._listener: Optional[asyncio.Task] = None
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, source_ids: Optional[Iterable[int]] = None, product_ids: Optional[Iterable[int]] = None) -> Subscription:
+        subscription = Subscription(source_ids, product_ids)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, event: dict) -> None:
+        self.published += 1
+        received_at = datetime.utcnow()
+        for subscription in list(self._subscribers):
+            if not subscription.matches(event):
+                continue
+            try:
+                subscription.queue.put_nowait((received_at, event))
+            except asyncio.QueueFull:
+                # Too slow: drop what it has not read and tell it to resync
+                self.dropped += 1
+                self.unsubscribe(subscription)
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(None)
+
+    def _on_notify(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed price notification: {payload[:200]}")
+            return
+        self.publish(event)
+
+    async def listen(self) -> None:
+        await listen_channel(PRICE_CHANNEL, self._on_notify)
+
+    def start(self) -> None:
+        self._listener = asyncio.create_task(self.listen())
+
+    def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+
+    def stats(self) -> dict:
+        return {"subscribers": len(self._subscribers), "published": self.published, "dropped": self.dropped}
+
+
+price_feed = PriceFeed()
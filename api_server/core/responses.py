@@ -0,0 +1,32 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not serialise natively."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if hasattr(obj, "_asdict"):
+        return obj._asdict()
+    if hasattr(obj, "keys"):
+        return dict(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialise plain rows/dicts straight to JSON bytes, skipping jsonable_encoder."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson response that also handles Decimal columns and SQLAlchemy rows."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
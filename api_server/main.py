@@ -1,19 +1,44 @@
+import asyncio
+
 from fastapi import FastAPI
 from api_server.app.data.api.endpoints import router as data_router
+from api_server.app.dashboard.api.endpoints import router as dashboard_router
 from api_server.app.dashboard.admin import setup_admin
+from api_server.app.dashboard.service import run_kpi_refresher
+from api_server.core.database import dispose_async_engine
+from api_server.core.metadata_cache import metadata_cache
+from api_server.core.price_feed import price_feed
+from api_server.core.responses import FastJSONResponse
 # from api_server.core.config import settings
 
 app = FastAPI(
     title="ETL API Server",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 # Include API routes
 app.include_router(data_router, prefix="/api/v1", tags=["Data APIs"])
+app.include_router(dashboard_router, prefix="/api/v1/dashboard", tags=["Dashboard APIs"])
 
 # Setup SQLAdmin dashboard
 setup_admin(app)
 
+# Keep the in-memory dashboard KPIs fresh and listen for metadata and price changes in the background
+@app.on_event("startup")
+async def startup():
+    app.state.kpi_refresher = asyncio.create_task(run_kpi_refresher())
+    metadata_cache.start()
+    price_feed.start()
+
+# Stop background jobs and release pooled async DB connections on shutdown
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.kpi_refresher.cancel()
+    metadata_cache.stop()
+    price_feed.stop()
+    await dispose_async_engine()
+
 # Root health check
 @app.get("/")
 async def root():
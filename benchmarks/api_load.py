@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from api_server.app.data.service import LATEST_PRICE_COLUMNS, get_latest_price
+from api_server.core.database import dispose_async_engine, get_async_db
+from api_server.core.responses import FastJSONResponse
+from benchmarks.fixtures import seeded_prices
+from db.models.transformed import LatestPrice
+from utility.database import dispose_engine, get_db
+
+# Load test of the data endpoints, sync database access against the async engine:
+#     PR_DATABASE_URL=postgresql://... python -m benchmarks.api_load --concurrency 1 8 32 64
+#
+# Every variant serves the same latest-price primary-key lookup:
+#     blocking    async def + sync Session, the event loop waits on the database (old /input-data)
+#     threadpool  def + sync Session, run in Starlette's thread pool (old /latest-prices)
+#     async       async def + AsyncSession, the current endpoints
+# --db-latency-ms adds a pg_sleep to each request, standing in for a remote database.
+# The app runs in-process behind httpx's ASGI transport, so only the server side is measured;
+# the lookups hit a seeded source (see benchmarks.fixtures), so use a scratch database.
+# With more clients than pooled connections the blocking variant stalls: the event loop waits
+# for a connection that only a session closed on that same loop can give back, until
+# PR_DB_POOL_TIMEOUT fails the request (set it low, i.e. 2, to keep the run short).
+
+VARIANTS = ("blocking", "threadpool", "async")
+
+
+def build_app(db_latency: float) -> FastAPI:
+    app = FastAPI()
+
+    def sync_lookup(db: Session, source_id: int, product_id: int, location_id: int):
+        if db_latency:
+            db.execute(text("SELECT pg_sleep(:s)"), {"s": db_latency})
+        row = db.execute(
+            select(*LATEST_PRICE_COLUMNS)
+            .where(LatestPrice.source_id == source_id)
+            .where(LatestPrice.product_id == product_id)
+            .where(LatestPrice.location_id == location_id)
+        ).mappings().first()
+        return dict(row) if row else {}
+
+    @app.get("/blocking/{source_id}/{product_id}/{location_id}")
+    async def blocking(source_id: int, product_id: int, location_id: int, db: Session = Depends(get_db)):
+        return FastJSONResponse(sync_lookup(db, source_id, product_id, location_id))
+
+    @app.get("/threadpool/{source_id}/{product_id}/{location_id}")
+    def threadpool(source_id: int, product_id: int, location_id: int, db: Session = Depends(get_db)):
+        return FastJSONResponse(sync_lookup(db, source_id, product_id, location_id))
+
+    @app.get("/async/{source_id}/{product_id}/{location_id}")
+    async def async_(source_id: int, product_id: int, location_id: int, db: AsyncSession = Depends(get_async_db)):
+        if db_latency:
+            await db.execute(text("SELECT pg_sleep(:s)"), {"s": db_latency})
+        return FastJSONResponse(await get_latest_price(db, source_id, product_id, location_id) or {})
+
+    return app
+
+
+async def _load(client: httpx.AsyncClient, path: str, concurrency: int, seconds: float) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def user() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            errors += response.status_code != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+async def run(key: str, variants, concurrency_levels, seconds: float, db_latency: float) -> List[dict]:
+    transport = httpx.ASGITransport(app=build_app(db_latency), raise_app_exceptions=False)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for variant in variants:
+            path = f"/{variant}/{key}"
+            await _load(client, path, 4, 1.0)  # warm the pools
+            for concurrency in concurrency_levels:
+                results.append({"variant": variant, "concurrency": concurrency, **await _load(client, path, concurrency, seconds)})
+    await dispose_async_engine()
+    dispose_engine()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Sync vs async database access under concurrent load.")
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32, 64], help="Concurrent clients per round.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Length of each round.")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Extra database time per request (pg_sleep).")
+    args = parser.parse_args(argv)
+
+    with seeded_prices() as seed:
+        key = f"{seed['source_id']}/{seed['product_ids'][0]}/{seed['location_ids'][0]}"
+        results = asyncio.run(run(key, args.variants, args.concurrency, args.seconds, args.db_latency_ms / 1000))
+    print(f"{'variant':<11} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>6}")
+    for result in results:
+        print(
+            f"{result['variant']:<11} {result['concurrency']:>7} {result['rps']:>8} "
+            f"{result['p50_ms']:>8} {result['p95_ms']:>8} {result['errors']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
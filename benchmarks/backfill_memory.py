@@ -0,0 +1,118 @@
+import argparse
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import List
+
+import pandas as pd
+
+from benchmarks.fixtures import clear_raw_prices, seeded_raw_source
+from etl_pipeline.core.extract.declarative_extractor import build_table_spec, parse_table_page
+from etl_pipeline.core.loader.raw_data_store import SINK_FLUSH_ROWS, RawPriceSink, RawPriceWriter
+from utility.yaml_loader import load_yaml_config
+
+# Peak memory and time of a one-year Sunsirs backfill, before and after the write-behind sink:
+#     PR_DATABASE_URL=postgresql://... python -m benchmarks.backfill_memory --days 365 --products 200
+#
+#     append  every parsed page is pd.concat'ed onto the result so far, one save at the end
+#             (the original extract: quadratic, each page copies all rows before it)
+#     concat  every parsed page is kept, one pd.concat and one save at the end
+#     sink    pages go through RawPriceSink, one bulk save every --flush-rows rows
+# Each day is a page shaped like tests/fixtures/sunsirs_day.html with --products commodities,
+# parsed with the sunsirs table_spec and stored in raw_data for a seeded source (see
+# benchmarks.fixtures), so use a scratch database. Every strategy runs in a fresh process;
+# peak_rss_mb is that process's ru_maxrss, base_rss_mb the same after the imports.
+
+STRATEGIES = ("append", "concat", "sink")
+
+ROW = (
+    '<tr><td><a href="/uk/prodetail-{i}.html">{name}</a></td><td>Chemical</td>'
+    "<td>{previous:,.2f}</td><td>{price:,.2f}</td><td>(0.25%)</td></tr>"
+)
+
+
+def _page(day: datetime, product_names: List[str]) -> bytes:
+    rows = "\n".join(
+        ROW.format(i=i, name=name, previous=1000 + i + day.day, price=1000 + i + day.month * 10 + day.day)
+        for i, name in enumerate(product_names)
+    )
+    return (
+        "<html><body><div class='main'><table class='price-table'>"
+        f"<tr><th>Commodity</th><th>Sectors</th><th>{(day - timedelta(days=1)):%m-%d}</th><th>{day:%m-%d}</th><th>Change</th></tr>"
+        f"\n{rows}\n</table><p>Remarks: the above prices are in RMB/ton.</p></div></body></html>"
+    ).encode()
+
+
+def _pages(days: int, product_names: List[str], spec: dict):
+    first = datetime(2024, 1, 1)
+    for offset in range(days):
+        day = first + timedelta(days=offset)
+        yield day, parse_table_page(_page(day, product_names), day, spec)
+
+
+def _measure(strategy: str, source_name: str, product_names: List[str], days: int, flush_rows: int) -> dict:
+    spec = build_table_spec(load_yaml_config("etl_pipeline/core/config/websites/sunsirs.yaml"))
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    if strategy == "append":
+        final_df, peak_rows = pd.DataFrame(), 0
+        for _, df in _pages(days, product_names, spec):
+            final_df = pd.concat([final_df, df], ignore_index=True)
+            peak_rows = len(final_df)
+        writer = RawPriceWriter(df=final_df, source_name=source_name)
+        writer.save()
+        counts, writes = writer.counts, 1
+    elif strategy == "concat":
+        frames = [df for _, df in _pages(days, product_names, spec)]
+        writer = RawPriceWriter(df=pd.concat(frames, ignore_index=True), source_name=source_name)
+        writer.save()
+        counts, writes, peak_rows = writer.counts, 1, sum(len(df) for df in frames)
+    else:
+        sink = RawPriceSink(source_name, flush_rows=flush_rows, flush_seconds=None)
+        for day, df in _pages(days, product_names, spec):
+            sink.add([f"{day:%Y-%m-%d}"], df)
+        sink.close()
+        counts, writes, peak_rows = sink.counts, sink.flushes, sink.peak_buffered_rows
+    return {
+        "strategy": strategy,
+        "inserted": counts["inserted"],
+        "writes": writes,
+        "peak_buffered_rows": peak_rows,
+        "elapsed_seconds": round(time.perf_counter() - started, 2),
+        # ru_maxrss is in KiB on Linux
+        "base_rss_mb": round(base_rss / 1024, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run(strategies, days: int, products: int, flush_rows: int) -> List[dict]:
+    results = []
+    with seeded_raw_source(products) as seed:
+        for strategy in strategies:
+            clear_raw_prices(seed["source_name"])
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                results.append(pool.submit(_measure, strategy, seed["source_name"], seed["product_names"], days, flush_rows).result())
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Peak memory of a backfill: per-page concat, one final concat, or the write-behind sink.")
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=list(STRATEGIES))
+    parser.add_argument("--days", type=int, default=365, help="Daily pages in the backfill.")
+    parser.add_argument("--products", type=int, default=200, help="Commodities per page.")
+    parser.add_argument("--flush-rows", type=int, default=SINK_FLUSH_ROWS, help="Rows per bulk save of the sink.")
+    args = parser.parse_args(argv)
+
+    results = run(args.strategies, args.days, args.products, args.flush_rows)
+    print(f"{'strategy':<8} {'inserted':>9} {'writes':>6} {'peak rows':>9} {'seconds':>8} {'base MB':>8} {'peak MB':>8}")
+    for result in results:
+        print(
+            f"{result['strategy']:<8} {result['inserted']:>9} {result['writes']:>6} {result['peak_buffered_rows']:>9} "
+            f"{result['elapsed_seconds']:>8} {result['base_rss_mb']:>8} {result['peak_rss_mb']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+
+from api_server.app.data.api.endpoints import router
+from api_server.core.database import dispose_async_engine
+from benchmarks.fixtures import seeded_prices
+
+# N single price lookups against one batch call of N keys:
+#     PR_DATABASE_URL=postgresql://... python -m benchmarks.batch_lookup --keys 10 100 1000
+#
+# Both go through POST /api/v1/prices/lookup on the real router (in-process, ASGI
+# transport): "single" posts one key per request one after another, like a client
+# looping over its keys, "batch" posts all of them at once. Half the keys are exact, half
+# as-of lookups, over a seeded source (see benchmarks.fixtures), so use a scratch database.
+
+
+def _keys(seed: dict, count: int, rng: random.Random) -> List[dict]:
+    first = date.fromisoformat(seed["first_date"])
+    return [
+        {
+            "product_id": rng.choice(seed["product_ids"]),
+            "location_id": rng.choice(seed["location_ids"]),
+            "date": (first + timedelta(days=rng.randrange(seed["days"] + 30))).isoformat(),
+            "mode": "exact" if i % 2 else "asof",
+        }
+        for i in range(count)
+    ]
+
+
+async def _single(client: httpx.AsyncClient, keys: List[dict], source_id: int) -> list:
+    results = []
+    for key in keys:
+        response = await client.post("/api/v1/prices/lookup", json={"keys": [key], "source_id": source_id})
+        response.raise_for_status()
+        results.extend(response.json())
+    return results
+
+
+async def _batch(client: httpx.AsyncClient, keys: List[dict], source_id: int) -> list:
+    response = await client.post("/api/v1/prices/lookup", json={"keys": keys, "source_id": source_id})
+    response.raise_for_status()
+    return response.json()
+
+
+async def run(seed: dict, key_counts: List[int], repeat: int) -> List[dict]:
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    rng = random.Random(0)
+    results = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await _batch(client, _keys(seed, 10, rng), seed["source_id"])  # warm the pool
+        for count in key_counts:
+            keys = _keys(seed, count, rng)
+            timings = {}
+            for name, lookup in (("single", _single), ("batch", _batch)):
+                best = None
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    found = await lookup(client, keys, seed["source_id"])
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[name] = best
+                matched = sum(row["price_usd"] is not None for row in found)
+            results.append({
+                "keys": count,
+                "matched": matched,
+                "single_ms": round(timings["single"] * 1000, 1),
+                "batch_ms": round(timings["batch"] * 1000, 1),
+                "speedup": round(timings["single"] / timings["batch"], 1),
+            })
+    await dispose_async_engine()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="N single price lookups vs one batch lookup.")
+    parser.add_argument("--keys", nargs="+", type=int, default=[10, 100, 1000], help="Keys per round.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per round, the best one is reported.")
+    args = parser.parse_args(argv)
+
+    with seeded_prices() as seed:
+        results = asyncio.run(run(seed, args.keys, args.repeat))
+    print(f"{'keys':>6} {'matched':>8} {'single ms':>10} {'batch ms':>9} {'speedup':>8}")
+    for result in results:
+        print(
+            f"{result['keys']:>6} {result['matched']:>8} {result['single_ms']:>10} "
+            f"{result['batch_ms']:>9} {result['speedup']:>7}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
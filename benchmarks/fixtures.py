@@ -0,0 +1,133 @@
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import text
+
+from utility.database import get_session
+
+# Synthetic prices for the database benchmarks, written under names of their own and
+# removed again afterwards. Run the benchmarks against a scratch database.
+BENCH_PREFIX = "bench"
+
+
+def _drop_seed(session) -> None:
+    for statement in (
+        "DELETE FROM transformed.latest_price WHERE source_id IN (SELECT id FROM metadata.source WHERE name LIKE :like)",
+        "DELETE FROM transformed.products_standard_data WHERE source_id IN (SELECT id FROM metadata.source WHERE name LIKE :like)",
+        "DELETE FROM raw_data.products_raw_data WHERE source_id IN (SELECT id FROM metadata.source WHERE name LIKE :like)",
+        "DELETE FROM input.products_input_data WHERE source_id IN (SELECT id FROM metadata.source WHERE name LIKE :like)",
+        "DELETE FROM metadata.source WHERE name LIKE :like",
+        "DELETE FROM metadata.product WHERE name LIKE :like",
+        "DELETE FROM metadata.location WHERE name LIKE :like",
+        "DELETE FROM metadata.unit WHERE code LIKE :like",
+        "DELETE FROM metadata.currency WHERE name LIKE :like",
+    ):
+        session.execute(text(statement), {"like": f"{BENCH_PREFIX}-%"})
+
+
+@contextmanager
+def seeded_prices(products: int = 50, locations: int = 5, days: int = 365) -> Iterator[dict]:
+    """
+    Seed one source with `products` x `locations` daily price series of `days` days, plus
+    their latest_price rows.
+    Yields:
+        dict: source_id, product_ids, location_ids, first_date (ISO) and days of the seed.
+    """
+    session = get_session()
+    # Leftovers of an interrupted run
+    _drop_seed(session)
+    try:
+        source_id = session.execute(
+            text("INSERT INTO metadata.source (name) VALUES (:name) RETURNING id"), {"name": f"{BENCH_PREFIX}-source"}
+        ).scalar()
+        product_ids: List[int] = [
+            session.execute(
+                text("INSERT INTO metadata.product (name) VALUES (:name) RETURNING id"), {"name": f"{BENCH_PREFIX}-product-{i}"}
+            ).scalar()
+            for i in range(products)
+        ]
+        location_ids: List[int] = [
+            session.execute(
+                text("INSERT INTO metadata.location (name) VALUES (:name) RETURNING id"), {"name": f"{BENCH_PREFIX}-location-{i}"}
+            ).scalar()
+            for i in range(locations)
+        ]
+        params = {"source_id": source_id, "product_ids": product_ids, "location_ids": location_ids, "days": days}
+        session.execute(text("""
+            INSERT INTO transformed.products_standard_data (source_id, product_id, location_id, price_usd, source_date)
+            SELECT :source_id, p, l, 100 + (p * 7 + l * 3 + d) % 50, DATE '2024-01-01' + d
+            FROM unnest(CAST(:product_ids AS int[])) AS p,
+                 unnest(CAST(:location_ids AS int[])) AS l,
+                 generate_series(0, :days - 1) AS d
+        """), params)
+        session.execute(text("""
+            INSERT INTO transformed.latest_price (source_id, product_id, location_id, price_usd, source_date, standard_data_id)
+            SELECT DISTINCT ON (product_id, location_id) source_id, product_id, location_id, price_usd, source_date, id
+            FROM transformed.products_standard_data
+            WHERE source_id = :source_id
+            ORDER BY product_id, location_id, source_date DESC
+        """), params)
+        session.commit()
+        yield {
+            "source_id": source_id,
+            "product_ids": product_ids,
+            "location_ids": location_ids,
+            "first_date": "2024-01-01",
+            "days": days,
+        }
+    finally:
+        session.rollback()
+        _drop_seed(session)
+        session.commit()
+        session.close()
+
+
+def clear_raw_prices(source_name: str) -> None:
+    """Delete the raw rows stored for a seeded source, so the next run inserts them again."""
+    session = get_session()
+    try:
+        session.execute(
+            text("DELETE FROM raw_data.products_raw_data WHERE source_id = (SELECT id FROM metadata.source WHERE name = :name)"),
+            {"name": source_name},
+        )
+        session.commit()
+    finally:
+        session.close()
+
+
+@contextmanager
+def seeded_raw_source(products: int = 200) -> Iterator[dict]:
+    """
+    Seed one source with `products` product inputs, the mapping `RawPriceWriter` needs to
+    store scraped rows.
+    Yields:
+        dict: source_name and product_names of the seed.
+    """
+    session = get_session()
+    _drop_seed(session)
+    try:
+        source_id = session.execute(
+            text("INSERT INTO metadata.source (name) VALUES (:name) RETURNING id"), {"name": f"{BENCH_PREFIX}-raw-source"}
+        ).scalar()
+        unit_id = session.execute(
+            text("INSERT INTO metadata.unit (code) VALUES (:code) RETURNING id"), {"code": f"{BENCH_PREFIX}-unit"}
+        ).scalar()
+        currency_id = session.execute(
+            text("INSERT INTO metadata.currency (code, name) VALUES ('BENCH', :name) RETURNING id"), {"name": f"{BENCH_PREFIX}-currency"}
+        ).scalar()
+        product_names = [f"{BENCH_PREFIX}-raw-product-{i}" for i in range(products)]
+        session.execute(text("""
+            WITH products AS (
+                INSERT INTO metadata.product (name) SELECT unnest(CAST(:names AS text[])) RETURNING id
+            )
+            INSERT INTO input.products_input_data
+                (source_id, product_id, input_currency_id, input_unit_id, expected_unit_id, input_quantity)
+            SELECT :source_id, id, :currency_id, :unit_id, :unit_id, 1 FROM products
+        """), {"names": product_names, "source_id": source_id, "currency_id": currency_id, "unit_id": unit_id})
+        session.commit()
+        yield {"source_name": f"{BENCH_PREFIX}-raw-source", "product_names": product_names}
+    finally:
+        session.rollback()
+        _drop_seed(session)
+        session.commit()
+        session.close()
@@ -0,0 +1,80 @@
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api_server.core.responses import FastJSONResponse
+
+# Response serialisation of the data endpoints, stdlib json against orjson:
+#     python -m benchmarks.json_serialisation --rows 10000
+#
+#     stdlib   FastAPI's default path: jsonable_encoder, then JSONResponse (json.dumps)
+#     orjson   FastJSONResponse, rows rendered as they come from the database
+# The rows have the shape of the latest-price rows (ints, Decimal prices, dates and a
+# timestamp, some NULLs). No database needed.
+
+
+def _rows(count: int) -> List[dict]:
+    rng = random.Random(0)
+    first = date(2024, 1, 1)
+    return [
+        {
+            "source_id": rng.randrange(1, 10),
+            "product_id": rng.randrange(1, 500),
+            "location_id": rng.choice([None, *range(1, 40)]),
+            "quantity": Decimal("1.0000"),
+            "unit_id": rng.randrange(1, 20),
+            "price_usd": Decimal(rng.randrange(1_000_000, 100_000_000)) / Decimal(10_000),
+            "source_date": first + timedelta(days=rng.randrange(365)),
+            "last_update": datetime(2025, 1, 1) + timedelta(seconds=rng.randrange(10_000_000)),
+        }
+        for _ in range(count)
+    ]
+
+
+def _stdlib(rows: List[dict]) -> bytes:
+    return JSONResponse(jsonable_encoder(rows)).body
+
+
+def _orjson(rows: List[dict]) -> bytes:
+    return FastJSONResponse(rows).body
+
+
+def _best_of(render: Callable[[List[dict]], bytes], rows: List[dict], repeat: int) -> tuple:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = render(rows)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, body
+
+
+def run(row_counts: List[int], repeat: int) -> List[dict]:
+    results = []
+    for count in row_counts:
+        rows = _rows(count)
+        for name, render in (("stdlib", _stdlib), ("orjson", _orjson)):
+            elapsed, body = _best_of(render, rows, repeat)
+            results.append({"serialiser": name, "rows": count, "ms": round(elapsed * 1000, 2), "bytes": len(body)})
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="stdlib json vs orjson response rendering.")
+    parser.add_argument("--rows", nargs="+", type=int, default=[1000, 10000], help="Rows per response.")
+    parser.add_argument("--repeat", type=int, default=5, help="Renders per case, the best one is reported.")
+    args = parser.parse_args(argv)
+
+    print(f"{'serialiser':<10} {'rows':>6} {'ms':>9} {'bytes':>10}")
+    for result in run(args.rows, args.repeat):
+        print(f"{result['serialiser']:<10} {result['rows']:>6} {result['ms']:>9} {result['bytes']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+
+import requests
+
+from etl_pipeline.core.extract.declarative_extractor import build_table_spec, parse_table_page
+from etl_pipeline.core.extract.host_limiter import OK, HostLimiter, SharedHostLimits, outcome_for_status
+from utility.cache import get_redis
+from utility.work_queue import WorkQueue, consume
+from utility.yaml_loader import load_yaml_config
+
+# Throughput of the work queue as workers are added, against a host that refuses overload:
+#     python -m benchmarks.work_queue --workers 1 2 4 8 --units 400 --latency-ms 20 --server-limit 4
+#
+# Every worker is a thread running `consume` on one queue, with a HostLimiter of its own as
+# each `etl worker` process has. A unit is a real page fetch: a GET to a local HTTP server
+# that answers with tests/fixtures/sunsirs_day.html after --latency-ms, or with a 429 when
+# more than --server-limit requests are in flight, and the sunsirs table_spec parse of it.
+# A 429 nacks the unit, so it is fetched again. In the "shared" mode the limiters share a
+# SharedHostLimits capped at --host-limit, in the "local" mode each only knows its own
+# requests (the limiters before sharing). The queue lives on REDIS_URL, the in-process
+# stand-in with REDIS_URL=memory://.
+
+QUEUE_NAME = "bench"
+MODES = ("shared", "local")
+FIXTURE = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "sunsirs_day.html"
+FIXTURE_DATE = datetime(2025, 3, 31)
+
+
+class PageServer(ThreadingHTTPServer):
+    """Serves the fixture page slowly and refuses more than `limit` requests at once."""
+
+    daemon_threads = True
+
+    def __init__(self, latency_seconds: float, limit: int):
+        super().__init__(("127.0.0.1", 0), PageHandler)
+        self.page = FIXTURE.read_bytes()
+        self.latency_seconds = latency_seconds
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.refused = 0
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            refuse = server.in_flight > server.limit
+            server.refused += refuse
+        try:
+            time.sleep(server.latency_seconds)
+            status, body = (429, b"") if refuse else (200, server.page)
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            if refuse:
+                self.send_header("Retry-After", "0")
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _clear(queue: WorkQueue) -> None:
+    queue.client.delete(*(queue._key(part) for part in ("ready", "processing", "leases", "units", "attempts", "errors", "dead")))
+
+
+def _round(mode: str, workers: int, units: int, latency_seconds: float, server_limit: int, host_limit: int) -> dict:
+    spec = build_table_spec(load_yaml_config("etl_pipeline/core/config/websites/sunsirs.yaml"))
+    server = PageServer(latency_seconds, server_limit)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"127.0.0.1:{server.server_port}"
+    queue = WorkQueue(QUEUE_NAME, client=get_redis(), retry_delay_seconds=0)
+    _clear(queue)
+    queue.enqueue([{"id": str(i), "url": f"http://{host}/day/{i}"} for i in range(units)])
+    rows = []
+
+    def work(_) -> int:
+        shared = SharedHostLimits(host, queue.client, limit=host_limit) if mode == "shared" else None
+        limiter = HostLimiter(host, initial=host_limit, max_limit=host_limit, shared=shared)
+        http = requests.Session()
+
+        def handle(unit: dict) -> None:
+            limiter.acquire()
+            started, outcome = time.monotonic(), OK
+            try:
+                response = http.get(unit["url"], timeout=30)
+                outcome = outcome_for_status(response.status_code)
+            finally:
+                limiter.release(time.monotonic() - started, outcome, retry_after=0 if outcome != OK else None)
+            response.raise_for_status()
+            rows.append(len(parse_table_page(response.content, FIXTURE_DATE, spec)))
+            queue.ack(unit["id"])
+
+        return consume(queue, handle, drain=True, idle_seconds=0.01, reap_seconds=0.05)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        handled = sum(pool.map(work, range(workers)))
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+    server.server_close()
+    stats = queue.stats()
+    _clear(queue)
+    queue.client.delete(f"pr:host:{host}:slots", f"pr:host:{host}:paused_until")
+    return {
+        "mode": mode,
+        "workers": workers,
+        "units": units,
+        "handled": handled,
+        "refused": server.refused,
+        "peak_in_flight": server.peak_in_flight,
+        "dead": stats["dead"],
+        "rows": sum(rows),
+        "elapsed_seconds": round(elapsed, 2),
+        "units_per_second": round(units / elapsed, 1),
+    }
+
+
+def run(modes: List[str], worker_counts: List[int], units: int, latency_seconds: float, server_limit: int, host_limit: int) -> List[dict]:
+    results = []
+    for mode in modes:
+        rounds = [_round(mode, workers, units, latency_seconds, server_limit, host_limit) for workers in worker_counts]
+        for result in rounds:
+            result["speedup"] = round(result["units_per_second"] / rounds[0]["units_per_second"], 2)
+        results.extend(rounds)
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Work queue throughput by number of workers, against a rate-limited host.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, 8], help="Worker threads per round.")
+    parser.add_argument("--units", type=int, default=400, help="Pages per round.")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Time the server takes per page.")
+    parser.add_argument("--server-limit", type=int, default=4, help="Requests the server serves at once, more get a 429.")
+    parser.add_argument("--host-limit", type=int, default=4, help="Cap of the shared limits (HOST_CLUSTER_CONCURRENCY).")
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'mode':<6} {'workers':>7} {'units':>6} {'handled':>7} {'refused':>7} {'peak':>4} {'dead':>4} "
+        f"{'rows':>6} {'seconds':>8} {'units/s':>8} {'speedup':>7}"
+    )
+    for result in run(args.modes, args.workers, args.units, args.latency_ms / 1000, args.server_limit, args.host_limit):
+        print(
+            f"{result['mode']:<6} {result['workers']:>7} {result['units']:>6} {result['handled']:>7} {result['refused']:>7} "
+            f"{result['peak_in_flight']:>4} {result['dead']:>4} {result['rows']:>6} {result['elapsed_seconds']:>8} "
+            f"{result['units_per_second']:>8} {result['speedup']:>6}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 # db/models/__init__.py
-from db.models.metadata import Source, Product, Location, Unit, Currency
+from db.models.metadata import Source, Product, Location, Unit, Currency, RunLease, RunCheckpoint
 from db.models.input import ProductInput
 from db.models.raw_data import PriceRaw
-from db.models.transformed import PriceStandardized
+from db.models.transformed import PriceStandardized, LatestPrice, SourceKpi
 
 # Optionally expose Base for Alembic
 from db.models.base import Base
@@ -24,10 +24,10 @@ else:
     print(f".env file not found at {env_file_path}")
 
 # Import your models here
-from db.models.metadata import Source, Currency, Unit, Location, Product
+from db.models.metadata import Source, Currency, Unit, Location, Product, RunLease, RunCheckpoint
 from db.models.input import ProductInput
 from db.models.raw_data import PriceRaw
-from db.models.transformed import PriceStandardized
+from db.models.transformed import PriceStandardized, LatestPrice, SourceKpi
 
 # Alembic Config object
 config = context.config
@@ -0,0 +1,43 @@
+"""Run lease table for pipeline run coordination
+
+Revision ID: 2c6e9d4a7b15
+Revises: f3b81c6e2a09
+Create Date: 2025-06-02 10:48:19.027416
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c6e9d4a7b15'
+down_revision: Union[str, None] = 'f3b81c6e2a09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('run_lease',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source', sa.String(length=255), nullable=False),
+    sa.Column('stage', sa.String(length=50), nullable=False),
+    sa.Column('range_start', sa.Date(), nullable=True),
+    sa.Column('range_end', sa.Date(), nullable=True),
+    sa.Column('holder', sa.String(length=255), nullable=False),
+    sa.Column('acquired_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('released_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    schema='metadata'
+    )
+    # Active leases are looked up by source and stage
+    op.create_index('ix_run_lease_active', 'run_lease', ['source', 'stage'], unique=False, schema='metadata', postgresql_where=sa.text('released_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_run_lease_active', table_name='run_lease', schema='metadata')
+    op.drop_table('run_lease', schema='metadata')
@@ -0,0 +1,43 @@
+"""Backfill products_standard_data.last_update and make it NOT NULL
+
+Revision ID: 4d8c2b6f1e37
+Revises: 9a4f7e2c81d6
+Create Date: 2025-06-06 10:12:41.208337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d8c2b6f1e37'
+down_revision: Union[str, None] = '9a4f7e2c81d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The change feed and the price stream order and resume on (last_update, id); rows
+    # without a last_update could never be handed out. Stamp them now (UTC, like the
+    # writers) so clients pick them up on their next sync.
+    op.execute(
+        "UPDATE transformed.products_standard_data "
+        "SET last_update = now() AT TIME ZONE 'utc' WHERE last_update IS NULL"
+    )
+    op.alter_column('products_standard_data', 'last_update',
+               existing_type=sa.DateTime(),
+               existing_server_default=sa.text('now()'),
+               nullable=False,
+               schema='transformed')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('products_standard_data', 'last_update',
+               existing_type=sa.DateTime(),
+               existing_server_default=sa.text('now()'),
+               nullable=True,
+               schema='transformed')
@@ -0,0 +1,41 @@
+"""Source KPI table for the dashboard
+
+Revision ID: 5b9f03d6ae42
+Revises: c41e8b7f2d35
+Create Date: 2025-05-26 15:40:11.238760
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9f03d6ae42'
+down_revision: Union[str, None] = 'c41e8b7f2d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('source_kpi',
+    sa.Column('source_id', sa.Integer(), nullable=False),
+    sa.Column('latest_raw_date', sa.Date(), nullable=True),
+    sa.Column('latest_source_date', sa.Date(), nullable=True),
+    sa.Column('transform_lag_days', sa.Integer(), nullable=True),
+    sa.Column('untransformed_rows', sa.Integer(), nullable=False),
+    sa.Column('missing_days', sa.Integer(), nullable=False),
+    sa.Column('daily_counts', sa.JSON(), nullable=True),
+    sa.Column('gap_dates', sa.JSON(), nullable=True),
+    sa.Column('computed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['source_id'], ['metadata.source.id'], ),
+    sa.PrimaryKeyConstraint('source_id'),
+    schema='transformed'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('source_kpi', schema='transformed')
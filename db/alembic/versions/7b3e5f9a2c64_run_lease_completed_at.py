@@ -0,0 +1,31 @@
+"""Completed state of run leases
+
+Revision ID: 7b3e5f9a2c64
+Revises: 4d8c2b6f1e37
+Create Date: 2025-06-06 14:47:09.531806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e5f9a2c64'
+down_revision: Union[str, None] = '4d8c2b6f1e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('run_lease', sa.Column('completed_at', sa.DateTime(), nullable=True), schema='metadata')
+    # Completed slices are looked up by source and stage
+    op.create_index('ix_run_lease_completed', 'run_lease', ['source', 'stage'], unique=False, schema='metadata', postgresql_where=sa.text('completed_at IS NOT NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_run_lease_completed', table_name='run_lease', schema='metadata')
+    op.drop_column('run_lease', 'completed_at', schema='metadata')
@@ -0,0 +1,53 @@
+"""NOTIFY triggers on metadata and input config tables
+
+Revision ID: 8e2a6d1c4f73
+Revises: 5b9f03d6ae42
+Create Date: 2025-05-28 10:12:47.519304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2a6d1c4f73'
+down_revision: Union[str, None] = '5b9f03d6ae42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables whose changes invalidate the API metadata cache
+NOTIFY_TABLES = (
+    ('metadata', 'source'),
+    ('metadata', 'product'),
+    ('metadata', 'location'),
+    ('metadata', 'unit'),
+    ('metadata', 'currency'),
+    ('input', 'products_input_data'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+    CREATE OR REPLACE FUNCTION metadata.notify_metadata_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('pr_metadata_changed', TG_TABLE_SCHEMA || '.' || TG_TABLE_NAME);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    for schema, table in NOTIFY_TABLES:
+        # Statement level: one notification per statement, not per row
+        op.execute(f"""
+        CREATE TRIGGER {table}_notify_changed
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {schema}.{table}
+        FOR EACH STATEMENT EXECUTE FUNCTION metadata.notify_metadata_changed()
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for schema, table in NOTIFY_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_changed ON {schema}.{table}")
+    op.execute("DROP FUNCTION IF EXISTS metadata.notify_metadata_changed()")
@@ -0,0 +1,39 @@
+"""Run checkpoint table for resumable backfills
+
+Revision ID: 9a4f7e2c81d6
+Revises: 2c6e9d4a7b15
+Create Date: 2025-06-04 16:22:53.714092
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f7e2c81d6'
+down_revision: Union[str, None] = '2c6e9d4a7b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('run_checkpoint',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source', sa.String(length=255), nullable=False),
+    sa.Column('unit_key', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('detail', sa.Text(), nullable=True),
+    sa.Column('last_update', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('source', 'unit_key', name='uq_checkpoint_source_unit'),
+    schema='metadata'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('run_checkpoint', schema='metadata')
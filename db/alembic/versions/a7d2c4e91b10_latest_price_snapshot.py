@@ -0,0 +1,57 @@
+"""Latest price snapshot
+
+Revision ID: a7d2c4e91b10
+Revises: e3c1f6a5d0c2
+Create Date: 2025-05-12 09:14:02.481337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2c4e91b10'
+down_revision: Union[str, None] = 'e3c1f6a5d0c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('latest_price',
+    sa.Column('source_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.DECIMAL(precision=18, scale=4), nullable=True),
+    sa.Column('unit_id', sa.Integer(), nullable=True),
+    sa.Column('price_usd', sa.DECIMAL(precision=18, scale=4), nullable=False),
+    sa.Column('source_date', sa.Date(), nullable=False),
+    sa.Column('standard_data_id', sa.Integer(), nullable=True),
+    sa.Column('last_update', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['location_id'], ['metadata.location.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['metadata.product.id'], ),
+    sa.ForeignKeyConstraint(['source_id'], ['metadata.source.id'], ),
+    sa.ForeignKeyConstraint(['standard_data_id'], ['transformed.products_standard_data.id'], ),
+    sa.ForeignKeyConstraint(['unit_id'], ['metadata.unit.id'], ),
+    sa.PrimaryKeyConstraint('source_id', 'product_id', 'location_id'),
+    schema='transformed'
+    )
+    # Seed the snapshot from the existing history so it is usable right after the upgrade.
+    op.execute(
+        """
+        INSERT INTO transformed.latest_price
+            (source_id, product_id, location_id, quantity, unit_id, price_usd, source_date, standard_data_id)
+        SELECT DISTINCT ON (source_id, product_id, location_id)
+            source_id, product_id, location_id, quantity, unit_id, price_usd, source_date, id
+        FROM transformed.products_standard_data
+        WHERE location_id IS NOT NULL
+        ORDER BY source_id, product_id, location_id, source_date DESC, id DESC
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('latest_price', schema='transformed')
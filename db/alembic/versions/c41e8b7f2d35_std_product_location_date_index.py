@@ -0,0 +1,28 @@
+"""Index products_standard_data on product, location, date
+
+Revision ID: c41e8b7f2d35
+Revises: a7d2c4e91b10
+Create Date: 2025-05-19 11:02:47.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e8b7f2d35'
+down_revision: Union[str, None] = 'a7d2c4e91b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_std_product_location_date', 'products_standard_data', ['product_id', 'location_id', 'source_date'], unique=False, schema='transformed')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_std_product_location_date', table_name='products_standard_data', schema='transformed')
@@ -0,0 +1,28 @@
+"""Index products_standard_data on last_update, id for the change feed
+
+Revision ID: d07f5a3b9e18
+Revises: 8e2a6d1c4f73
+Create Date: 2025-05-29 09:31:05.664120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd07f5a3b9e18'
+down_revision: Union[str, None] = '8e2a6d1c4f73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_std_last_update_id', 'products_standard_data', ['last_update', 'id'], unique=False, schema='transformed')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_std_last_update_id', table_name='products_standard_data', schema='transformed')
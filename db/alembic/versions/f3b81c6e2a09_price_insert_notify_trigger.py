@@ -0,0 +1,51 @@
+"""NOTIFY trigger on products_standard_data inserts for the price stream
+
+Revision ID: f3b81c6e2a09
+Revises: d07f5a3b9e18
+Create Date: 2025-05-30 14:05:22.381947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b81c6e2a09'
+down_revision: Union[str, None] = 'd07f5a3b9e18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Delivered by Postgres on commit only; the payload is far below the 8000 byte limit
+    op.execute("""
+    CREATE OR REPLACE FUNCTION transformed.notify_price_inserted() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('pr_price_inserted', json_build_object(
+            'id', NEW.id,
+            'source_id', NEW.source_id,
+            'product_id', NEW.product_id,
+            'location_id', NEW.location_id,
+            'quantity', NEW.quantity,
+            'unit_id', NEW.unit_id,
+            'price_usd', NEW.price_usd,
+            'source_date', NEW.source_date,
+            'last_update', to_char(NEW.last_update, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+        )::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+    CREATE TRIGGER products_standard_data_notify_inserted
+    AFTER INSERT ON transformed.products_standard_data
+    FOR EACH ROW EXECUTE FUNCTION transformed.notify_price_inserted()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS products_standard_data_notify_inserted ON transformed.products_standard_data")
+    op.execute("DROP FUNCTION IF EXISTS transformed.notify_price_inserted()")
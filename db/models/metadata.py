@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, Boolean, ForeignKey, DateTime, Date, Text, func, UniqueConstraint
+from sqlalchemy import Column, Integer, Float, String, Boolean, ForeignKey, DateTime, Date, Text, func, text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from db.models.base import Base
 
@@ -153,4 +153,60 @@ class ExchangeRate(Base):
     to_currency = relationship("Currency", foreign_keys=[to_currency_id])
 
     def __repr__(self):
-        return f"<ExchangeRate({self.date} | {self.from_currency.code} → {self.to_currency.code} = {self.average_rate})>"
\ No newline at end of file
+        return f"<ExchangeRate({self.date} | {self.from_currency.code} → {self.to_currency.code} = {self.average_rate})>"
+
+# To store which pipeline run currently owns a slice of work, and which slices were completed.
+# i.e: (sunsirs, extract, 2025-04-01, 2025-04-07, 'sunsirs_etl/scheduled__2025-04-08/extract/0').
+class RunLease(Base):
+    __tablename__ = "run_lease"
+    __table_args__ = (
+        # Active leases are looked up by source and stage
+        Index("ix_run_lease_active", "source", "stage", postgresql_where=text("released_at IS NULL")),
+        # Completed slices keep blocking reruns of the dates they cover
+        Index("ix_run_lease_completed", "source", "stage", postgresql_where=text("completed_at IS NOT NULL")),
+        {"schema": "metadata"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String(255), nullable=False)
+    stage = Column(String(50), nullable=False)
+    # Null bounds mean the lease covers every date of the source and stage
+    range_start = Column(Date, nullable=True)
+    range_end = Column(Date, nullable=True)
+    holder = Column(String(255), nullable=False)
+    acquired_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)
+    released_at = Column(DateTime, nullable=True)
+    # Set when the run finished the whole slice, not only let go of it
+    completed_at = Column(DateTime, nullable=True)
+
+    def __str__(self):
+        return f"{self.source} - {self.stage} - {self.range_start} to {self.range_end} ({self.holder})"
+
+    def __repr__(self):
+        return f"<RunLease(id={self.id}, source={self.source}, stage={self.stage}, holder={self.holder}, expires_at={self.expires_at})>"
+
+
+# To store completed (or failed) units of extraction work, so reruns resume after them.
+# i.e: (sunsirs, '2025-04-01', done, 1), (exchange_rate, 'USD-INR:2024-05', failed, 2).
+class RunCheckpoint(Base):
+    __tablename__ = "run_checkpoint"
+    __table_args__ = (
+        UniqueConstraint("source", "unit_key", name="uq_checkpoint_source_unit"),
+        {"schema": "metadata"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String(255), nullable=False)
+    unit_key = Column(String(255), nullable=False)
+    # done: stored, skipped on resume; empty / failed: retried on resume
+    status = Column(String(20), nullable=False)
+    attempts = Column(Integer, nullable=False, server_default="0")
+    detail = Column(Text, nullable=True)
+    last_update = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def __str__(self):
+        return f"{self.source} - {self.unit_key} - {self.status}"
+
+    def __repr__(self):
+        return f"<RunCheckpoint(source={self.source}, unit_key={self.unit_key}, status={self.status}, attempts={self.attempts})>"
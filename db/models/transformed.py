@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DECIMAL, ForeignKey, DateTime, func, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Date, DECIMAL, ForeignKey, DateTime, Index, JSON, func, UniqueConstraint
 from sqlalchemy.orm import relationship
 from db.models.base import Base
 
@@ -14,6 +14,10 @@ class PriceStandardized(Base):
             "source_date",
             name="uq_std_source_product_location_date"
         ),
+        # Serves product/location/date lookups that are not scoped to a source
+        Index("ix_std_product_location_date", "product_id", "location_id", "source_date"),
+        # Change-feed cursor order
+        Index("ix_std_last_update_id", "last_update", "id"),
         {"schema": "transformed"},
     )
 
@@ -26,7 +30,8 @@ class PriceStandardized(Base):
     price_usd = Column(DECIMAL(18, 4), nullable=False)
     source_date = Column(Date, nullable=False)
     raw_data_id = Column(Integer, ForeignKey("raw_data.products_raw_data.id"), nullable=True)
-    last_update = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # Change-feed position, never NULL
+    last_update = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
 
     product = relationship("db.models.metadata.Product", primaryjoin="db.models.metadata.Product.id == PriceStandardized.product_id")
     source = relationship("db.models.metadata.Source", primaryjoin="db.models.metadata.Source.id == PriceStandardized.source_id")
@@ -37,4 +42,56 @@ class PriceStandardized(Base):
         return f"{self.product.name} - {self.location.name} - {self.unit.code} - {self.price_usd}"
     
     def __repr__(self):
-        return f"<PriceStandardized(id={self.id}, product_id={self.product_id}, location_id={self.location_id}, price_usd={self.price_usd})>"
\ No newline at end of file
+        return f"<PriceStandardized(id={self.id}, product_id={self.product_id}, location_id={self.location_id}, price_usd={self.price_usd})>"
+
+# To store the most recent standardized price per (source, product, location)
+# i.e: (sunsirs, Hydrofluoric acid, India, 1000.0000, 2025-04-01)
+class LatestPrice(Base):
+    __tablename__ = "latest_price"
+    __table_args__ = {"schema": "transformed"}
+
+    source_id = Column(Integer, ForeignKey("metadata.source.id"), primary_key=True)
+    product_id = Column(Integer, ForeignKey("metadata.product.id"), primary_key=True)
+    location_id = Column(Integer, ForeignKey("metadata.location.id"), primary_key=True)
+    quantity = Column(DECIMAL(18, 4))
+    unit_id = Column(Integer, ForeignKey("metadata.unit.id"))
+    price_usd = Column(DECIMAL(18, 4), nullable=False)
+    source_date = Column(Date, nullable=False)
+    standard_data_id = Column(Integer, ForeignKey("transformed.products_standard_data.id"), nullable=True)
+    last_update = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    product = relationship("db.models.metadata.Product", primaryjoin="db.models.metadata.Product.id == LatestPrice.product_id")
+    source = relationship("db.models.metadata.Source", primaryjoin="db.models.metadata.Source.id == LatestPrice.source_id")
+    location = relationship("db.models.metadata.Location", primaryjoin="db.models.metadata.Location.id == LatestPrice.location_id")
+    unit = relationship("db.models.metadata.Unit", primaryjoin="db.models.metadata.Unit.id == LatestPrice.unit_id")
+
+    def __str__(self):
+        return f"{self.product.name} - {self.location.name} - {self.price_usd} ({self.source_date})"
+
+    def __repr__(self):
+        return f"<LatestPrice(source_id={self.source_id}, product_id={self.product_id}, location_id={self.location_id}, source_date={self.source_date})>"
+
+
+# To store precomputed dashboard KPIs per source, refreshed by the API's background job
+# i.e: (sunsirs, 2025-04-01, 2025-04-01, 0, 0, 2, {"2025-04-01": 120, ...}, ["2025-03-29", "2025-03-30"])
+class SourceKpi(Base):
+    __tablename__ = "source_kpi"
+    __table_args__ = {"schema": "transformed"}
+
+    source_id = Column(Integer, ForeignKey("metadata.source.id"), primary_key=True)
+    latest_raw_date = Column(Date, nullable=True)
+    latest_source_date = Column(Date, nullable=True)
+    transform_lag_days = Column(Integer, nullable=True)
+    untransformed_rows = Column(Integer, nullable=False, default=0)
+    missing_days = Column(Integer, nullable=False, default=0)
+    daily_counts = Column(JSON, nullable=True)
+    gap_dates = Column(JSON, nullable=True)
+    computed_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    source = relationship("db.models.metadata.Source", primaryjoin="db.models.metadata.Source.id == SourceKpi.source_id")
+
+    def __str__(self):
+        return f"{self.source.name} - {self.latest_source_date} (lag {self.transform_lag_days})"
+
+    def __repr__(self):
+        return f"<SourceKpi(source_id={self.source_id}, latest_source_date={self.latest_source_date}, computed_at={self.computed_at})>"
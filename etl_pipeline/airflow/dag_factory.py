@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from airflow import DAG
+from airflow.exceptions import AirflowSkipException
+from airflow.operators.python import PythonOperator
+
+from etl_pipeline.core.config.registry import WEBSITES_CONFIG_DIR, accepts_resume, build_extractor, import_path, load_website_configs
+
+# Builds the extract/transform DAGs of every website from its YAML config.
+# Only Airflow and the config registry (PyYAML) are imported here: the scheduler re-parses
+# the DAG folder every cycle, so pipeline code (pandas, bs4, proxies, SQLAlchemy models) is
+# imported inside the task callables, which run on the workers.
+
+# Defaults for the `dags` block of a website YAML
+DEFAULT_DAG_SETTINGS = {
+    "start_date": "2025-01-01",
+    # Schedule of the full <source>_etl DAG; the standalone extract/transform DAGs are
+    # manual-only unless given their own schedule
+    "schedule": "@daily",
+    "extract_schedule": None,
+    "transform_schedule": None,
+    "max_active_runs": 1,
+    # Dates per mapped extract task, and how many of them may run at once per DAG run
+    "chunk_days": 7,
+    "max_parallel_chunks": 8,
+    # Slots of the <source>_pool shared by the extract tasks of all runs of the source
+    "pool_slots": 4,
+}
+
+PLANNER_METHOD = "plan_date_chunks"
+# Extractors with checkpoints report which pages of a range are still to do
+PENDING_METHOD = "pending_targets"
+
+
+def _logger():
+    from utility.logger import get_logger
+    return get_logger()
+
+
+def _holder(ti):
+    """Lease holder name identifying this task instance."""
+    return f"{ti.dag_id}/{ti.run_id}/{ti.task_id}/{ti.map_index}" if ti else None
+
+
+def _plan(source: str, extractor: Optional[str], config_file: str, chunk_days: int, pool: str, pool_slots: int) -> List[List[Optional[str]]]:
+    from airflow.models import Pool
+    from utility.database import session_scope
+
+    logger = _logger()
+    # Created at run time, the DAG file itself never touches the database
+    Pool.create_or_update_pool(pool, slots=pool_slots, description=f"{source} extraction", include_deferred=False)
+
+    with session_scope() as session:
+        instance = build_extractor(source, extractor, config_file, session)
+        if hasattr(instance, PLANNER_METHOD):
+            chunks = getattr(instance, PLANNER_METHOD)(chunk_days)
+        else:
+            # Extractor cannot be sharded: one chunk covering its whole pending range
+            chunks = [[None, None]]
+    logger.info(f"Planned {source} extraction chunks: {chunks}")
+    return chunks
+
+
+def _extract_chunk(start_date: Optional[str], end_date: Optional[str], source: str, extractor: Optional[str], config_file: str, ti=None):
+    from utility.database import session_scope
+    from utility.run_lease import run_lease
+
+    logger = _logger()
+    range_start = date.fromisoformat(start_date) if start_date else None
+    range_end = date.fromisoformat(end_date) if end_date else None
+    # Only one run (of any DAG of the source) scrapes a given date range at a time, and a
+    # range some run completed is not scraped again
+    with run_lease(source, "extract", range_start, range_end, holder=_holder(ti)) as lease:
+        if not lease:
+            raise AirflowSkipException(f"Extraction of {source} {start_date} to {end_date} is owned by another run or done")
+        try:
+            with session_scope() as session:
+                instance = build_extractor(source, extractor, config_file, session)
+                # Task retries and reruns skip what an earlier attempt already stored
+                kwargs = {"resume": True} if accepts_resume(instance) else {}
+                if start_date and end_date:
+                    extracted_data = instance.extract(start_date=start_date, end_date=end_date, **kwargs)
+                else:
+                    extracted_data = instance.extract(**kwargs)
+                if range_start and range_end and hasattr(instance, PENDING_METHOD):
+                    if not getattr(instance, PENDING_METHOD)(range_start, range_end):
+                        lease.complete()
+            logger.info(f"Extracted {source} data for {start_date} to {end_date}: {extracted_data}")
+        except Exception as e:
+            # The task fails and Airflow retries it; the lease is released, not completed
+            logger.error(f"Error during {source} extraction of {start_date} to {end_date}: {str(e)}")
+            raise
+
+
+def _transform(source: str, transformer: str, ti=None):
+    from utility.database import session_scope
+    from utility.run_lease import run_lease
+
+    logger = _logger()
+    # The transform covers every pending raw row, so one run at a time for the whole source
+    with run_lease(source, "transform", holder=_holder(ti)) as lease:
+        if not lease:
+            raise AirflowSkipException(f"{source} transform is already running in another run")
+        try:
+            with session_scope() as session:
+                transformed_data = import_path(transformer)(session=session).transform()
+            logger.info(f"Transformed {source} data: {transformed_data}")
+        except Exception as e:
+            logger.error(f"Error during {source} transformation: {str(e)}")
+            raise
+
+
+def _sharded_extract(source: str, config: dict, settings: dict):
+    """Plan the pending dates up front and fan the chunks out as mapped extract tasks."""
+    pool = f"{source}_pool"
+    plan = PythonOperator(
+        task_id="plan",
+        python_callable=_plan,
+        op_kwargs={
+            "source": source,
+            "extractor": config.get("extractor"),
+            "config_file": config["config_file"],
+            "chunk_days": settings["chunk_days"],
+            "pool": pool,
+            "pool_slots": settings["pool_slots"],
+        },
+    )
+    extract = PythonOperator.partial(
+        task_id="extract",
+        python_callable=_extract_chunk,
+        op_kwargs={"source": source, "extractor": config.get("extractor"), "config_file": config["config_file"]},
+        pool=pool,
+        max_active_tis_per_dagrun=settings["max_parallel_chunks"],
+    ).expand(op_args=plan.output)
+    return extract
+
+
+def _transform_task(source: str, config: dict, trigger_rule: str = "all_success"):
+    return PythonOperator(
+        task_id="transform",
+        python_callable=_transform,
+        op_kwargs={"source": source, "transformer": config["transformer"]},
+        trigger_rule=trigger_rule,
+    )
+
+
+def build_website_dags(config_dir: Path = WEBSITES_CONFIG_DIR) -> Dict[str, DAG]:
+    """
+    Generates the DAGs of every configured website.
+    Per source: `<source>_etl` (plan -> mapped extract -> transform), `<source>_extract`
+    and, when a `transformer` is configured, `<source>_transform`. Schedules, pool size
+    and parallelism come from the `dags` block of the YAML (see DEFAULT_DAG_SETTINGS).
+    Returns:
+        Dict[str, DAG]: DAGs by dag_id, to be placed in the DAG module's globals.
+    """
+    dags = {}
+    for source, config in load_website_configs(config_dir).items():
+        settings = {**DEFAULT_DAG_SETTINGS, **(config.get("dags") or {})}
+        common = {
+            "start_date": datetime.fromisoformat(str(settings["start_date"])),
+            "catchup": False,
+            "max_active_runs": settings["max_active_runs"],
+            "tags": settings.get("tags") or [source],
+        }
+
+        with DAG(dag_id=f"{source}_etl", schedule=settings["schedule"], **common) as dag:
+            extract = _sharded_extract(source, config, settings)
+            if config.get("transformer"):
+                # An empty plan skips the mapped extract; still transform whatever raw data is pending
+                extract >> _transform_task(source, config, trigger_rule="none_failed")
+        dags[dag.dag_id] = dag
+
+        with DAG(dag_id=f"{source}_extract", schedule=settings["extract_schedule"], **common) as dag:
+            _sharded_extract(source, config, settings)
+        dags[dag.dag_id] = dag
+
+        if config.get("transformer"):
+            with DAG(dag_id=f"{source}_transform", schedule=settings["transform_schedule"], **common) as dag:
+                _transform_task(source, config)
+            dags[dag.dag_id] = dag
+    return dags
@@ -0,0 +1,5 @@
+# DAGs of every website configured in etl_pipeline/core/config/websites/*.yaml,
+# generated by etl_pipeline.airflow.dag_factory (airflow DAG module).
+from etl_pipeline.airflow.dag_factory import build_website_dags
+
+globals().update(build_website_dags())
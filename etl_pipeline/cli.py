@@ -0,0 +1,220 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+from datetime import date
+from typing import List, Optional
+
+from etl_pipeline.core.config.registry import accepts_dates, accepts_resume, build_extractor, import_path, load_website_configs
+
+# Standalone entry point, no Airflow needed:
+#     python -m etl_pipeline.cli run sunsirs --from 2025-04-01 --to 2025-04-30 --workers 8
+# or distributed over a Redis queue, workers on any number of hosts:
+#     python -m etl_pipeline.cli enqueue sunsirs --from 2025-01-01 --to 2025-04-30
+#     python -m etl_pipeline.cli worker --processes 4
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="etl", description="Run website ETL pipelines without Airflow.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Extract (and transform) one source.")
+    run.add_argument("source", help="Source name, i.e. sunsirs (see `etl list`).")
+    run.add_argument("--from", dest="start_date", type=date.fromisoformat, help="First date, defaults to the pending range.")
+    run.add_argument("--to", dest="end_date", type=date.fromisoformat, help="Last date (inclusive), defaults to today.")
+    run.add_argument(
+        "--workers", type=int, default=None,
+        help="Upper bound of concurrent page fetches (the per-host controller adapts below it), defaults to PR_HOST_MAX_CONCURRENCY.",
+    )
+    run.add_argument("--parse-workers", type=int, default=None, help="Parser processes, defaults to the CPU count.")
+    run.add_argument("--queue-size", type=int, default=None, help="Capacity of each stage queue, defaults to 2 x workers.")
+    run.add_argument("--batch-rows", type=int, default=None, help="Rows per bulk write.")
+    run.add_argument("--flush-seconds", type=float, default=None, help="Write buffered rows at least this often.")
+    run.add_argument("--no-proxy", action="store_true", help="Fetch directly instead of through the proxy pool.")
+    run.add_argument("--no-transform", action="store_true", help="Only extract.")
+    run.add_argument("--resume", action="store_true", help="Skip dates already checkpointed as done by an earlier run.")
+    run.add_argument("--rerun", action="store_true", help="Extract the range even if an earlier run completed it.")
+    run.add_argument("--budget-seconds", type=float, default=None, help="Stop starting new pages after this many seconds.")
+    run.add_argument("--json", action="store_true", help="Print the throughput report as JSON.")
+
+    enqueue = commands.add_parser("enqueue", help="Queue the pages of one source for `etl worker` processes.")
+    enqueue.add_argument("source", help="Source name with a table_spec.")
+    enqueue.add_argument("--from", dest="start_date", type=date.fromisoformat, required=True, help="First date.")
+    enqueue.add_argument("--to", dest="end_date", type=date.fromisoformat, default=date.today(), help="Last date (inclusive), defaults to today.")
+    enqueue.add_argument("--resume", action="store_true", help="Leave out dates already checkpointed as done.")
+    enqueue.add_argument(
+        "--work", type=int, default=0, metavar="N",
+        help="Also drain the queue with N local workers (needed with REDIS_URL=memory://).",
+    )
+
+    worker = commands.add_parser("worker", help="Fetch, parse and store queued pages.")
+    worker.add_argument("--processes", type=int, default=1, help="Worker processes on this host.")
+    worker.add_argument("--drain", action="store_true", help="Exit once the queue is empty instead of waiting for work.")
+    worker.add_argument("--batch-rows", type=int, default=None, help="Rows per bulk write.")
+    worker.add_argument("--flush-seconds", type=float, default=None, help="Write buffered rows at least this often.")
+
+    commands.add_parser("queue", help="Show the fetch queue counts and dead letters.")
+
+    commands.add_parser("list", help="List the configured sources.")
+    return parser
+
+
+def _print_report(report: dict) -> None:
+    print(f"{report['source']}: {report['start_date']} to {report['end_date']}, {report['pages']} pages in {report['elapsed_seconds']}s")
+    print(f"  rows inserted {report['inserted']}, skipped {report['skipped']}, failed {report['failed']} in {report['flushes']} writes")
+    print(f"  peak buffered rows {report['peak_buffered_rows']}, peak RSS {report['peak_rss_mb']} MB")
+    print(f"  throughput {report['pages_per_second']} pages/s, {report['rows_per_second']} rows/s")
+    if report["remaining_pages"]:
+        print(f"  {report['remaining_pages']} of {report['planned_pages']} pages left for a --resume run")
+    for name, stats in report["stages"].items():
+        print(
+            f"  {name:<6} items {stats['items']:>7}  failed {stats['failed']:>5}  "
+            f"busy {stats['busy_seconds']:>9.3f}s  max queue {stats['max_queue']}"
+        )
+    for host, stats in report["hosts"].items():
+        print(
+            f"  {host}: concurrency limit {stats['limit']}, baseline latency {stats['baseline_latency']}s, "
+            f"ok {stats['ok']}, throttled {stats['throttled']}, errors {stats['error']}"
+        )
+
+
+def run(args: argparse.Namespace) -> int:
+    from etl_pipeline.core.extract.declarative_extractor import DeclarativeTableExtractor
+    from etl_pipeline.core.extract.host_limiter import HOST_MAX_CONCURRENCY
+    from etl_pipeline.core.loader.raw_data_store import SINK_FLUSH_SECONDS
+    from etl_pipeline.core.runner import WRITE_BATCH_ROWS, PipelineRunner
+    from utility.database import session_scope
+    from utility.run_lease import run_lease
+
+    configs = load_website_configs()
+    config = configs.get(args.source)
+    if config is None:
+        print(f"Unknown source '{args.source}', configured: {', '.join(sorted(configs)) or 'none'}", file=sys.stderr)
+        return 2
+
+    holder = f"cli/{socket.gethostname()}/{os.getpid()}"
+    with session_scope() as session:
+        extractor = build_extractor(args.source, config.get("extractor"), config["config_file"], session=session)
+        if not accepts_dates(extractor):
+            # It covers its own range (i.e. exchange_rate), leased as a whole like in the DAG
+            if args.start_date or args.end_date:
+                print(f"{args.source} extractor takes no date range, --from/--to ignored", file=sys.stderr)
+            range_start = range_end = None
+        elif args.start_date and args.end_date:
+            range_start, range_end = args.start_date, args.end_date
+        else:
+            pending_start, pending_end = extractor.get_extraction_dates(source_name=args.source, config=config)
+            range_start, range_end = _as_date(args.start_date or pending_start), _as_date(args.end_date or pending_end)
+
+        with run_lease(args.source, "extract", range_start, range_end, holder=holder, rerun=args.rerun) as lease:
+            if not lease:
+                span = f" {range_start} to {range_end}" if range_start else ""
+                print(
+                    f"Extraction of {args.source}{span} is owned by another run "
+                    f"or was completed already (--rerun to extract it again)",
+                    file=sys.stderr,
+                )
+                return 1
+            if isinstance(extractor, DeclarativeTableExtractor):
+                runner = PipelineRunner(
+                    extractor,
+                    workers=args.workers or HOST_MAX_CONCURRENCY,
+                    parse_workers=args.parse_workers,
+                    queue_size=args.queue_size,
+                    batch_rows=args.batch_rows or WRITE_BATCH_ROWS,
+                    use_proxy=not args.no_proxy,
+                    flush_seconds=args.flush_seconds or SINK_FLUSH_SECONDS,
+                )
+                report = asyncio.run(runner.run(range_start, range_end, resume=args.resume, budget_seconds=args.budget_seconds))
+                if args.json:
+                    print(json.dumps(report, indent=2))
+                else:
+                    _print_report(report)
+            else:
+                # Custom extractors run their own sequential extract()
+                print(f"{args.source} has no table_spec, running its extractor sequentially")
+                kwargs = {"start_date": range_start.isoformat(), "end_date": range_end.isoformat()} if range_start else {}
+                if accepts_resume(extractor):
+                    kwargs.update(resume=args.resume, budget_seconds=args.budget_seconds)
+                elif args.resume or args.budget_seconds:
+                    print(f"{args.source} extractor has no checkpoints, --resume/--budget-seconds ignored", file=sys.stderr)
+                extractor.extract(**kwargs)
+            # Later runs skip the slice once every page of it is checkpointed
+            if hasattr(extractor, "pending_targets") and not extractor.pending_targets(range_start, range_end):
+                lease.complete()
+
+        if config.get("transformer") and not args.no_transform:
+            with run_lease(args.source, "transform", holder=holder) as lease:
+                if not lease:
+                    print(f"{args.source} transform is already running in another run", file=sys.stderr)
+                    return 1
+                import_path(config["transformer"])(session=session).transform()
+    return 0
+
+
+def _print_worker_reports(reports: List[dict]) -> None:
+    for report in reports:
+        print(
+            f"  {report['worker']}: {report['pages']} pages ({report['empty']} empty, {report['failed']} failed), "
+            f"{report['rows']} rows in {report['elapsed_seconds']}s, {report['pages_per_second']} pages/s"
+        )
+    pages = sum(report["pages"] for report in reports)
+    elapsed = max((report["elapsed_seconds"] for report in reports), default=0)
+    print(f"total {pages} pages in {elapsed}s, {round(pages / elapsed, 3) if elapsed else None} pages/s with {len(reports)} workers")
+
+
+def work(args: argparse.Namespace) -> int:
+    from etl_pipeline.core.loader.raw_data_store import SINK_FLUSH_ROWS, SINK_FLUSH_SECONDS
+    from etl_pipeline.core.queue_worker import enqueue_range, run_workers
+
+    if args.command == "enqueue":
+        try:
+            enqueue_range(args.source, args.start_date, args.end_date, resume=args.resume)
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            return 2
+        if not args.work:
+            return 0
+        processes, drain = args.work, True
+    else:
+        processes, drain = args.processes, args.drain
+    reports = run_workers(
+        processes,
+        drain=drain,
+        flush_rows=getattr(args, "batch_rows", None) or SINK_FLUSH_ROWS,
+        flush_seconds=getattr(args, "flush_seconds", None) or SINK_FLUSH_SECONDS,
+    )
+    _print_worker_reports(reports)
+    return 0
+
+
+def queue_status() -> int:
+    from etl_pipeline.core.queue_worker import FETCH_QUEUE
+    from utility.work_queue import WorkQueue
+
+    queue = WorkQueue(FETCH_QUEUE)
+    print(json.dumps({**queue.stats(), "dead_letters": queue.dead_letters()}, indent=2))
+    return 0
+
+
+def _as_date(value) -> date:
+    return value.date() if hasattr(value, "date") and callable(value.date) else value
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    if args.command == "list":
+        for source, config in sorted(load_website_configs().items()):
+            print(f"{source}\t{config['config_file']}")
+        return 0
+    if args.command in ("enqueue", "worker"):
+        return work(args)
+    if args.command == "queue":
+        return queue_status()
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
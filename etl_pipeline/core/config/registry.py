@@ -0,0 +1,70 @@
+import importlib
+import inspect
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+import yaml
+
+# Website configs, shared by the Airflow DAG factory and the `etl` CLI.
+# Kept free of pipeline imports so the scheduler can call it on every parse.
+
+WEBSITES_CONFIG_DIR = Path(__file__).resolve().parent / "websites"
+
+# Extractor of websites that only declare a `table_spec`
+DECLARATIVE_EXTRACTOR = "etl_pipeline.core.extract.declarative_extractor.DeclarativeTableExtractor"
+
+
+@lru_cache(maxsize=None)
+def read_yaml(path: str, mtime_ns: int) -> dict:
+    """Parse a YAML file once per modification (the mtime is part of the cache key)."""
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "r", encoding="utf-8") as file:
+        return yaml.load(file, Loader=loader) or {}
+
+
+def read_config_file(path: str) -> dict:
+    return read_yaml(str(path), Path(path).stat().st_mtime_ns)
+
+
+def load_website_configs(config_dir: Path = WEBSITES_CONFIG_DIR) -> Dict[str, dict]:
+    """
+    Reads every `*.yaml` website config that declares an `extractor` or a `table_spec`
+    (scraped by the declarative table engine without any custom code).
+    Args:
+        config_dir (Path): Directory holding the website YAML files.
+    Returns:
+        Dict[str, dict]: Config per source name; the source is the `source` key of the YAML
+                         or else the file name, i.e. {'sunsirs': {...}}. `config_file` is
+                         set to the path of the YAML.
+    """
+    configs = {}
+    for path in sorted(Path(config_dir).glob("*.yaml")):
+        config = read_config_file(str(path))
+        if config.get("extractor") or config.get("table_spec"):
+            configs[config.get("source", path.stem)] = {**config, "config_file": str(path)}
+    return configs
+
+
+def import_path(path: str):
+    """Resolve a dotted `module.Class` path from the YAML."""
+    module, name = path.rsplit(".", 1)
+    return getattr(importlib.import_module(module), name)
+
+
+def build_extractor(source: str, extractor: Optional[str], config_file: str, session=None):
+    """Custom extractor class when configured, otherwise the declarative engine on the YAML."""
+    if extractor:
+        return import_path(extractor)(session=session)
+    return import_path(DECLARATIVE_EXTRACTOR)(config=read_config_file(config_file), source_name=source, session=session)
+
+
+def accepts_resume(extractor) -> bool:
+    """Whether the extractor's `extract` supports checkpointed `resume` / `budget_seconds`."""
+    return "resume" in inspect.signature(extractor.extract).parameters
+
+
+def accepts_dates(extractor) -> bool:
+    """Whether the extractor's `extract` takes a `start_date` / `end_date` range."""
+    parameters = inspect.signature(extractor.extract).parameters
+    return "start_date" in parameters and "end_date" in parameters
@@ -1,33 +1,107 @@
 from datetime import datetime 
+import random
+import threading
+import time
 import requests
 import pandas as pd
 from abc import ABC
 from typing import Any, Dict, Optional
 from sqlalchemy import func
 from sqlalchemy.orm import Session
-from requests.exceptions import HTTPError, Timeout, RequestException
-from tenacity import retry, stop_after_attempt, wait_exponential
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, HTTPError, ProxyError, Timeout, RequestException
 
 from db.models.metadata import Source, WebConfig
 from db.models.transformed import PriceStandardized
+from etl_pipeline.core.extract.host_limiter import (
+    ERROR,
+    FETCH_ATTEMPTS,
+    FETCH_TIMEOUT_SECONDS,
+    THROTTLED,
+    host_limiter,
+    outcome_for_status,
+    parse_retry_after,
+)
 from etl_pipeline.core.extract.table_extractor import TableExtractor
 from utility.logger import get_logger
-from utility.database import engine, SessionLocal
+from utility.database import get_engine, get_session
 from swiftshadow.classes import ProxyInterface
+from swiftshadow.models import Proxy
 
 logger = get_logger()
 
+# Keep-alive connections kept per host by an extractor's HTTP session
+HTTP_POOL_SIZE = 16
+
+
+def outcome_for_request_error(error: RequestException, proxied: bool) -> str:
+    """
+    Outcome of a timeout or connection error for the host's `HostLimiter`: a failing proxy, or
+    a connection to it that could not be opened, says nothing about the host (ERROR); a
+    timeout or dropped connection of the host itself is THROTTLED.
+    """
+    if isinstance(error, ProxyError) or (proxied and isinstance(error, ConnectTimeout)):
+        return ERROR
+    return THROTTLED
+
+
 class BaseExtractor(ABC):
-    def __init__(self):
+    def __init__(self, session: Optional[Session] = None):
         self.logger = get_logger()
-        self.engine = engine
-        self.SessionLocal = SessionLocal
-        self.session = self.SessionLocal()
+        self.engine = get_engine()
+        # Reuse the run's shared session when given, otherwise own a private one
+        self._owns_session = session is None
+        self.session = session if session is not None else get_session()
+        self._http = None
+        self._proxies = None
+        self._http_lock = threading.Lock()
+
+    @property
+    def http(self) -> requests.Session:
+        """HTTP session shared by every fetch of this extractor (and its worker threads)."""
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    http = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+                    http.mount("http://", adapter)
+                    http.mount("https://", adapter)
+                    self._http = http
+        return self._http
+
+    def get_proxy_interface(self) -> ProxyInterface:
+        """Proxy pool, fetched once per extractor instead of on every request."""
+        if self._proxies is None:
+            with self._http_lock:
+                if self._proxies is None:
+                    proxies = ProxyInterface(cachePeriod=1, maxProxies=10, autoRotate=True, protocol="https",)
+                    proxies.update()
+                    self._proxies = proxies
+        return self._proxies
+
+    def pick_proxy(self, avoid: Optional[Proxy] = None) -> Proxy:
+        """A proxy of the pool, another one than `avoid` (the one that just failed) when there is one."""
+        swift = self.get_proxy_interface()
+        proxy = swift.get()
+        if proxy == avoid and len(swift.proxies) > 1:
+            proxy = random.choice([other for other in swift.proxies if other != avoid])
+        return proxy
+
+    def close_session(self):
+        if not self._owns_session:
+            return
+        try:
+            self.session.close()
+        except Exception as e:
+            self.logger.error(f"Error closing session: {str(e)}")
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     def fetch_page(self, url: str, headers: Optional[Dict] = None, params: Optional[Dict] = None, data: Optional[Dict] = None, method: str = 'GET') -> str:
         """
         Fetches a web page using the specified HTTP method.
+        Every request goes through the host's `HostLimiter`: it waits for a free slot, and
+        429 / 5xx / timeouts / connection errors are retried (up to FETCH_ATTEMPTS) after the
+        pause the limiter imposes, honouring Retry-After. A failing proxy is not reported as
+        throttling (see `outcome_for_request_error`), the retry goes through another one.
         Args:
             url (str): The URL of the web page to fetch.
             headers (Optional[Dict], optional): HTTP headers to include in the request. Defaults to None.
@@ -44,33 +118,46 @@ class BaseExtractor(ABC):
         Logs:
             Logs errors with details about the exception and the URL.
         """
-        try:
-            swift = ProxyInterface(cachePeriod=1, maxProxies=10, autoRotate=True, protocol="https",)
-            swift.update()
-            if method.upper() == 'POST':
-                response = requests.post(url, headers=headers or {}, params=params, data=data)
-                full_url = response.url
-            else:
-                response = requests.get(url, headers=headers or {}, params=params, proxies=swift.get().as_requests_dict())
-                full_url = response.url
-
-            self.logger.info(f"Full URL: {full_url}")
-
-            response.raise_for_status()
-            return response.content
+        limiter = host_limiter(url)
+        proxy = None
+        for attempt in range(1, FETCH_ATTEMPTS + 1):
+            limiter.acquire()
+            started = time.monotonic()
+            try:
+                if method.upper() == 'POST':
+                    proxy = None
+                    response = self.http.post(url, headers=headers or {}, params=params, data=data, timeout=FETCH_TIMEOUT_SECONDS)
+                else:
+                    proxy = self.pick_proxy(avoid=proxy)
+                    response = self.http.get(url, headers=headers or {}, params=params, proxies=proxy.as_requests_dict(), timeout=FETCH_TIMEOUT_SECONDS)
+            except (Timeout, ConnectionError) as err:
+                limiter.release(time.monotonic() - started, outcome_for_request_error(err, proxied=proxy is not None))
+                if attempt < FETCH_ATTEMPTS:
+                    self.logger.warning(f"Attempt {attempt} failed: {err} - URL: {url}, retrying")
+                    continue
+                self.logger.error(f"{type(err).__name__} occurred: {err} - URL: {url}")
+                raise
+            except RequestException as req_err:
+                limiter.release(time.monotonic() - started, ERROR)
+                self.logger.error(f"Request exception occurred: {req_err} - URL: {url}")
+                raise
+            except Exception as err:
+                limiter.release(time.monotonic() - started, ERROR)
+                self.logger.error(f"An unexpected error occurred: {err} - URL: {url}")
+                raise
 
-        except HTTPError as http_err:
-            self.logger.error(f"HTTP error occurred: {http_err} - URL: {url}")
-            raise
-        except Timeout as timeout_err:
-            self.logger.error(f"Timeout error occurred: {timeout_err} - URL: {url}")
-            raise
-        except RequestException as req_err:
-            self.logger.error(f"Request exception occurred: {req_err} - URL: {url}")
-            raise
-        except Exception as err:
-            self.logger.error(f"An unexpected error occurred: {err} - URL: {url}")
-            raise
+            outcome = outcome_for_status(response.status_code)
+            limiter.release(time.monotonic() - started, outcome, retry_after=parse_retry_after(response.headers.get("Retry-After")))
+            self.logger.info(f"Full URL: {response.url}")
+            if outcome == THROTTLED and attempt < FETCH_ATTEMPTS:
+                self.logger.warning(f"Attempt {attempt} got HTTP {response.status_code} - URL: {url}, retrying")
+                continue
+            try:
+                response.raise_for_status()
+            except HTTPError as http_err:
+                self.logger.error(f"HTTP error occurred: {http_err} - URL: {url}")
+                raise
+            return response.content
 
     def get_extraction_dates(self, source_name: str, config: dict) -> tuple[datetime, datetime]:
         """
@@ -122,9 +209,9 @@ class BaseExtractor(ABC):
         end_date = datetime.today()
         return start_date, end_date
 
-    def extract_tables(self, html_content: str, required_headers: list, consider_empty_rows: bool) -> pd.DataFrame:
+    def extract_tables(self, html_content: str, required_headers: list, consider_empty_rows: bool, parser: str = 'html5lib') -> pd.DataFrame:
         """Extract tables from HTML content using TableExtractor"""
-        extractor = TableExtractor(html_content, required_headers, consider_empty_rows)
+        extractor = TableExtractor(html_content, required_headers, consider_empty_rows, parser=parser)
         return extractor.to_dataframe()
     
     def is_model_empty(self, Model:any) -> bool:
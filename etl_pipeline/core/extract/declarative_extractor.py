@@ -0,0 +1,269 @@
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+import pandas as pd
+from dateutil import parser
+from sqlalchemy.orm import Session
+
+from etl_pipeline.core.extract.base_extractor import BaseExtractor
+from etl_pipeline.core.extract.host_limiter import HOST_MAX_CONCURRENCY
+from etl_pipeline.core.extract.table_extractor import FAST_PARSER, TableExtractor
+from etl_pipeline.core.loader.raw_data_store import SINK_FLUSH_ROWS, SINK_FLUSH_SECONDS, RawPriceSink
+from utility.checkpoint import EMPTY, FAILED, CheckpointStore, WallClockBudget
+
+# Defaults for the `table_spec` block of a website YAML
+DEFAULT_TABLE_SPEC = {
+    "step_days": 1,
+    "consider_empty_rows": False,
+    "parser": FAST_PARSER,
+    # Upper bound only: the host's limiter decides how many fetches are in flight
+    "fetch_workers": HOST_MAX_CONCURRENCY,
+    # Rows / seconds buffered before parsed pages are written to the raw store
+    "flush_rows": SINK_FLUSH_ROWS,
+    "flush_seconds": SINK_FLUSH_SECONDS,
+    "headers": {},
+    "date_column": {"mode": "url"},
+    "rename": {},
+}
+
+DATE_COLUMN_MODES = ("header", "column", "url")
+
+
+def build_table_spec(config: dict) -> dict:
+    """
+    Validates the `table_spec` block of a website config and fills in the defaults.
+    Raises:
+        ValueError: If a required key is missing or the date column mode is unknown.
+    """
+    spec = {**DEFAULT_TABLE_SPEC, **(config.get("table_spec") or {})}
+    for key in ("url_template", "required_headers"):
+        if not spec.get(key):
+            raise ValueError(f"table_spec.{key} is required")
+    mode = spec["date_column"].get("mode")
+    if mode not in DATE_COLUMN_MODES:
+        raise ValueError(f"Unknown table_spec.date_column.mode '{mode}', expected one of {', '.join(DATE_COLUMN_MODES)}")
+    if mode == "column" and not spec["date_column"].get("name"):
+        raise ValueError("table_spec.date_column.name is required for mode 'column'")
+    return spec
+
+
+def _header_date(header: str) -> Optional[datetime]:
+    """Parse a date-like header such as '03-28' or '(03-28)%', None when it is not a date."""
+    try:
+        return parser.parse(re.sub(r'[%\(\)]', '', header.strip()))
+    except (ValueError, OverflowError):
+        return None
+
+
+def apply_date_column(df: pd.DataFrame, target_date: datetime, spec: dict) -> pd.DataFrame:
+    """
+    Gives every row of a scraped table a 'Date' column according to `spec['date_column']`:
+        header: the value of `target_date` sits in the column whose header is that date
+                (compared with `match_format`, default '%m-%d'); only the required headers
+                and that column are kept, the latter renamed to `value_name` (default 'Price').
+                i.e: Commodity, Sectors, 03-28, 03-31, Change -> Commodity, Sectors, Price, Date
+        column: the table carries its own date column `name`, parsed into 'Date'.
+        url:    every row belongs to `target_date`.
+    Returns:
+        pd.DataFrame: The table with a 'Date' column, empty when no column matches the date.
+    """
+    date_spec = spec["date_column"]
+    mode = date_spec["mode"]
+
+    if mode == "header":
+        match_format = date_spec.get("match_format", "%m-%d")
+        wanted = target_date.strftime(match_format)
+        required = [h.lower() for h in spec["required_headers"]]
+        matching = [
+            col for col in df.columns
+            if not any(str(col).lower() in req for req in required)
+            and (parsed := _header_date(str(col))) is not None
+            and parsed.strftime(match_format) == wanted
+        ]
+        if not matching:
+            return pd.DataFrame()
+        # i.e. the page of 03-28 also lists 03-31; only the first match is the requested date
+        df = df[list(spec["required_headers"]) + matching[:1]].copy().rename(columns={matching[0]: date_spec.get("value_name", "Price")})
+        df["Date"] = pd.Timestamp(target_date.date())
+    elif mode == "column":
+        df = df.copy()
+        df["Date"] = pd.to_datetime(df[date_spec["name"]], format=date_spec.get("format"), errors="coerce")
+        df = df[df["Date"].notna()]
+    else:
+        df = df.copy()
+        df["Date"] = pd.Timestamp(target_date.date())
+    return df
+
+
+def parse_table_page(html_content: Any, target_date: datetime, spec: dict) -> pd.DataFrame:
+    """
+    Turns one fetched page into rows ready for `RawPriceWriter`.
+    A plain function of its arguments (no session, no network) so it can run in worker
+    threads or processes.
+    """
+    tables = TableExtractor(html_content, spec["required_headers"], spec["consider_empty_rows"], parser=spec["parser"]).to_dataframe()
+    if tables.empty:
+        return tables
+    df = apply_date_column(tables, target_date, spec)
+    if df.empty:
+        return df
+    return df.rename(columns=spec["rename"])
+
+
+class DeclarativeTableExtractor(BaseExtractor):
+    """
+    Table scraper driven entirely by the `table_spec` block of a website YAML:
+
+        source: sunsirs
+        start_date: '2025-01-01'
+        table_spec:
+          url_template: "https://www.sunsirs.com/uk/sdetail-day-{date:%Y-%m%d}.html"
+          step_days: 1
+          required_headers: ["Commodity", "Sectors"]
+          date_column: {mode: header, match_format: "%m-%d", value_name: Price}
+          rename: {Commodity: product, Sectors: product_category, Price: price_value, Date: price_date}
+
+    Pages are fetched concurrently over one pooled HTTP session, parsed with the fast
+    parser and streamed to the raw store through a `RawPriceSink` (bulk writes every
+    `flush_rows` rows / `flush_seconds` seconds), so every site declared this way shares the
+    same pipeline.
+    """
+
+    def __init__(self, config: dict, source_name: Optional[str] = None, session: Optional[Session] = None):
+        super().__init__(session=session)
+        self.config = config
+        self.spec = build_table_spec(config)
+        self.source_name = (source_name or config.get("source") or config["name"]).strip().lower()
+
+    def plan_targets(self, start_date: Any, end_date: Any) -> List[Tuple[datetime, str]]:
+        """One (date, url) pair per page to fetch between the two dates (inclusive)."""
+        dates = pd.date_range(start_date, end_date, freq=f"{self.spec['step_days']}D")
+        return [(date.to_pydatetime(), self.spec["url_template"].format(date=date)) for date in dates]
+
+    def plan_date_chunks(self, chunk_days: int) -> List[List[str]]:
+        """
+        Splits the pending extraction range into consecutive date chunks that can be extracted
+        independently (i.e. by mapped Airflow tasks). Only the dates `step_days` apart are
+        planned, the same ones `plan_targets` fetches.
+        Args:
+            chunk_days (int): Maximum number of dates (pages) per chunk.
+        Returns:
+            List[List[str]]: One [start_date, end_date] pair of ISO dates (inclusive) per chunk,
+                             JSON serialisable so it can be passed through XCom.
+                             i.e: [['2025-04-01', '2025-04-07'], ['2025-04-08', '2025-04-10']]
+        """
+        start_date, end_date = self.get_extraction_dates(source_name=self.source_name, config=self.config)
+        dates = pd.date_range(start_date, end_date, freq=f"{self.spec['step_days']}D")
+        chunks = [dates[i:i + chunk_days] for i in range(0, len(dates), chunk_days)]
+        self.logger.info(f"Planned {len(chunks)} chunks of up to {chunk_days} pages from {start_date} to {end_date}")
+        return [[chunk[0].strftime('%Y-%m-%d'), chunk[-1].strftime('%Y-%m-%d')] for chunk in chunks]
+
+    def pending_targets(self, start_date: Any, end_date: Any) -> List[Tuple[datetime, str]]:
+        """The planned pages between the two dates not checkpointed as done (or empty) yet."""
+        targets = self.plan_targets(start_date, end_date)
+        pending = set(CheckpointStore(self.source_name).pending([self.unit_key(date) for date, _ in targets]))
+        return [target for target in targets if self.unit_key(target[0]) in pending]
+
+    def fetch_target(self, target: Tuple[datetime, str]) -> Tuple[datetime, Optional[bytes]]:
+        """Fetch one planned page; failures are logged and yield None so the run continues."""
+        target_date, url = target
+        try:
+            self.logger.info(f"Fetching data from {url}")
+            return target_date, self.fetch_page(url=url, headers=self.spec["headers"], method="GET")
+        except Exception as e:
+            self.logger.error(f"Failed to fetch data for {target_date.date()}: {str(e)}")
+            return target_date, None
+
+    def unit_key(self, target_date: datetime) -> str:
+        """Checkpoint key of one page: its date."""
+        return target_date.strftime('%Y-%m-%d')
+
+    def extract(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        resume: bool = False,
+        budget_seconds: Optional[float] = None,
+    ) -> bool:
+        """
+        Fetches, parses and stores every page between the two dates.
+        Rows are written batch by batch while the run goes on, and every page is checkpointed
+        once its batch is stored (or it failed / had no data), so a rerun with `resume` only
+        fetches the dates that are not done yet.
+        Args:
+            start_date (Optional[str]): First date to extract (inclusive), i.e. a chunk from
+                                        `plan_date_chunks`. Defaults to the pending range.
+            end_date (Optional[str]): Last date to extract (inclusive).
+            resume (bool): Skip dates already checkpointed as done.
+            budget_seconds (Optional[float]): Wall-clock budget; once spent no new page is
+                                              started, the fetched ones are stored and
+                                              checkpointed and the run stops cleanly.
+        Returns:
+            bool: True if any row was inserted, False otherwise.
+        Raises:
+            Exception: Whatever stopped the run (i.e. the database); the pages stored and
+                       checkpointed before it are kept. Single pages that fail to fetch or
+                       parse are checkpointed as failed instead.
+        """
+        try:
+            if start_date is None or end_date is None:
+                start_date, end_date = self.get_extraction_dates(source_name=self.source_name, config=self.config)
+            targets = self.pending_targets(start_date, end_date) if resume else self.plan_targets(start_date, end_date)
+            checkpoints = CheckpointStore(self.source_name)
+            self.logger.info(f"Extraction Dates: {start_date} to {end_date}, {len(targets)} pages")
+
+            budget = WallClockBudget(budget_seconds)
+            sink = RawPriceSink(
+                self.source_name,
+                session=self.session,
+                flush_rows=self.spec["flush_rows"],
+                flush_seconds=self.spec["flush_seconds"],
+                checkpoints=checkpoints,
+            )
+            empty_keys, failed_keys = [], []
+            remaining = iter(targets)
+            with ThreadPoolExecutor(max_workers=self.spec["fetch_workers"]) as pool:
+                # A bounded FIFO of fetches keeps the page order and lets the budget stop new work
+                in_flight = deque()
+
+                def submit_next() -> None:
+                    target = None if budget.exhausted() else next(remaining, None)
+                    if target is not None:
+                        in_flight.append(pool.submit(self.fetch_target, target))
+
+                for _ in range(self.spec["fetch_workers"] * 2):
+                    submit_next()
+                while in_flight:
+                    target_date, html_content = in_flight.popleft().result()
+                    submit_next()
+                    key = self.unit_key(target_date)
+                    if html_content is None:
+                        failed_keys.append(key)
+                        continue
+                    try:
+                        df = parse_table_page(html_content, target_date, self.spec)
+                    except Exception as e:
+                        self.logger.error(f"Failed to parse data for {target_date.date()}: {str(e)}")
+                        failed_keys.append(key)
+                        continue
+                    if df.empty:
+                        self.logger.warning(f"No matching data found for date: {target_date.date()}")
+                        empty_keys.append(key)
+                        continue
+                    sink.add([key], df)
+                sink.close()
+
+            if budget.exhausted():
+                self.logger.info(f"Time budget of {budget_seconds}s spent, stopping; rerun with resume to continue.")
+            checkpoints.mark(empty_keys, EMPTY)
+            checkpoints.mark(failed_keys, FAILED, detail="fetch or parse failed")
+            self.logger.info(f"Stored {self.source_name} pages: {sink.stats()}")
+            return sink.counts["inserted"] > 0
+
+        except Exception as e:
+            # Raised, so the task fails and is retried instead of passing with nothing stored
+            self.logger.error(f"Error during extraction: {str(e)}")
+            raise
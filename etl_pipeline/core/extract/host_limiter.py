@@ -0,0 +1,319 @@
+import asyncio
+import math
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from decouple import config
+
+from utility.logger import get_logger
+
+logger = get_logger()
+
+# Concurrent requests allowed per host at the start of a run, and the bounds of the controller
+HOST_INITIAL_CONCURRENCY = config("PR_HOST_INITIAL_CONCURRENCY", default=2, cast=int)
+HOST_MIN_CONCURRENCY = config("PR_HOST_MIN_CONCURRENCY", default=1, cast=int)
+HOST_MAX_CONCURRENCY = config("PR_HOST_MAX_CONCURRENCY", default=32, cast=int)
+# A response slower than this multiple of the host's baseline latency stops the growth
+HOST_LATENCY_TOLERANCE = config("PR_HOST_LATENCY_TOLERANCE", default=2.0, cast=float)
+# Factor the limit is cut by on a throttling signal
+HOST_DECREASE_FACTOR = 0.5
+# The limit grows by one slot at most this often (or once per baseline latency if slower)
+HOST_INCREASE_INTERVAL_SECONDS = 1.0
+# Pause after a throttling signal without Retry-After, doubled per consecutive one
+HOST_BACKOFF_SECONDS = 1.0
+HOST_MAX_BACKOFF_SECONDS = 60.0
+# Longest Retry-After honoured; anything above is treated as this
+HOST_MAX_RETRY_AFTER_SECONDS = 300.0
+# Attempts per request before the error is raised to the caller
+FETCH_ATTEMPTS = 4
+FETCH_TIMEOUT_SECONDS = 30
+# Fetches in flight per host across all processes sharing the limits (`etl worker`, any number of machines)
+HOST_CLUSTER_CONCURRENCY = config("PR_HOST_CLUSTER_CONCURRENCY", default=8, cast=int)
+# The shared slot of a process that died mid-fetch is freed after this long
+HOST_SLOT_LEASE_SECONDS = FETCH_TIMEOUT_SECONDS * 2
+HOST_KEY = "pr:host:{host}:{part}"
+
+# Request outcomes reported to `HostLimiter.release`
+OK = "ok"
+THROTTLED = "throttled"  # 429, 5xx, timeouts and connection errors of the host: it is struggling
+ERROR = "error"  # other failures (i.e. 404, a failing proxy) say nothing about the host's capacity
+
+# Polling step of async callers waiting for a slot
+ASYNC_POLL_SECONDS = 0.05
+
+
+def outcome_for_status(status_code: int) -> str:
+    if status_code == 429 or status_code >= 500:
+        return THROTTLED
+    if status_code >= 400:
+        return ERROR
+    return OK
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), HOST_MAX_RETRY_AFTER_SECONDS)
+
+
+class SharedHostLimits:
+    """
+    The limits of one host that every process sharing `client` (Redis) honours together:
+    a pause set by any of them on a throttling signal, and at most `limit` fetches in flight.
+    Each process's `HostLimiter` still adapts its own limit below that.
+
+    Keys (under pr:host:<host>:):
+        paused_until  wall-clock time the pause ends
+        slots         sorted set: slot token -> time its lease lapses
+
+    Only single-key atomic commands are used, like in `WorkQueue`: a slot is taken by adding
+    a token and counting the set, and given back when the count is above `limit`, so the cap
+    is never exceeded (racing takers may all back off and retry instead).
+    """
+
+    def __init__(self, host: str, client, limit: int = HOST_CLUSTER_CONCURRENCY, clock: Callable[[], float] = time.time):
+        self.host = host
+        self.client = client
+        self.limit = limit
+        self.clock = clock
+
+    def _key(self, part: str) -> str:
+        return HOST_KEY.format(host=self.host, part=part)
+
+    def paused_for(self) -> Optional[float]:
+        """Seconds left of the shared pause, None when the host is not paused."""
+        value = self.client.get(self._key("paused_until"))
+        remaining = float(value) - self.clock() if value is not None else 0.0
+        return remaining if remaining > 0 else None
+
+    def pause(self, seconds: float) -> None:
+        """Pause the host for every process, unless a longer pause is already set."""
+        until = self.clock() + seconds
+        current = self.client.get(self._key("paused_until"))
+        if current is None or float(current) < until:
+            self.client.set(self._key("paused_until"), repr(until), ex=math.ceil(seconds) + 1)
+
+    def try_acquire(self) -> Optional[str]:
+        """Take a slot; returns its token, None when `limit` fetches are in flight already."""
+        now = self.clock()
+        expired = self.client.zrangebyscore(self._key("slots"), "-inf", now)
+        if expired:
+            self.client.zrem(self._key("slots"), *expired)
+        token = uuid.uuid4().hex
+        self.client.zadd(self._key("slots"), {token: now + HOST_SLOT_LEASE_SECONDS})
+        if self.client.zcard(self._key("slots")) <= self.limit:
+            return token
+        self.client.zrem(self._key("slots"), token)
+        return None
+
+    def release(self, token: str) -> None:
+        self.client.zrem(self._key("slots"), token)
+
+
+class HostLimiter:
+    """
+    AIMD concurrency limit for the requests to one host, shared by every thread and task of
+    the process (and, with `shared`, bounded by the limits of all processes, see
+    `share_host_limits`):
+        - healthy responses (latency within HOST_LATENCY_TOLERANCE x the baseline) while the
+          limit is in full use grow it by one slot per window;
+        - a 429, 5xx, timeout or connection error halves it (at most once per window, so a
+          burst of failures of one window counts once) and pauses the host for Retry-After,
+          or an exponential backoff when the host sent none.
+    A window is the baseline latency, and at least HOST_INCREASE_INTERVAL_SECONDS so the
+    limit creeps up to a host's ceiling instead of overshooting it.
+    So the fetches of a run settle just below the rate the host starts refusing, without
+    per-site tuning.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        initial: int = HOST_INITIAL_CONCURRENCY,
+        min_limit: int = HOST_MIN_CONCURRENCY,
+        max_limit: int = HOST_MAX_CONCURRENCY,
+        latency_tolerance: float = HOST_LATENCY_TOLERANCE,
+        clock: Callable[[], float] = time.monotonic,
+        shared: Optional[SharedHostLimits] = None,
+    ):
+        self.host = host
+        self.clock = clock
+        self.shared = shared
+        # Tokens of the shared slots this process holds; any of them frees one slot
+        self._tokens: List[str] = []
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.in_flight = 0
+        self.baseline_latency: Optional[float] = None
+        self.paused_until = 0.0
+        self._consecutive_throttles = 0
+        self._last_decrease = 0.0
+        self._last_increase = 0.0
+        self._cond = threading.Condition()
+        self.counts = {OK: 0, THROTTLED: 0, ERROR: 0}
+
+    def _wait_seconds(self) -> Optional[float]:
+        """None when a slot is free now, else roughly how long to wait; call with the lock held."""
+        pause = self.paused_until - self.clock()
+        if pause > 0:
+            return pause
+        if self.in_flight < int(self.limit):
+            return None
+        return ASYNC_POLL_SECONDS
+
+    def _take_shared(self) -> Optional[float]:
+        """None once a shared slot is taken (or there are no shared limits), else how long to wait."""
+        if self.shared is None:
+            return None
+        pause = self.shared.paused_for()
+        if pause is not None:
+            return pause
+        token = self.shared.try_acquire()
+        if token is None:
+            # Jittered, so processes that raced for the last slot do not race again
+            return ASYNC_POLL_SECONDS * (1 + random.random())
+        with self._cond:
+            self._tokens.append(token)
+        return None
+
+    def _give_back(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def acquire(self) -> None:
+        """Block until the host has a free slot, and take it."""
+        while True:
+            with self._cond:
+                while (wait := self._wait_seconds()) is not None:
+                    self._cond.wait(timeout=wait)
+                self.in_flight += 1
+            wait = self._take_shared()
+            if wait is None:
+                return
+            self._give_back()
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """`acquire` for asyncio callers, without blocking the event loop."""
+        while True:
+            with self._cond:
+                wait = self._wait_seconds()
+                if wait is None:
+                    self.in_flight += 1
+            if wait is not None:
+                await asyncio.sleep(min(wait, ASYNC_POLL_SECONDS))
+                continue
+            if self.shared is None:
+                return
+            try:
+                wait = await asyncio.to_thread(self._take_shared)
+            except BaseException:
+                # Cancelled: a shared slot the thread still takes lapses after HOST_SLOT_LEASE_SECONDS
+                self._give_back()
+                raise
+            if wait is None:
+                return
+            self._give_back()
+            await asyncio.sleep(wait)
+
+    def release(self, latency: float, outcome: str, retry_after: Optional[float] = None) -> None:
+        """Give the slot back and adjust the limit to how the request went."""
+        pause = None
+        with self._cond:
+            self.in_flight -= 1
+            token = self._tokens.pop() if self._tokens else None
+            self.counts[outcome] += 1
+            now = self.clock()
+            window = max(self.baseline_latency or 0.0, HOST_INCREASE_INTERVAL_SECONDS)
+            if outcome == THROTTLED:
+                self._consecutive_throttles += 1
+                # One cut per window: the requests in flight when the host pushed back fail together
+                if now - self._last_decrease >= window:
+                    self.limit = max(float(self.min_limit), self.limit * HOST_DECREASE_FACTOR)
+                    self._last_decrease = now
+                    self._last_increase = now
+                if retry_after is not None:
+                    pause = min(max(retry_after, 0.0), HOST_MAX_RETRY_AFTER_SECONDS)
+                else:
+                    pause = min(HOST_BACKOFF_SECONDS * 2 ** (self._consecutive_throttles - 1), HOST_MAX_BACKOFF_SECONDS)
+                self.paused_until = max(self.paused_until, now + pause)
+                logger.warning(f"{self.host} is throttling, limit {self.limit:.1f}, pausing {pause:.1f}s")
+            elif outcome == OK:
+                self._consecutive_throttles = 0
+                if self.baseline_latency is None:
+                    self.baseline_latency = latency
+                if latency <= self.baseline_latency * self.latency_tolerance:
+                    # Only grow a limit that is binding: callers were using every slot
+                    if self.in_flight + 1 >= int(self.limit) and now - self._last_increase >= window:
+                        self.limit = min(float(self.max_limit), self.limit + 1.0)
+                        self._last_increase = now
+                    self.baseline_latency = 0.9 * self.baseline_latency + 0.1 * latency
+                else:
+                    # Slow but successful: hold the limit, let the baseline follow lasting changes
+                    self.baseline_latency = 0.99 * self.baseline_latency + 0.01 * latency
+            self._cond.notify_all()
+        if self.shared is not None:
+            if token is not None:
+                self.shared.release(token)
+            if pause is not None:
+                self.shared.pause(pause)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "baseline_latency": round(self.baseline_latency, 3) if self.baseline_latency is not None else None,
+                **self.counts,
+            }
+
+
+_limiters: Dict[str, HostLimiter] = {}
+_limiters_lock = threading.Lock()
+_shared_client = None
+
+
+def share_host_limits(client) -> None:
+    """
+    Bound the limiters of this process by the `SharedHostLimits` kept on `client` (Redis), so
+    the processes of an `etl worker` fleet pause together and stay within
+    HOST_CLUSTER_CONCURRENCY fetches per host. Call before the first fetch.
+    """
+    global _shared_client
+    with _limiters_lock:
+        if client is not _shared_client:
+            _shared_client = client
+            _limiters.clear()
+
+
+def host_limiter(url: str) -> HostLimiter:
+    """The process-wide limiter of the host of `url`."""
+    host = urlsplit(url).netloc.lower()
+    with _limiters_lock:
+        if host not in _limiters:
+            shared = SharedHostLimits(host, _shared_client) if _shared_client is not None else None
+            _limiters[host] = HostLimiter(host, shared=shared)
+        return _limiters[host]
+
+
+def host_stats() -> Dict[str, dict]:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {host: limiter.stats() for host, limiter in limiters.items()}
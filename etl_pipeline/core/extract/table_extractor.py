@@ -8,6 +8,13 @@ from typing import List, Dict, Any
 
 logger = get_logger()
 
+try:
+    import lxml  # noqa: F401
+    # C parser, an order of magnitude faster than html5lib on large pages
+    FAST_PARSER = "lxml"
+except ImportError:
+    FAST_PARSER = "html.parser"
+
 class TableExtractor:
     '''
     A utility class for extracting and processing HTML tables into structured data. 
@@ -58,8 +65,9 @@ class TableExtractor:
         1    Bob   25
         ```
     '''
-    def __init__(self, html_content: str, required_headers: List[str], consider_empty_rows: bool = False):
-        self.soup = BeautifulSoup(html_content, 'html5lib')
+    def __init__(self, html_content: str, required_headers: List[str], consider_empty_rows: bool = False, parser: str = 'html5lib'):
+        # html5lib is the most lenient with broken markup; pass FAST_PARSER for well-formed pages
+        self.soup = BeautifulSoup(html_content, parser)
         self.required_headers = [header.lower() for header in required_headers]
         self.tables = self.soup.find_all('table')
         self.consider_empty_rows = consider_empty_rows
@@ -1,20 +1,25 @@
 from sqlalchemy.exc import NoResultFound, SQLAlchemyError
+from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import Optional
 import pandas as pd
 from db.models.metadata import Source, Unit, Currency, ExchangeRate
 from utility.logger import get_logger
-from utility.database import engine, SessionLocal
+from utility.database import get_engine, get_session
 
 logger = get_logger()
 
 class BaseLoader:
-    def __init__(self):
+    def __init__(self, session: Optional[Session] = None):
         self.logger = get_logger()
-        self.engine = engine
-        self.SessionLocal = SessionLocal
-        self.session = self.SessionLocal()
+        self.engine = get_engine()
+        # Reuse the run's shared session when given, otherwise own a private one
+        self._owns_session = session is None
+        self.session = session if session is not None else get_session()
 
     def close_session(self):
+        if not self._owns_session:
+            return
         try:
             self.session.close()
         except Exception as e:
@@ -1,16 +1,20 @@
+from typing import Optional
+
 import pandas as pd
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
 from db.models.input import ProductInput
 from db.models.metadata import Currency, Location, Product, Source, Unit
 from etl_pipeline.core.loader.base_loader import BaseLoader
+from utility.cache import invalidate_source
 from utility.logger import get_logger
 
 logger = get_logger()
 
 class ProductInputExcelLoader(BaseLoader):
-    def __init__(self, excel_path: str):
-        super().__init__()
+    def __init__(self, excel_path: str, session: Optional[Session] = None):
+        super().__init__(session=session)
         self.df = pd.read_excel(excel_path)
 
     def get_id_by_name(self, model, field, value):
@@ -90,6 +94,8 @@ class ProductInputExcelLoader(BaseLoader):
                 logger.error(f"Error processing row: {row.to_dict()}, Error: {str(e)}")
 
         logger.info(f"Finished loading. Total inserted: {inserted_count}")
+        if inserted_count:
+            invalidate_source()
         self.close_session()
 
 
@@ -1,5 +1,7 @@
+from typing import Optional
+
 import pandas as pd
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import Session, joinedload
 
 from db.models.input import ProductInput
 from db.models.metadata import Source
@@ -10,8 +12,8 @@ from utility.logger import get_logger
 logger = get_logger()
 
 class RawPriceFetcher(BaseLoader):
-    def __init__(self, website_name: str):
-        super().__init__()
+    def __init__(self, website_name: str, session: Optional[Session] = None):
+        super().__init__(session=session)
         self.source_name = website_name.strip().lower()
 
     def fetch(self) -> pd.DataFrame:
@@ -60,4 +62,4 @@ class RawPriceFetcher(BaseLoader):
             return pd.DataFrame()
 
         finally:
-            self.session.close()
+            self.close_session()
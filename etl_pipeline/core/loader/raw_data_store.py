@@ -1,21 +1,38 @@
+import time
 from datetime import datetime
+from typing import Callable, List, Optional
 
 import pandas as pd
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
 from db.models.input import ProductInput
 from db.models.metadata import Product, Source
 from db.models.raw_data import PriceRaw
 from etl_pipeline.core.loader.base_loader import BaseLoader
+from utility.cache import invalidate_source
+from utility.checkpoint import DONE, FAILED, CheckpointStore
 from utility.logger import get_logger
 
 logger = get_logger()
 
+# Rows per multi-row INSERT
+BULK_BATCH_SIZE = 1000
+# RawPriceSink flushes once this many rows are buffered ...
+SINK_FLUSH_ROWS = 5000
+# ... or once the oldest buffered frame is this old
+SINK_FLUSH_SECONDS = 30.0
+
 class RawPriceWriter(BaseLoader):
-    def __init__(self, df: pd.DataFrame, source_name: str):
-        super().__init__()
+    def __init__(self, df: pd.DataFrame, source_name: str, session: Optional[Session] = None):
+        super().__init__(session=session)
         self.df = df
         self.source_name = source_name.strip().lower()
+        # Outcome of the last save(), i.e. for throughput reports
+        self.counts = {"inserted": 0, "skipped": 0, "failed": 0}
+        # True when a database write failed, as opposed to rows rejected for bad values
+        self.write_failed = False
 
     def get_product_input_map(self) -> dict:
         try:
@@ -32,7 +49,48 @@ class RawPriceWriter(BaseLoader):
             logger.error(f"Error fetching product input mapping: {str(e)}")
             return {}
 
+    def build_records(self, mapping: dict, source_id: int) -> tuple:
+        """
+        Converts the DataFrame rows into `PriceRaw` column dicts.
+        Returns:
+            tuple: (records, skip_count, fail_count) where unknown products are skipped and
+                   rows with an unparsable price or date are counted as failed.
+        """
+        records = []
+        skip_count = 0
+        fail_count = 0
+        now = datetime.utcnow()
+        for row in self.df.to_dict("records"):
+            product_name = str(row.get("product", "")).strip().lower()
+            config_id = mapping.get(product_name)
+            if not config_id:
+                logger.warning(f"Skipping unknown product: {product_name}")
+                skip_count += 1
+                continue
+            try:
+                price_value = row.get("price_value") or row.get("Price")
+                price_date = pd.to_datetime(row.get("price_date") or row.get("Date"))
+                records.append({
+                    "source_id": source_id,
+                    "product_config_id": config_id,
+                    "price_date": price_date.date(),
+                    "price_value": float(str(price_value).replace(",", "").replace(" ", "")),
+                    "product_category": row.get("product_category"),
+                    "last_update": now,
+                })
+            except Exception as e:
+                logger.error(f"Failed row: {product_name} → {str(e)}")
+                fail_count += 1
+        return records, skip_count, fail_count
+
     def save(self) -> bool:
+        """
+        Bulk inserts the DataFrame into `products_raw_data`, BULK_BATCH_SIZE rows per statement.
+        Rows already stored for the same (source, date, product config) are skipped by the
+        unique constraint (ON CONFLICT DO NOTHING) instead of failing the batch.
+        Returns:
+            bool: True if at least one row was inserted.
+        """
         success_count = 0
         skip_count = 0
         fail_count = 0
@@ -45,50 +103,132 @@ class RawPriceWriter(BaseLoader):
                 return False
 
             source_id = source_obj.id
+            records, skip_count, fail_count = self.build_records(mapping, source_id)
 
-            for _, row in self.df.iterrows():
+            for start in range(0, len(records), BULK_BATCH_SIZE):
+                batch = records[start:start + BULK_BATCH_SIZE]
                 try:
-                    product_name = str(row.get("product", "")).strip().lower()
-                    price_value = row.get("price_value") or row.get("Price")
-                    price_date = pd.to_datetime(row.get("price_date") or row.get("Date"))
-                    category = row.get("product_category")
-
-                    config_id = mapping.get(product_name)
-                    if not config_id:
-                        logger.warning(f"Skipping unknown product: {product_name}")
-                        skip_count += 1
-                        continue
-
-                    record = PriceRaw(
-                        source_id=source_id,
-                        product_config_id=config_id,
-                        price_date=price_date,
-                        price_value=float(str(price_value).replace(",", "").replace(" ", "")),
-                        product_category=category,
-                        last_update=datetime.utcnow()
+                    stmt = (
+                        insert(PriceRaw.__table__)
+                        .values(batch)
+                        .on_conflict_do_nothing(constraint="uq_raw_source_product_config")
+                        .returning(PriceRaw.__table__.c.id)
                     )
-
-                    self.session.add(record)
+                    inserted = len(self.session.execute(stmt).fetchall())
                     self.session.commit()
-                    success_count += 1
-
-                except IntegrityError as ie:
-                    self.session.rollback()
-                    logger.warning(f"Duplicate skipped: {product_name} on {price_date.date()} (src={source_id}, cfg={config_id})")
-                    skip_count += 1
+                    success_count += inserted
+                    skip_count += len(batch) - inserted
 
-                except Exception as e:
+                except SQLAlchemyError as e:
                     self.session.rollback()
-                    logger.error(f"Failed row: {product_name} on {price_date} → {str(e)}")
-                    fail_count += 1
+                    self.write_failed = True
+                    logger.error(f"Failed batch of {len(batch)} rows → {str(e)}")
+                    fail_count += len(batch)
 
             logger.info(f"Inserted: {success_count}, Duplicates Skipped: {skip_count}, Failed: {fail_count}")
+            self.counts = {"inserted": success_count, "skipped": skip_count, "failed": fail_count}
+            if success_count:
+                invalidate_source(source_id)
             return True if success_count else False
 
         except Exception as e:
             logger.error(f"Total failure: {str(e)}")
+            self.write_failed = True
             self.session.rollback()
             return False
 
         finally:
-            self.session.close()
\ No newline at end of file
+            self.close_session()
+
+
+class RawPriceSink:
+    """
+    Write-behind buffer in front of `RawPriceWriter` for page-by-page extractions.
+    Parsed frames are buffered and flushed in one bulk save every `flush_rows` rows or
+    `flush_seconds` seconds, so memory stays bounded by one batch however long the range,
+    rows become visible while the run is still going, and the pages of each batch are
+    checkpointed as soon as it is stored.
+
+    Example:
+        sink = RawPriceSink("sunsirs", session=session)
+        for key, df in pages:
+            sink.add([key], df)
+        sink.close()
+    """
+
+    def __init__(
+        self,
+        source_name: str,
+        session: Optional[Session] = None,
+        flush_rows: int = SINK_FLUSH_ROWS,
+        flush_seconds: Optional[float] = SINK_FLUSH_SECONDS,
+        checkpoints: Optional[CheckpointStore] = None,
+        on_flush: Optional[Callable[[List[str], bool], None]] = None,
+    ):
+        self.source_name = source_name.strip().lower()
+        self.session = session
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.checkpoints = checkpoints
+        # Called with the keys of every flush and whether their rows were stored
+        self.on_flush = on_flush
+        self.counts = {"inserted": 0, "skipped": 0, "failed": 0}
+        self.flushes = 0
+        self.rows_written = 0
+        self.peak_buffered_rows = 0
+        self._keys: List[str] = []
+        self._frames: List[pd.DataFrame] = []
+        self._rows = 0
+        self._oldest: Optional[float] = None
+
+    def add(self, keys: List[str], df: pd.DataFrame) -> int:
+        """
+        Buffer the rows of `keys` (checkpoint unit keys, i.e. page dates), flushing when due.
+        Returns:
+            int: Rows flushed by this call, 0 when they were only buffered.
+        """
+        self._keys.extend(keys)
+        if not df.empty:
+            self._frames.append(df)
+            self._rows += len(df)
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        self.peak_buffered_rows = max(self.peak_buffered_rows, self._rows)
+        return self.flush() if self.due() else 0
+
+    def due(self) -> bool:
+        if self._rows >= self.flush_rows:
+            return True
+        return self.flush_seconds is not None and self._oldest is not None and time.monotonic() - self._oldest >= self.flush_seconds
+
+    def flush(self) -> int:
+        """Store the buffered rows in one bulk save and checkpoint their keys."""
+        keys, frames, rows = self._keys, self._frames, self._rows
+        self._keys, self._frames, self._rows, self._oldest = [], [], 0, None
+        if not keys:
+            return 0
+        write_failed = False
+        if frames:
+            writer = RawPriceWriter(df=pd.concat(frames, ignore_index=True), source_name=self.source_name, session=self.session)
+            writer.save()
+            write_failed = writer.write_failed
+            for key, value in writer.counts.items():
+                self.counts[key] += value
+            self.flushes += 1
+            self.rows_written += rows
+        if self.checkpoints is not None:
+            # Duplicates and rows rejected for bad values count as stored; refetching won't change them
+            if write_failed:
+                self.checkpoints.mark(keys, FAILED, detail="write failed")
+            else:
+                self.checkpoints.mark(keys, DONE)
+        if self.on_flush is not None:
+            self.on_flush(keys, not write_failed)
+        return rows
+
+    def close(self) -> int:
+        """Flush whatever is left; call once the extraction is done."""
+        return self.flush()
+
+    def stats(self) -> dict:
+        return {"flushes": self.flushes, "rows": self.rows_written, "peak_buffered_rows": self.peak_buffered_rows, **self.counts}
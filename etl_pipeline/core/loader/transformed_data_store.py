@@ -1,17 +1,21 @@
 from datetime import datetime
+from typing import Optional
 
 import pandas as pd
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
 
 from etl_pipeline.core.loader.base_loader import BaseLoader
-from db.models.transformed import PriceStandardized
+from db.models.transformed import LatestPrice, PriceStandardized
+from utility.cache import invalidate_source
 from utility.logger import get_logger
 
 logger = get_logger()
 
 class StandardizedPriceWriter(BaseLoader):
-    def __init__(self, df: pd.DataFrame, source_name: str):
-        super().__init__()
+    def __init__(self, df: pd.DataFrame, source_name: str, session: Optional[Session] = None):
+        super().__init__(session=session)
         self.df = df
         self.source_name = source_name.strip().lower()
 
@@ -19,6 +23,7 @@ class StandardizedPriceWriter(BaseLoader):
         success_count = 0
         skip_count = 0
         fail_count = 0
+        latest = {}
         try:
             for _, row in self.df.iterrows():
                 try:
@@ -46,20 +51,39 @@ class StandardizedPriceWriter(BaseLoader):
                         last_update=datetime.utcnow()
                     )
                     self.session.add(record)
+                    self.session.flush()
+                    snapshot = {
+                        "source_id": record.source_id,
+                        "product_id": record.product_id,
+                        "location_id": record.location_id,
+                        "quantity": record.quantity,
+                        "unit_id": record.unit_id,
+                        "price_usd": record.price_usd,
+                        "source_date": record.source_date,
+                        "standard_data_id": record.id,
+                    }
                     self.session.commit()
                     success_count += 1
 
+                    # Keep only the newest committed row per snapshot key
+                    key = (snapshot["source_id"], snapshot["product_id"], snapshot["location_id"])
+                    if snapshot["location_id"] is not None and (key not in latest or latest[key]["source_date"] <= snapshot["source_date"]):
+                        latest[key] = snapshot
+
                 except IntegrityError as ie:
                     self.session.rollback()
-                    logger.warning(f"Duplicate skipped: {source_obj} on {row.get("price_date")}")
+                    logger.warning(f"Duplicate skipped: {source_obj} on {row.get('price_date')}")
                     skip_count += 1
 
                 except Exception as e:
                     self.session.rollback()
-                    logger.error(f"Failed row: {source_obj} on {row.get("price_date")} → {str(e)}")
+                    logger.error(f"Failed row: {source_obj} on {row.get('price_date')} → {str(e)}")
                     fail_count += 1
 
             logger.info(f"Inserted: {success_count}, Duplicates Skipped: {skip_count}, Failed: {fail_count}")
+            self.upsert_latest_prices(list(latest.values()))
+            if success_count:
+                invalidate_source(source_obj.id)
             return True if success_count else False
 
         except Exception as e:
@@ -67,3 +91,41 @@ class StandardizedPriceWriter(BaseLoader):
             self.session.rollback()
         finally:
             self.close_session()
+
+    def upsert_latest_prices(self, snapshots: list) -> int:
+        """
+        Upsert the `latest_price` snapshot with newly committed standardized prices.
+        A snapshot row is only replaced when the incoming `source_date` is newer than the
+        stored one, so late backfills never overwrite fresher prices.
+        Args:
+            snapshots (list): One dict per (source_id, product_id, location_id) key with the
+                              columns of `LatestPrice`.
+        Returns:
+            int: Number of snapshot rows sent to the database.
+        """
+        if not snapshots:
+            return 0
+
+        try:
+            stmt = insert(LatestPrice.__table__).values(snapshots)
+            excluded = stmt.excluded
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["source_id", "product_id", "location_id"],
+                set_={
+                    "quantity": excluded.quantity,
+                    "unit_id": excluded.unit_id,
+                    "price_usd": excluded.price_usd,
+                    "source_date": excluded.source_date,
+                    "standard_data_id": excluded.standard_data_id,
+                    "last_update": datetime.utcnow(),
+                },
+                where=LatestPrice.__table__.c.source_date < excluded.source_date,
+            )
+            self.session.execute(stmt)
+            self.session.commit()
+            logger.info(f"Latest price snapshot upserted for {len(snapshots)} keys.")
+            return len(snapshots)
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error upserting latest price snapshot: {str(e)}")
+            return 0
@@ -0,0 +1,193 @@
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from etl_pipeline.core.config.registry import build_extractor, load_website_configs
+from etl_pipeline.core.extract.declarative_extractor import DeclarativeTableExtractor, parse_table_page
+from etl_pipeline.core.extract.host_limiter import share_host_limits
+from etl_pipeline.core.loader.raw_data_store import SINK_FLUSH_ROWS, SINK_FLUSH_SECONDS, RawPriceSink
+from utility.cache import InMemoryRedis, get_redis
+from utility.checkpoint import EMPTY, CheckpointStore
+from utility.database import get_session
+from utility.logger import get_logger
+from utility.work_queue import WorkQueue, consume
+
+logger = get_logger()
+
+# Queue of page fetches shared by every declarative source
+FETCH_QUEUE = "fetch"
+
+# Distributed mode of the declarative engine:
+#     etl enqueue sunsirs --from 2024-01-01 --to 2024-12-31    # planner, once
+#     etl worker --processes 4                                 # on any number of hosts
+
+
+def unit_id(source: str, key: str) -> str:
+    return f"{source}:{key}"
+
+
+def _declarative_extractor(source: str, session=None) -> DeclarativeTableExtractor:
+    config = load_website_configs().get(source)
+    if config is None:
+        raise ValueError(f"Unknown source '{source}'")
+    extractor = build_extractor(source, config.get("extractor"), config["config_file"], session=session)
+    if not isinstance(extractor, DeclarativeTableExtractor):
+        raise ValueError(f"{source} has no table_spec, only declarative sources can be queued")
+    return extractor
+
+
+def enqueue_range(source: str, start_date, end_date, resume: bool = False, queue: Optional[WorkQueue] = None) -> int:
+    """
+    Plan the pages of `source` between the two dates (inclusive) and queue one unit per page.
+    Args:
+        resume (bool): Leave out dates already checkpointed as done.
+    Returns:
+        int: Number of units added (pages already queued are not added twice).
+    """
+    queue = queue or WorkQueue(FETCH_QUEUE)
+    extractor = _declarative_extractor(source)
+    targets = extractor.pending_targets(start_date, end_date) if resume else extractor.plan_targets(start_date, end_date)
+    units = [
+        {"id": unit_id(source, extractor.unit_key(date)), "source": source, "url": url, "date": date.isoformat()}
+        for date, url in targets
+    ]
+    added = queue.enqueue(units)
+    logger.info(f"Queued {added} of {len(units)} {source} pages from {start_date} to {end_date}")
+    return added
+
+
+class QueueWorker:
+    """
+    Claims page units from the fetch queue, fetches and parses them and streams the rows to
+    the raw store through one `RawPriceSink` per source. A unit is acked only once the batch
+    holding its rows is stored, so a worker dying with buffered rows loses nothing: its
+    claims lapse and the pages are fetched again.
+    A worker handles one unit at a time, so it has at most one fetch in flight; the fleet
+    as a whole is held to HOST_CLUSTER_CONCURRENCY fetches per host (see `_work`).
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        flush_rows: int = SINK_FLUSH_ROWS,
+        flush_seconds: float = SINK_FLUSH_SECONDS,
+    ):
+        # Buffered rows must be stored (and their units acked) well before the claims lapse
+        if flush_seconds >= queue.visibility_seconds:
+            raise ValueError(f"flush_seconds ({flush_seconds}) must be below the queue visibility timeout ({queue.visibility_seconds})")
+        self.queue = queue
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.session = get_session()
+        self._sources: Dict[str, Tuple[DeclarativeTableExtractor, RawPriceSink]] = {}
+        self.counts = {"pages": 0, "empty": 0, "failed": 0}
+
+    def _source(self, source: str) -> Tuple[DeclarativeTableExtractor, RawPriceSink]:
+        if source not in self._sources:
+            extractor = _declarative_extractor(source, session=self.session)
+
+            def on_flush(keys: List[str], stored: bool) -> None:
+                for key in keys:
+                    if stored:
+                        self.queue.ack(unit_id(source, key))
+                    else:
+                        self.queue.nack(unit_id(source, key), "write failed")
+
+            sink = RawPriceSink(
+                source,
+                session=self.session,
+                flush_rows=self.flush_rows,
+                flush_seconds=self.flush_seconds,
+                checkpoints=CheckpointStore(source),
+                on_flush=on_flush,
+            )
+            self._sources[source] = (extractor, sink)
+        return self._sources[source]
+
+    def handle(self, unit: dict) -> None:
+        extractor, sink = self._source(unit["source"])
+        target_date = datetime.fromisoformat(unit["date"])
+        _, html_content = extractor.fetch_target((target_date, unit["url"]))
+        if html_content is None:
+            self.counts["failed"] += 1
+            self.queue.nack(unit["id"], "fetch failed")
+            return
+        df = parse_table_page(html_content, target_date, extractor.spec)
+        self.counts["pages"] += 1
+        if df.empty:
+            logger.warning(f"No matching data found for {unit['id']}")
+            self.counts["empty"] += 1
+            sink.checkpoints.mark([extractor.unit_key(target_date)], EMPTY)
+            self.queue.ack(unit["id"])
+            return
+        sink.add([extractor.unit_key(target_date)], df)
+
+    def flush(self) -> None:
+        for _, sink in self._sources.values():
+            sink.flush()
+
+    def flush_due(self) -> None:
+        """Flush the sinks whose rows are due, i.e. of a source no unit came for lately."""
+        for _, sink in self._sources.values():
+            if sink.due():
+                sink.flush()
+
+    def run(self, drain: bool = False) -> dict:
+        """
+        Work the queue until it is drained (`drain`) or forever.
+        Returns:
+            dict: Pages handled, rows written and throughput of this worker.
+        """
+        started = time.perf_counter()
+        try:
+            handled = consume(self.queue, self.handle, on_idle=self.flush, drain=drain, before_claim=self.flush_due)
+        finally:
+            self.flush()
+            self.session.close()
+        elapsed = time.perf_counter() - started
+        rows = sum(sink.rows_written for _, sink in self._sources.values())
+        return {
+            "worker": f"{socket.gethostname()}/{os.getpid()}",
+            "units": handled,
+            **self.counts,
+            "rows": rows,
+            "elapsed_seconds": round(elapsed, 3),
+            "pages_per_second": round(self.counts["pages"] / elapsed, 3) if elapsed else None,
+        }
+
+
+def _work(queue_name: str, drain: bool, flush_rows: int, flush_seconds: float) -> dict:
+    """Entry point of one worker (process or thread)."""
+    # Host limiters are per process: share their pause and cap with the rest of the fleet
+    share_host_limits(get_redis())
+    return QueueWorker(WorkQueue(queue_name), flush_rows=flush_rows, flush_seconds=flush_seconds).run(drain=drain)
+
+
+def run_workers(
+    processes: int,
+    queue_name: str = FETCH_QUEUE,
+    drain: bool = False,
+    flush_rows: int = SINK_FLUSH_ROWS,
+    flush_seconds: float = SINK_FLUSH_SECONDS,
+) -> List[dict]:
+    """
+    Run `processes` workers on this host and wait for them.
+    With the in-process Redis stand-in (REDIS_URL=memory://) the queue only exists in this
+    process, so the workers run as threads instead. Every worker fetches one page at a time
+    and all of them, on every host, share each site's throttling pause and
+    HOST_CLUSTER_CONCURRENCY cap through Redis, however many are started.
+    Returns:
+        List[dict]: The report of every worker.
+    """
+    if isinstance(get_redis(), InMemoryRedis):
+        executor = ThreadPoolExecutor(max_workers=processes)
+    else:
+        # spawn: every worker gets its own Redis connection and database pool
+        executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+    with executor:
+        futures = [executor.submit(_work, queue_name, drain, flush_rows, flush_seconds) for _ in range(processes)]
+        return [future.result() for future in futures]
@@ -0,0 +1,317 @@
+import asyncio
+import multiprocessing
+import os
+import random
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from etl_pipeline.core.extract.declarative_extractor import DeclarativeTableExtractor, parse_table_page
+from etl_pipeline.core.extract.host_limiter import (
+    ERROR,
+    FETCH_ATTEMPTS,
+    FETCH_TIMEOUT_SECONDS,
+    THROTTLED,
+    host_limiter,
+    host_stats,
+    outcome_for_status,
+    parse_retry_after,
+)
+from etl_pipeline.core.loader.raw_data_store import SINK_FLUSH_ROWS, SINK_FLUSH_SECONDS, RawPriceSink
+from utility.checkpoint import EMPTY, FAILED, CheckpointStore, WallClockBudget
+from utility.logger import get_logger
+
+logger = get_logger()
+
+# Rows buffered by the writer before one bulk save
+WRITE_BATCH_ROWS = SINK_FLUSH_ROWS
+
+
+def outcome_for_transport_error(error: httpx.TransportError, proxied: bool) -> str:
+    """
+    Outcome of a transport error for the host's `HostLimiter`: a failing proxy, or a
+    connection to it that could not be opened, says nothing about the host (ERROR); a
+    timeout or dropped connection of the host itself is THROTTLED.
+    """
+    if isinstance(error, httpx.ProxyError) or (proxied and isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))):
+        return ERROR
+    return THROTTLED
+
+
+class StageStats:
+    """Counters of one pipeline stage for the throughput report."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.max_queue = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "items": self.items,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "max_queue": self.max_queue,
+        }
+
+
+class PipelineRunner:
+    """
+    Runs a declarative table extraction as three concurrent stages joined by bounded queues:
+
+        targets -> [fetch: async tasks] -> [parse: process pool] -> [write: batching writer]
+
+    Network I/O runs as `workers` asyncio tasks, parsing (the CPU bound part) in a process
+    pool and writing in one thread through a `RawPriceSink` that bulk saves every
+    `batch_rows` rows or `flush_seconds` seconds. Every queue
+    holds at most `queue_size` items, so a slow stage blocks the ones before it instead of
+    buffering the whole range in memory (backpressure).
+    `workers` is an upper bound, the host's `HostLimiter` decides how many fetches are
+    actually in flight.
+    Every page is checkpointed once its batch is written (or it failed / had no data), so
+    `run(..., resume=True)` continues an interrupted backfill where it stopped.
+    """
+
+    def __init__(
+        self,
+        extractor: DeclarativeTableExtractor,
+        workers: int = 8,
+        parse_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        batch_rows: int = WRITE_BATCH_ROWS,
+        use_proxy: bool = True,
+        flush_seconds: Optional[float] = SINK_FLUSH_SECONDS,
+    ):
+        self.extractor = extractor
+        self.spec = extractor.spec
+        self.workers = workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = queue_size or workers * 2
+        self.batch_rows = batch_rows
+        self.use_proxy = use_proxy
+        self.stats = {name: StageStats(name) for name in ("fetch", "parse", "write")}
+        self._clients: Dict[Optional[str], httpx.AsyncClient] = {}
+        # Proxy URLs, fetched off the event loop once per run
+        self._proxies: List[str] = []
+        self.checkpoints = CheckpointStore(extractor.source_name)
+        self.sink = RawPriceSink(
+            extractor.source_name,
+            session=extractor.session,
+            flush_rows=batch_rows,
+            flush_seconds=flush_seconds,
+            checkpoints=self.checkpoints,
+        )
+
+    def _proxy_urls(self) -> List[str]:
+        """The URLs of the extractor's proxy pool; blocking (the pool may be downloaded first)."""
+        # as_requests_dict() gives 'ip:port' without a scheme, which httpx refuses. The protocol
+        # of a swiftshadow proxy is what it can carry (https: CONNECT tunnels), it is always
+        # spoken to over plain http
+        return [f"http://{proxy.ip}:{proxy.port}" for proxy in self.extractor.get_proxy_interface().proxies]
+
+    def _pick_proxy(self, avoid: Optional[str] = None) -> Optional[str]:
+        """A proxy URL of the pool, another one than `avoid` (the one that just failed) when there is one."""
+        candidates = [proxy for proxy in self._proxies if proxy != avoid] or self._proxies
+        return random.choice(candidates) if candidates else None
+
+    def _client(self, proxy: Optional[str]) -> httpx.AsyncClient:
+        """Pooled HTTP client, one per proxy when proxies are in use."""
+        if proxy not in self._clients:
+            self._clients[proxy] = httpx.AsyncClient(
+                proxy=proxy,
+                timeout=FETCH_TIMEOUT_SECONDS,
+                headers=self.spec["headers"],
+                limits=httpx.Limits(max_connections=self.workers, max_keepalive_connections=self.workers),
+                follow_redirects=True,
+            )
+        return self._clients[proxy]
+
+    async def _fetch(self, url: str) -> bytes:
+        """
+        GET through the host's `HostLimiter`, retrying what it reports as throttling and
+        transport errors; a failing proxy is reported as an error, not throttling, and the
+        retry goes through another proxy.
+        """
+        limiter = host_limiter(url)
+        proxy = None
+        for attempt in range(1, FETCH_ATTEMPTS + 1):
+            await limiter.acquire_async()
+            started = time.monotonic()
+            # The slot goes back however the attempt ends, cancellation included
+            outcome, retry_after = ERROR, None
+            proxy = self._pick_proxy(avoid=proxy)
+            try:
+                response = await self._client(proxy).get(url)
+                outcome = outcome_for_status(response.status_code)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            except httpx.TransportError as e:
+                outcome = outcome_for_transport_error(e, proxied=proxy is not None)
+                if attempt == FETCH_ATTEMPTS:
+                    raise
+                logger.warning(f"Fetch of {url} failed ({e!r}), retrying")
+                continue
+            finally:
+                limiter.release(time.monotonic() - started, outcome, retry_after=retry_after)
+            if outcome == THROTTLED and attempt < FETCH_ATTEMPTS:
+                logger.warning(f"Fetch of {url} got HTTP {response.status_code}, retrying")
+                continue
+            response.raise_for_status()
+            return response.content
+
+    async def _fetch_stage(self, fetch_q: asyncio.Queue, parse_q: asyncio.Queue) -> None:
+        stats = self.stats["fetch"]
+        while True:
+            target = await fetch_q.get()
+            if target is None:
+                return
+            target_date, url = target
+            started = time.perf_counter()
+            try:
+                html_content = await self._fetch(url)
+                stats.items += 1
+            except Exception as e:
+                logger.error(f"Failed to fetch data for {target_date.date()}: {str(e)}")
+                stats.failed += 1
+                await asyncio.to_thread(self.checkpoints.mark, [self.extractor.unit_key(target_date)], FAILED, "fetch failed")
+                continue
+            finally:
+                stats.busy_seconds += time.perf_counter() - started
+            await parse_q.put((target_date, html_content))
+            stats.max_queue = max(stats.max_queue, parse_q.qsize())
+
+    async def _parse_stage(self, pool: ProcessPoolExecutor, parse_q: asyncio.Queue, write_q: asyncio.Queue) -> None:
+        stats = self.stats["parse"]
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await parse_q.get()
+            if item is None:
+                return
+            target_date, html_content = item
+            key = self.extractor.unit_key(target_date)
+            started = time.perf_counter()
+            try:
+                df = await loop.run_in_executor(pool, parse_table_page, html_content, target_date, self.spec)
+                stats.items += 1
+            except Exception as e:
+                logger.error(f"Failed to parse data for {target_date.date()}: {str(e)}")
+                stats.failed += 1
+                await asyncio.to_thread(self.checkpoints.mark, [key], FAILED, "parse failed")
+                continue
+            finally:
+                stats.busy_seconds += time.perf_counter() - started
+            if df.empty:
+                logger.warning(f"No matching data found for date: {target_date.date()}")
+                await asyncio.to_thread(self.checkpoints.mark, [key], EMPTY)
+                continue
+            await write_q.put((key, df))
+            stats.max_queue = max(stats.max_queue, write_q.qsize())
+
+    async def _write_stage(self, write_q: asyncio.Queue) -> None:
+        """Feeds parsed pages to the sink in a worker thread, one call at a time."""
+        stats = self.stats["write"]
+        while True:
+            item = await write_q.get()
+            started = time.perf_counter()
+            try:
+                if item is None:
+                    stats.items += await asyncio.to_thread(self.sink.close)
+                    return
+                key, df = item
+                stats.items += await asyncio.to_thread(self.sink.add, [key], df)
+            finally:
+                stats.busy_seconds += time.perf_counter() - started
+
+    async def run(self, start_date, end_date, resume: bool = False, budget_seconds: Optional[float] = None) -> dict:
+        """
+        Extract and store every page between the two dates (inclusive).
+        Args:
+            resume (bool): Skip dates already checkpointed as done.
+            budget_seconds (Optional[float]): Wall-clock budget; once spent no new page is
+                                              queued, the queued ones are drained and the run
+                                              stops cleanly.
+        Returns:
+            dict: Throughput report with page/row counts, per-stage busy time and queue peaks.
+        """
+        targets: List[Tuple[datetime, str]] = self.extractor.plan_targets(start_date, end_date)
+        planned = len(targets)
+        if resume:
+            pending = set(await asyncio.to_thread(self.checkpoints.pending, [self.extractor.unit_key(date) for date, _ in targets]))
+            targets = [target for target in targets if self.extractor.unit_key(target[0]) in pending]
+        budget = WallClockBudget(budget_seconds)
+        fetch_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        parse_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        write_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        started = time.perf_counter()
+
+        if self.use_proxy:
+            self._proxies = await asyncio.to_thread(self._proxy_urls)
+
+        # spawn: forking a process that already runs threads and an event loop is unsafe
+        pool = ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn"))
+        fetchers = [asyncio.create_task(self._fetch_stage(fetch_q, parse_q)) for _ in range(self.workers)]
+        parsers = [asyncio.create_task(self._parse_stage(pool, parse_q, write_q)) for _ in range(self.parse_workers)]
+        writer = asyncio.create_task(self._write_stage(write_q))
+
+        async def feed() -> int:
+            queued = 0
+            for target in targets:
+                if budget.exhausted():
+                    logger.info(f"Time budget of {budget_seconds}s spent after {queued} pages, stopping; rerun with resume to continue.")
+                    break
+                await fetch_q.put(target)
+                queued += 1
+            # Each stage is closed with one sentinel per consumer once its producers are done
+            for _ in fetchers:
+                await fetch_q.put(None)
+            await asyncio.gather(*fetchers)
+            for _ in parsers:
+                await parse_q.put(None)
+            await asyncio.gather(*parsers)
+            await write_q.put(None)
+            await writer
+            return queued
+
+        feeder = asyncio.create_task(feed())
+        stages = [feeder, *fetchers, *parsers, writer]
+        try:
+            # A stage that dies stops the run: its queue would never drain and the feeder
+            # would wait on it forever
+            done, _ = await asyncio.wait(stages, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+            queued = feeder.result()
+        finally:
+            for task in stages:
+                task.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            pool.shutdown(wait=False, cancel_futures=True)
+            for client in self._clients.values():
+                await client.aclose()
+
+        elapsed = time.perf_counter() - started
+        rows = self.stats["write"].items
+        return {
+            "source": self.extractor.source_name,
+            "start_date": str(start_date),
+            "end_date": str(end_date),
+            "pages": queued,
+            "planned_pages": planned,
+            "remaining_pages": len(targets) - queued,
+            **self.sink.counts,
+            "flushes": self.sink.flushes,
+            "peak_buffered_rows": self.sink.peak_buffered_rows,
+            # ru_maxrss is in KiB on Linux
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "elapsed_seconds": round(elapsed, 3),
+            "pages_per_second": round(self.stats["fetch"].items / elapsed, 3) if elapsed else None,
+            "rows_per_second": round(rows / elapsed, 3) if elapsed else None,
+            "stages": {name: stats.as_dict() for name, stats in self.stats.items()},
+            "hosts": host_stats(),
+        }
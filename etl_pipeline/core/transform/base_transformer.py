@@ -1,21 +1,31 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import pandas as pd
 from requests.exceptions import HTTPError, RequestException, Timeout
+from sqlalchemy.orm import Session
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from etl_pipeline.core.transform.uom_conversion import UOMConverter
 from utility.logger import get_logger
-from utility.database import engine, SessionLocal
+from utility.database import get_engine, get_session
 
 logger = get_logger()
 class BaseTransformer(ABC):
-    def __init__(self):
+    def __init__(self, session: Optional[Session] = None):
         self.logger = get_logger()
-        self.engine = engine
-        self.SessionLocal = SessionLocal
-        self.session = self.SessionLocal()
+        self.engine = get_engine()
+        # Reuse the run's shared session when given, otherwise own a private one
+        self._owns_session = session is None
+        self.session = session if session is not None else get_session()
+
+    def close_session(self):
+        if not self._owns_session:
+            return
+        try:
+            self.session.close()
+        except Exception as e:
+            self.logger.error(f"Error closing session: {str(e)}")
 
     @abstractmethod
     def transform(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -1,7 +1,6 @@
-from datetime import datetime
-from typing import Any, Dict, List
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
 import re
-import time
 
 import pandas as pd
 from dateutil import parser
@@ -13,10 +12,13 @@ from etl_pipeline.core.loader.base_loader import BaseLoader
 from etl_pipeline.core.loader.transformed_data_store import StandardizedPriceWriter
 from etl_pipeline.core.transform.base_transformer import BaseTransformer
 from db.models.metadata import Currency
-from utility.yaml_loader import load_yaml_config
+from utility.checkpoint import DONE, EMPTY, FAILED, CheckpointStore, WallClockBudget
 
 
-config = load_yaml_config("etl_pipeline/core/config/websites/sunsirs.yaml")
+def window_end(year: int, month: int) -> date:
+    """Last day of the four-month exchange rate window starting in `month` of `year`."""
+    return (pd.Timestamp(year=year, month=month, day=1) + pd.DateOffset(months=4) - pd.Timedelta(days=1)).date()
+
 
 class SunsirsTransformer(BaseTransformer):
     def transform(self) -> Dict[str, Any]:
@@ -33,7 +35,7 @@ class SunsirsTransformer(BaseTransformer):
         4. Save the transformed data using the `StandardizedPriceWriter` if the DataFrame is not empty.
         """
         try:
-            fetcher = RawPriceFetcher("sunsirs")
+            fetcher = RawPriceFetcher("sunsirs", session=self.session)
             data = fetcher.fetch()
             self.logger.info(f"Fetched Data: {list(data.columns)}")
 
@@ -48,7 +50,7 @@ class SunsirsTransformer(BaseTransformer):
             uom_converted_data = self.merge_uom_metadata_to_df(df=data, metadata=website_uom_data)
             
             if not uom_converted_data.empty:
-                writer = StandardizedPriceWriter(df=uom_converted_data, source_name="sunsirs")
+                writer = StandardizedPriceWriter(df=uom_converted_data, source_name="sunsirs", session=self.session)
                 writer.save()
                 self.logger.info(f"Data saved successfully for {len(uom_converted_data)} records.")
                 return True
@@ -167,15 +169,27 @@ class ExchangeRateExtractor(BaseExtractor):
             self.logger.error(f"Failed to fetch exchange rate data: {str(e)}")
             return pd.DataFrame()
 
-    def extract(self) -> Dict[str, Any]:
+    def extract(self, resume: bool = False, budget_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Scrapes USD exchange rates per currency in four-month windows since 2019.
+        Every (currency, window) is checkpointed once stored, i.e. 'USD-EUR:2024-05', so a
+        rerun with `resume` only fetches the windows that are not done yet. A window that
+        has not ended yet is stored but left pending, so later runs fill in its new days.
+        Args:
+            resume (bool): Skip windows already checkpointed as done.
+            budget_seconds (Optional[float]): Wall-clock budget; once spent no new window is
+                                              fetched and the run stops cleanly.
+        """
         try:
+            # One loader for the whole run, sharing this extractor's session
+            loader = BaseLoader(session=self.session)
             try:
                 # Check if Currency table is empty
                 if not self.is_model_empty(Currency):
                     self.logger.info("Currency table is empty. Calling Currency Code Scrapper code for data.")
                     currency_dict = self.get_currency_options()
                     self.logger.info("Called Currency Code Scrapper code for data.")
-                    if BaseLoader().insert_currencies_data(currency_dict=currency_dict):
+                    if loader.insert_currencies_data(currency_dict=currency_dict):
                         self.logger.info("Currency data inserted successfully.")
                     else:
                         self.logger.error("Failed to insert currency data.")
@@ -191,24 +205,37 @@ class ExchangeRateExtractor(BaseExtractor):
                     return False
                 
                 currency_codes = ['USD','EUR','GBP','AUD','CAD','JPY','CHF','CNY','SEK','NZD','MXN','SGD','HKD','NOK','KRW','TRY','BRL','ZAR','INR']
+                checkpoints = CheckpointStore("exchange_rate")
+                done = checkpoints.completed() if resume else set()
+                budget = WallClockBudget(budget_seconds)
+                today = date.today()
                 for year in range(2019, datetime.now().year + 1):
                     for month in range(1, 12, 4):
                         for code in currency_codes:
                             if code == "USD":
                                 continue
+                            unit = f"USD-{code}:{year}-{month:02d}"
+                            if unit in done:
+                                continue
+                            if budget.exhausted():
+                                self.logger.info(f"Time budget of {budget_seconds}s spent, stopping at {unit}; rerun with resume to continue.")
+                                return False
                             self.logger.info(f"Fetching exchange rate data for {code} from USD")
                             df = self.fetch_exchange_rate_data(from_month=month, to_month=month+3, from_year=year, to_year=year, cur_from="USD", cur_to=code)
                             
                             if not df.empty:
                                 self.logger.info(f"Data fetched successfully for {code} from USD")
-                                time.sleep(5)
                                 self.logger.info(f"Data fetched From {month}-{year} to {month+3}-{year}: \n{df.head(5)}")
                                 self.logger.info(f"Data fetched From {month}-{year} to {month+3}-{year}: {df.iloc[1].tolist()}")
-                                BaseLoader().store_exchange_rate_dataframe(df=df, from_code="USD", to_code=code)
-                                # Save the data to the database or perform further processing
-                                # For example: save_to_database(df)
+                                if not loader.store_exchange_rate_dataframe(df=df, from_code="USD", to_code=code):
+                                    checkpoints.mark([unit], FAILED, detail="store failed")
+                                elif window_end(year, month) >= today:
+                                    self.logger.info(f"Window {unit} is still open, leaving it pending.")
+                                else:
+                                    checkpoints.mark([unit], DONE)
                             else:
                                 self.logger.error(f"No data found for {code} from USD")
+                                checkpoints.mark([unit], EMPTY)
 
             except Exception as e:
                 self.logger.error(f"Failed to extract data for: {str(e)}")
@@ -218,17 +245,6 @@ class ExchangeRateExtractor(BaseExtractor):
             return False
     
 def main():
-    extractor = ExchangeRateExtractor()
-    extracted_data = extractor.extract()
-    if extracted_data:
-        print("Data extraction completed successfully.")
-    else:
-        print("Data extraction failed.")
-
-    # transformer = SunsirsTransformer()
-    # transformed_data = transformer.transform()
-    
-    # if transformed_data:
-    #     self.logger.info("Data transformation completed successfully.")
-    # else:
-    #     self.logger.error("Data transformation failed.")
\ No newline at end of file
+    """Run the exchange rate extraction outside Airflow, same as `python -m etl_pipeline.cli run exchange_rate`."""
+    from etl_pipeline.cli import main as cli_main
+    return cli_main(["run", "exchange_rate"])
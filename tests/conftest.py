@@ -0,0 +1,43 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Run from anywhere: the packages are imported from the repository root
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Unit tests never talk to a real Redis; set before any module reads the setting
+os.environ["REDIS_URL"] = "memory://"
+
+
+@pytest.fixture
+def memory_redis():
+    """A fresh in-process Redis stand-in, installed as the process-wide client."""
+    from utility.cache import InMemoryRedis, set_redis
+
+    client = InMemoryRedis()
+    set_redis(client)
+    yield client
+    set_redis(None)
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """
+    Points the lazy engine at PR_TEST_DATABASE_URL (a database migrated with
+    `alembic upgrade head`); the test is skipped when it is not set. Tests clean up the rows
+    they write themselves, keyed on names of their own.
+    """
+    url = os.environ.get("PR_TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("PR_TEST_DATABASE_URL not set")
+    from utility import database as db
+
+    monkeypatch.setenv("PR_DATABASE_URL", url)
+    # The API's async engine derives its URL from PR_DATABASE_URL
+    monkeypatch.delenv("PR_ASYNC_DATABASE_URL", raising=False)
+    db.dispose_engine()
+    yield db
+    db.dispose_engine()
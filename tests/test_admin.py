@@ -0,0 +1,29 @@
+from api_server.app.dashboard import admin
+from db.models.input import ProductInput
+from db.models.metadata import Product, Source
+from utility.cache import generation_key
+
+
+class FakeSession:
+    def execute(self, statement):
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return [3, 4]
+        return Result()
+
+    def close(self):
+        pass
+
+
+def test_admin_edits_invalidate_the_affected_sources(memory_redis, monkeypatch):
+    admin.invalidate_cached_responses(Source(id=1, name="sunsirs"))
+    admin.invalidate_cached_responses(ProductInput(source_id=2, product_id=1))
+    assert memory_redis.mget([generation_key(1), generation_key(2), generation_key()]) == [b"1", b"1", b"2"]
+
+    # Shared metadata shows up in every source's responses
+    monkeypatch.setattr(admin, "get_session", FakeSession)
+    admin.invalidate_cached_responses(Product(id=9, name="Urea"))
+    assert memory_redis.mget([generation_key(3), generation_key(4), generation_key()]) == [b"1", b"1", b"3"]
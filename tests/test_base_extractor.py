@@ -0,0 +1,62 @@
+import pytest
+import requests
+from requests.exceptions import ConnectionError, ConnectTimeout, ProxyError, ReadTimeout
+from swiftshadow.models import Proxy
+
+from etl_pipeline.core.extract.base_extractor import BaseExtractor, outcome_for_request_error
+from etl_pipeline.core.extract.host_limiter import ERROR, OK, THROTTLED, host_limiter
+from utility import database
+
+
+def test_request_error_outcomes():
+    assert outcome_for_request_error(ProxyError("tunnel refused"), proxied=True) == ERROR
+    assert outcome_for_request_error(ConnectTimeout("proxy unreachable"), proxied=True) == ERROR
+    # Without a proxy the connection is the host's own
+    assert outcome_for_request_error(ConnectTimeout("host unreachable"), proxied=False) == THROTTLED
+    assert outcome_for_request_error(ConnectionError("reset by host"), proxied=True) == THROTTLED
+    assert outcome_for_request_error(ReadTimeout("slow host"), proxied=True) == THROTTLED
+
+
+class ProxyPool:
+    proxies = [Proxy(ip="10.0.0.1", protocol="https", port=8080), Proxy(ip="10.0.0.2", protocol="https", port=3128)]
+
+    def get(self):
+        return self.proxies[0]
+
+
+class FlakyProxyHttp:
+    """The first proxy refuses every request, the second one gets through."""
+
+    def __init__(self):
+        self.proxies = []
+
+    def get(self, url, headers, params, proxies, timeout):
+        self.proxies.append(proxies["https"])
+        if proxies["https"] == "10.0.0.1:8080":
+            raise ProxyError("tunnel refused")
+        response = requests.Response()
+        response.status_code, response._content, response.url = 200, b"<html></html>", url
+        return response
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    """A BaseExtractor whose lazy database session never connects."""
+    monkeypatch.setenv("PR_DATABASE_URL", "postgresql://user@localhost/unused")
+    database.dispose_engine()
+    instance = BaseExtractor()
+    instance._proxies = ProxyPool()
+    instance._http = FlakyProxyHttp()
+    yield instance
+    instance.close_session()
+    database.dispose_engine()
+
+
+def test_failing_proxy_is_an_error_and_is_rotated(extractor):
+    limiter = host_limiter("https://base-proxy-failure.test/page")
+    before = dict(limiter.counts)
+
+    assert extractor.fetch_page("https://base-proxy-failure.test/page") == b"<html></html>"
+    assert extractor.http.proxies == ["10.0.0.1:8080", "10.0.0.2:3128"]
+    assert limiter.counts[ERROR] == before[ERROR] + 1 and limiter.counts[OK] == before[OK] + 1
+    assert limiter.counts[THROTTLED] == before[THROTTLED] and limiter.paused_until == 0.0
@@ -0,0 +1,184 @@
+import asyncio
+
+import pytest
+import redis
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from api_server.core import cache as api_cache
+from api_server.core.cache import cache_stats, cached_response
+from utility import cache
+from utility.cache import AsyncInMemoryRedis, InMemoryRedis, generation_key, invalidate_source, invalidate_sources
+
+
+class BrokenRedis:
+    """Async client whose every command fails like an unreachable server."""
+
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            raise redis.ConnectionError("connection refused")
+        return fail
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_memory_redis_strings(clock):
+    client = InMemoryRedis()
+    assert client.get("missing") is None
+    assert client.set("a", "1") is True
+    assert client.get("a") == b"1"
+    assert client.incr("a") == 2
+    assert client.incr("b", 5) == 5
+    assert client.mget(["a", "b", "c"]) == [b"2", b"5", None]
+    assert client.delete("a", "c") == 1
+    assert client.get("a") is None
+
+
+def test_memory_redis_expiry(clock):
+    client = InMemoryRedis()
+    client.set("key", b"value", ex=10)
+    clock[0] += 9
+    assert client.get("key") == b"value"
+    clock[0] += 1
+    assert client.get("key") is None
+    # set without ex clears an earlier expiry
+    client.set("key", b"value", ex=10)
+    client.set("key", b"other")
+    clock[0] += 60
+    assert client.get("key") == b"other"
+
+
+def test_memory_redis_lists_hashes_and_sorted_sets():
+    client = InMemoryRedis()
+    client.lpush("ready", "a", "b")
+    client.rpush("ready", "c")
+    assert client.lrange("ready", 0, -1) == [b"b", b"a", b"c"]
+    assert client.lmove("ready", "processing", "RIGHT", "LEFT") == b"c"
+    assert client.llen("ready") == 2 and client.lrange("processing", 0, -1) == [b"c"]
+    assert client.lrem("processing", 1, "c") == 1
+    assert client.lrem("processing", 1, "c") == 0
+    assert client.lmove("empty", "processing") is None
+
+    assert client.hsetnx("units", "a", "{}") == 1
+    assert client.hsetnx("units", "a", "other") == 0
+    assert client.hget("units", "a") == b"{}"
+    assert client.hincrby("attempts", "a") == 1 and client.hincrby("attempts", "a", 2) == 3
+    assert client.hset("units", mapping={"b": 1, "c": 2}) == 2
+    assert client.hlen("units") == 3 and client.hdel("units", "b", "x") == 1
+    assert client.hgetall("units") == {b"a": b"{}", b"c": b"2"}
+
+    assert client.zadd("leases", {"a": 5, "b": 1}) == 2
+    assert client.zadd("leases", {"a": 9}, nx=True) == 0 and client.zscore("leases", "a") == 5.0
+    assert client.zadd("leases", {"c": 9}, xx=True) == 0 and client.zscore("leases", "c") is None
+    client.zadd("leases", {"a": 3}, xx=True)
+    assert client.zrangebyscore("leases", "-inf", 4) == [b"b", b"a"]
+    assert client.zrem("leases", "a") == 1 and client.zcard("leases") == 1
+
+
+def test_async_memory_redis_shares_the_store():
+    store = InMemoryRedis()
+    client = AsyncInMemoryRedis(store)
+
+    async def scenario():
+        await client.set("key", "1", ex=60)
+        assert await client.incr("key") == 2
+        assert await client.mget(["key", "missing"]) == [b"2", None]
+        assert await client.delete("key") == 1
+        return await client.get("key")
+
+    assert asyncio.run(scenario()) is None
+    store.set("shared", "x")
+    assert asyncio.run(client.get("shared")) == b"x"
+
+
+def test_invalidate_source_bumps_source_and_global_generations(memory_redis):
+    assert invalidate_source(7) is True
+    assert invalidate_source() is True
+    assert memory_redis.get(generation_key(7)) == b"1"
+    assert memory_redis.get(generation_key()) == b"2"
+
+    assert invalidate_sources([1, 2]) is True
+    assert memory_redis.mget([generation_key(1), generation_key(2), generation_key()]) == [b"1", b"1", b"3"]
+
+
+def test_invalidate_source_never_raises(monkeypatch):
+    class Unreachable:
+        def incr(self, key):
+            raise redis.ConnectionError("connection refused")
+
+    cache.set_redis(Unreachable())
+    try:
+        assert invalidate_source(1) is False
+    finally:
+        cache.set_redis(None)
+    monkeypatch.setattr(cache, "CACHE_ENABLED", False)
+    assert invalidate_source(1) is False
+
+
+@pytest.fixture
+def client(memory_redis):
+    app = FastAPI()
+    calls = []
+
+    @app.get("/prices")
+    async def prices(request: Request, source_id: int = None):
+        async def produce():
+            calls.append(dict(request.query_params))
+            return {"source_id": source_id, "calls": len(calls)}
+        return await cached_response(request, produce, source_id=source_id)
+
+    test_client = TestClient(app)
+    test_client.calls = calls
+    return test_client
+
+
+def test_cached_response_hit_after_miss(client):
+    first = client.get("/prices?source_id=1&b=2&a=1")
+    assert first.status_code == 200 and first.headers["X-Cache"] == "MISS"
+    # Same query in another order and with an empty value is the same key
+    second = client.get("/prices?a=1&source_id=1&b=2&c=")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.content == first.content and second.headers["ETag"] == first.headers["ETag"]
+    assert len(client.calls) == 1
+    assert client.get("/prices?source_id=1&a=2").headers["X-Cache"] == "MISS"
+
+
+def test_cached_response_not_modified(client):
+    etag = client.get("/prices?source_id=1").headers["ETag"]
+    response = client.get("/prices?source_id=1", headers={"If-None-Match": etag})
+    assert response.status_code == 304 and response.content == b""
+    assert response.headers["ETag"] == etag
+    assert client.get("/prices?source_id=1", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_cached_response_generation_invalidation(client, memory_redis):
+    client.get("/prices?source_id=1")
+    client.get("/prices?source_id=2")
+    invalidate_source(1)
+    assert client.get("/prices?source_id=1").headers["X-Cache"] == "MISS"
+    assert client.get("/prices?source_id=2").headers["X-Cache"] == "HIT"
+    # The key embeds the generation the response was computed under
+    assert memory_redis.get("pr:cache:/prices:1:source_id=1") is not None
+
+
+def test_cached_response_without_redis(client, monkeypatch):
+    monkeypatch.setattr(api_cache, "get_async_redis", lambda: BrokenRedis())
+    response = client.get("/prices?source_id=1")
+    assert response.status_code == 200 and response.headers["X-Cache"] == "MISS"
+    assert client.get("/prices?source_id=1").status_code == 200
+    assert len(client.calls) == 2
+
+
+def test_cache_stats(client, monkeypatch):
+    client.get("/prices?source_id=1")
+    client.get("/prices?source_id=1")
+    client.get("/prices?source_id=1")
+    assert asyncio.run(cache_stats()) == {"available": True, "hits": 2, "misses": 1, "hit_ratio": 0.6667}
+
+    monkeypatch.setattr(api_cache, "get_async_redis", lambda: BrokenRedis())
+    assert asyncio.run(cache_stats()) == {"available": False, "hits": None, "misses": None, "hit_ratio": None}
@@ -0,0 +1,132 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from etl_pipeline.core.websites import exchange_rate
+from etl_pipeline.core.websites.exchange_rate import ExchangeRateExtractor, window_end
+from utility import checkpoint, database
+from utility.checkpoint import DONE, EMPTY, FAILED, CheckpointStore, WallClockBudget
+
+SOURCE = "test-checkpoint"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(checkpoint.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_wall_clock_budget(clock):
+    budget = WallClockBudget(30)
+    assert not budget.exhausted() and budget.remaining() == 30
+    clock[0] += 29.5
+    assert not budget.exhausted() and budget.remaining() == 0.5
+    clock[0] += 0.5
+    assert budget.exhausted() and budget.remaining() == 0.0
+    clock[0] += 10
+    assert budget.remaining() == 0.0
+
+
+def test_unlimited_budget(clock):
+    budget = WallClockBudget()
+    clock[0] += 10 ** 9
+    assert not budget.exhausted() and budget.remaining() is None
+
+
+def test_window_end():
+    assert window_end(2024, 1) == date(2024, 4, 30)
+    assert window_end(2024, 5) == date(2024, 8, 31)
+    assert window_end(2024, 9) == date(2024, 12, 31)
+
+
+class FakeCheckpoints:
+    def __init__(self, source):
+        self.marked = {}
+
+    def completed(self, unit_keys=None):
+        return set()
+
+    def mark(self, unit_keys, status, detail=None):
+        for key in unit_keys:
+            self.marked[key] = status
+
+
+class FakeLoader:
+    def __init__(self, session=None):
+        pass
+
+    def store_exchange_rate_dataframe(self, df, from_code, to_code):
+        return to_code != "JPY"
+
+
+@pytest.fixture
+def unconnected_database(monkeypatch):
+    """A dummy database URL; the lazy engine never connects."""
+    monkeypatch.setenv("PR_DATABASE_URL", "postgresql://user@localhost/unused")
+    database.dispose_engine()
+    yield
+    database.dispose_engine()
+
+
+def test_open_exchange_rate_windows_stay_pending(monkeypatch, unconnected_database):
+    stores = []
+    monkeypatch.setattr(exchange_rate, "CheckpointStore", lambda source: stores.append(FakeCheckpoints(source)) or stores[-1])
+    monkeypatch.setattr(exchange_rate, "BaseLoader", FakeLoader)
+    extractor = ExchangeRateExtractor(session=object())
+    monkeypatch.setattr(extractor, "is_model_empty", lambda model: True)
+    monkeypatch.setattr(extractor, "get_currency_code", lambda: ["EUR"])
+    frame = pd.DataFrame({"Date": ["a", "b"], "Average": [1.0, 1.1]})
+    monkeypatch.setattr(
+        extractor,
+        "fetch_exchange_rate_data",
+        lambda from_year, from_month, cur_to, **kwargs: pd.DataFrame() if cur_to == "GBP" else frame,
+    )
+
+    extractor.extract()
+
+    marked = stores[0].marked
+    today = date.today()
+    year, month = today.year, (today.month - 1) // 4 * 4 + 1
+    # The window holding today was stored but stays pending; the previous one is done
+    assert f"USD-EUR:{year}-{month:02d}" not in marked
+    assert marked["USD-EUR:2019-01"] == DONE
+    previous = (year, month - 4) if month > 1 else (year - 1, 9)
+    assert marked[f"USD-EUR:{previous[0]}-{previous[1]:02d}"] == DONE
+    assert all(window_end(int(key[8:12]), int(key[13:])) < today for key, status in marked.items() if status == DONE)
+    # Empty and failed windows are recorded whether open or not, and retried on resume
+    assert marked[f"USD-GBP:{year}-{month:02d}"] == EMPTY
+    assert marked[f"USD-JPY:{year}-{month:02d}"] == FAILED
+
+
+@pytest.fixture
+def store(database):
+    yield CheckpointStore(SOURCE)
+    session = database.get_session()
+    session.execute(text("DELETE FROM metadata.run_checkpoint WHERE source = :source"), {"source": SOURCE})
+    session.commit()
+    session.close()
+
+
+def test_checkpoint_store_round_trip(store):
+    keys = ["2025-04-01", "2025-04-02", "2025-04-03"]
+    assert store.pending(keys) == keys
+
+    store.mark(keys[:2], FAILED, detail="fetch failed")
+    store.mark(keys[:1], DONE)
+    store.mark(keys[2:], EMPTY)
+    # Only done units are skipped, failed and empty ones are retried
+    assert store.completed() == {"2025-04-01"}
+    assert store.completed(keys[1:]) == set()
+    assert store.pending(keys) == keys[1:]
+    assert store.summary() == {DONE: 1, FAILED: 1, EMPTY: 1}
+
+    session = database.get_session()
+    attempts = session.execute(
+        text("SELECT unit_key, attempts FROM metadata.run_checkpoint WHERE source = :source ORDER BY unit_key"),
+        {"source": SOURCE},
+    ).all()
+    session.close()
+    assert attempts == [("2025-04-01", 2), ("2025-04-02", 1), ("2025-04-03", 1)]
@@ -0,0 +1,46 @@
+import functools
+import inspect
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from etl_pipeline import cli
+from etl_pipeline.core.config.registry import load_website_configs
+from etl_pipeline.core.websites.exchange_rate import ExchangeRateExtractor
+from utility import database, run_lease
+from utility.run_lease import Lease
+
+
+def test_exchange_rate_is_a_configured_source():
+    config = load_website_configs()["exchange_rate"]
+    assert config["extractor"] == "etl_pipeline.core.websites.exchange_rate.ExchangeRateExtractor"
+    assert not config.get("transformer")
+
+
+def test_run_passes_only_what_the_extractor_accepts(monkeypatch, capsys):
+    calls, leases = [], []
+
+    @functools.wraps(ExchangeRateExtractor.extract)
+    def extract(*args, **kwargs):
+        # The CLI inspects the real signature; binding against it raises the TypeError a real run would
+        inspect.signature(ExchangeRateExtractor.extract).bind(None, **kwargs)
+        calls.append(kwargs)
+        return True
+
+    @contextmanager
+    def session_scope():
+        yield None
+
+    @contextmanager
+    def fake_lease(source, stage, range_start=None, range_end=None, **kwargs):
+        leases.append((source, stage, range_start, range_end))
+        yield Lease(1)
+
+    monkeypatch.setattr(database, "session_scope", session_scope)
+    monkeypatch.setattr(run_lease, "run_lease", fake_lease)
+    monkeypatch.setattr(cli, "build_extractor", lambda *args, **kwargs: SimpleNamespace(extract=extract))
+
+    assert cli.main(["run", "exchange_rate", "--from", "2025-01-01", "--resume", "--budget-seconds", "60"]) == 0
+    assert calls == [{"resume": True, "budget_seconds": 60.0}]
+    # The whole source is leased, the ignored range is reported
+    assert leases == [("exchange_rate", "extract", None, None)]
+    assert "--from/--to ignored" in capsys.readouterr().err
@@ -0,0 +1,111 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from api_server.app.data.api import endpoints
+from api_server.core.coalesce import SingleFlight
+from api_server.core.database import dispose_async_engine
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", produce) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["value"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0, "coalesced_ratio": 0.8}
+
+
+def test_failure_reaches_every_caller():
+    flight = SingleFlight()
+
+    async def produce():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(flight.do("key", produce), flight.do("key", produce), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+    release = None
+
+    async def produce():
+        await release.wait()
+        return "value"
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        leader = asyncio.create_task(flight.do("key", produce))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", produce))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "value"
+    assert flight.stats()["executed"] == 1 and flight.stats()["in_flight"] == 0
+
+
+def test_calls_after_completion_run_again():
+    flight = SingleFlight()
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        return [await flight.do("key", produce), await flight.do("key", produce)]
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+def test_cancelled_leader_leaves_the_shared_query_its_session(database, memory_redis, monkeypatch):
+    app = FastAPI()
+    app.include_router(endpoints.router)
+
+    async def slow_latest_prices(db, **filters):
+        # Still running when the leader's request, and with it the request's session, goes away
+        await db.execute(text("SELECT pg_sleep(0.5)"))
+        return [{"rows": (await db.execute(text("SELECT 1"))).scalar()}]
+
+    monkeypatch.setattr(endpoints, "get_latest_prices", slow_latest_prices)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            leader = asyncio.create_task(client.get("/latest-prices", params={"source_id": 424242}))
+            await asyncio.sleep(0.2)
+            follower = asyncio.create_task(client.get("/latest-prices", params={"source_id": 424242}))
+            await asyncio.sleep(0.05)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            response = await follower
+        await dispose_async_engine()
+        return response
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200 and response.json() == [{"rows": 1}]
+    assert response.headers["X-Cache"] == "MISS"
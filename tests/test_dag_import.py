@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("airflow")
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Same budget and module list as the "Check DAG import time" step of .github/workflows/airflow-ci.yml
+BUDGET_SECONDS = float(os.environ.get("DAG_IMPORT_BUDGET_SECONDS", 2))
+HEAVY_MODULES = (
+    "pandas",
+    "bs4",
+    "swiftshadow",
+    "etl_pipeline.core.websites",
+    "etl_pipeline.core.extract",
+    "etl_pipeline.core.loader",
+    "etl_pipeline.core.transform",
+    "utility.database",
+    "db.models",
+)
+
+# Run in a fresh interpreter: modules other tests imported would hide heavy imports
+PROBE = """
+import json, sys, time
+import airflow  # warm: Airflow itself is not part of the budget
+
+before = set(sys.modules)
+start = time.perf_counter()
+import etl_pipeline.airflow.dags.websites
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "loaded": sorted(set(sys.modules) - before)}))
+"""
+
+
+def test_dag_module_imports_within_budget_without_pipeline_code():
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert [name for name in probe["loaded"] if name.startswith(HEAVY_MODULES)] == []
+    assert probe["elapsed"] <= BUDGET_SECONDS, f"DAG import took {probe['elapsed']:.3f}s, budget {BUDGET_SECONDS}s"
@@ -0,0 +1,105 @@
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import yaml
+
+from etl_pipeline.core.extract.declarative_extractor import (
+    DeclarativeTableExtractor,
+    apply_date_column,
+    build_table_spec,
+    parse_table_page,
+)
+from etl_pipeline.core.extract.table_extractor import FAST_PARSER
+from utility import database
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURE = Path(__file__).parent / "fixtures" / "sunsirs_day.html"
+
+
+@pytest.fixture
+def sunsirs_config():
+    with open(ROOT / "etl_pipeline" / "core" / "config" / "websites" / "sunsirs.yaml") as f:
+        return yaml.safe_load(f)
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    """Build a DeclarativeTableExtractor; the lazy engine never connects."""
+    monkeypatch.setenv("PR_DATABASE_URL", "postgresql://user@localhost/unused")
+    database.dispose_engine()
+    built = []
+
+    def build(table_spec: dict) -> DeclarativeTableExtractor:
+        instance = DeclarativeTableExtractor({"source": "test", "table_spec": table_spec})
+        built.append(instance)
+        return instance
+
+    yield build
+    for instance in built:
+        instance.session.close()
+    database.dispose_engine()
+
+
+def test_build_table_spec_validates():
+    spec = build_table_spec({"table_spec": {"url_template": "https://x/{date:%Y%m%d}", "required_headers": ["Name"]}})
+    assert spec["step_days"] == 1 and spec["parser"] == FAST_PARSER
+    with pytest.raises(ValueError, match="url_template"):
+        build_table_spec({"table_spec": {"required_headers": ["Name"]}})
+    with pytest.raises(ValueError, match="mode"):
+        build_table_spec({"table_spec": {"url_template": "x", "required_headers": ["Name"], "date_column": {"mode": "cell"}}})
+    with pytest.raises(ValueError, match="name"):
+        build_table_spec({"table_spec": {"url_template": "x", "required_headers": ["Name"], "date_column": {"mode": "column"}}})
+
+
+def test_sunsirs_page_parses_the_requested_day(sunsirs_config):
+    spec = build_table_spec(sunsirs_config)
+    assert spec["parser"] == "html5lib"
+    df = parse_table_page(FIXTURE.read_bytes(), datetime(2025, 3, 31), spec)
+    assert list(df.columns) == ["product", "product_category", "price_value", "price_date"]
+    assert df["product"].tolist() == ["Hydrofluoric acid", "Urea", "Copper", "Soybean meal"]
+    assert df["price_value"].tolist() == ["11,500.00", "1,858.00", "81,316.67", "3,160.00"]
+    assert (df["price_date"] == pd.Timestamp("2025-03-31")).all()
+    # The page of 03-31 also lists 03-28; a date it does not list gives nothing
+    assert parse_table_page(FIXTURE.read_bytes(), datetime(2025, 3, 27), spec).empty
+
+
+@pytest.mark.parametrize("parser", ["lxml", "html.parser"])
+def test_parsers_agree_on_the_sunsirs_page(sunsirs_config, parser):
+    spec = build_table_spec(sunsirs_config)
+    expected = parse_table_page(FIXTURE.read_bytes(), datetime(2025, 3, 31), spec)
+    actual = parse_table_page(FIXTURE.read_bytes(), datetime(2025, 3, 31), {**spec, "parser": parser})
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_apply_date_column_modes():
+    df = pd.DataFrame({"Name": ["a", "b"], "When": ["2025-01-02", "not a date"]})
+    column = apply_date_column(df, datetime(2025, 1, 5), {"date_column": {"mode": "column", "name": "When"}})
+    assert column["Date"].tolist() == [pd.Timestamp("2025-01-02")]
+    url = apply_date_column(df, datetime(2025, 1, 5, 13, 30), {"date_column": {"mode": "url"}})
+    assert (url["Date"] == pd.Timestamp("2025-01-05")).all()
+
+
+def test_planning_follows_step_days(extractor, monkeypatch):
+    weekly = extractor({"url_template": "https://x/{date:%Y-%m-%d}", "required_headers": ["Name"], "step_days": 7})
+    targets = weekly.plan_targets("2025-01-01", "2025-01-31")
+    assert [url for _, url in targets] == [f"https://x/2025-01-{day:02d}" for day in (1, 8, 15, 22, 29)]
+
+    monkeypatch.setattr(weekly, "get_extraction_dates", lambda **kwargs: ("2025-01-01", "2025-01-31"))
+    assert weekly.plan_date_chunks(2) == [["2025-01-01", "2025-01-08"], ["2025-01-15", "2025-01-22"], ["2025-01-29", "2025-01-29"]]
+    # Every chunk plans exactly the pages of the whole range
+    chunked = [url for start, end in weekly.plan_date_chunks(2) for _, url in weekly.plan_targets(start, end)]
+    assert chunked == [url for _, url in targets]
+
+
+def test_extract_raises_what_stopped_the_run(extractor, monkeypatch):
+    # A failed run must fail its Airflow task (and be retried), not pass as "nothing new"
+    daily = extractor({"url_template": "https://x/{date:%Y-%m-%d}", "required_headers": ["Name"]})
+
+    def plan_targets(start_date, end_date):
+        raise RuntimeError("database is gone")
+
+    monkeypatch.setattr(daily, "plan_targets", plan_targets)
+    with pytest.raises(RuntimeError, match="database is gone"):
+        daily.extract(start_date="2025-01-01", end_date="2025-01-07")
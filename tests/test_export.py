@@ -0,0 +1,130 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import DECIMAL, Date, DateTime, Integer
+
+from api_server.app.data import export
+from api_server.app.data.api import endpoints
+from api_server.app.data.export import EXPORT_DATASETS, EXPORT_FORMATS, stream_export
+
+# Rows per cursor partition of the fake dataset
+PARTITIONS = (3, 1, 4)
+
+
+def fake_value(column, row: int):
+    if column.nullable and row % 3 == 1:
+        return None
+    if isinstance(column.type, Integer):
+        return row * 10 + 1
+    if isinstance(column.type, DECIMAL):
+        return Decimal(f"{1000 + row}.{row:04d}")
+    if isinstance(column.type, DateTime):
+        return datetime(2025, 1, 1 + row, 8, 30, 15, 123456)
+    if isinstance(column.type, Date):
+        return date(2025, 2, 1 + row)
+    # Text a CSV writer has to quote
+    return f'cat {row}, "quoted"\nline'
+
+
+def fake_partitions(dataset: str):
+    columns = list(EXPORT_DATASETS[dataset][0].__table__.columns)
+    partitions, row = [], 0
+    for size in PARTITIONS:
+        partitions.append([tuple(fake_value(column, row + i) for column in columns) for i in range(size)])
+        row += size
+    return [column.name for column in columns], partitions
+
+
+@pytest.fixture
+def dataset(monkeypatch, request):
+    names, partitions = fake_partitions(request.param)
+
+    async def iter_partitions(dataset, source_id, start_date, end_date):
+        for partition in partitions:
+            yield partition
+
+    monkeypatch.setattr(export, "_iter_partitions", iter_partitions)
+    return request.param, names, [row for partition in partitions for row in partition]
+
+
+def export_bytes(dataset: str, fmt: str) -> list:
+    async def collect():
+        return [chunk async for chunk in stream_export(dataset, fmt)]
+
+    return asyncio.run(collect())
+
+
+def json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+@pytest.mark.parametrize("dataset", list(EXPORT_DATASETS), indirect=True)
+def test_csv_round_trip(dataset):
+    name, names, rows = dataset
+    chunks = export_bytes(name, "csv")
+    # One chunk per partition, the header in the first
+    assert len(chunks) == len(PARTITIONS)
+    parsed = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert parsed[0] == names
+    assert parsed[1:] == [["" if value is None else str(value) for value in row] for row in rows]
+
+
+@pytest.mark.parametrize("dataset", list(EXPORT_DATASETS), indirect=True)
+def test_ndjson_round_trip(dataset):
+    name, names, rows = dataset
+    chunks = export_bytes(name, "ndjson")
+    assert len(chunks) == len(PARTITIONS)
+    parsed = [json.loads(line) for line in b"".join(chunks).decode("utf-8").splitlines()]
+    assert parsed == [{column: json_value(value) for column, value in zip(names, row)} for row in rows]
+
+
+@pytest.mark.parametrize("dataset", list(EXPORT_DATASETS), indirect=True)
+def test_parquet_round_trip(dataset):
+    name, names, rows = dataset
+    table = pq.read_table(io.BytesIO(b"".join(export_bytes(name, "parquet"))))
+    assert table.schema.names == names
+    assert table.to_pylist() == [dict(zip(names, row)) for row in rows]
+
+
+@pytest.mark.parametrize("dataset", list(EXPORT_DATASETS), indirect=True)
+def test_arrow_round_trip(dataset):
+    name, names, rows = dataset
+    reader = pa.ipc.open_stream(io.BytesIO(b"".join(export_bytes(name, "arrow"))))
+    batches = list(reader)
+    # One record batch per partition, streamed as it is read
+    assert [batch.num_rows for batch in batches] == list(PARTITIONS)
+    assert pa.Table.from_batches(batches).to_pylist() == [dict(zip(names, row)) for row in rows]
+
+
+@pytest.mark.parametrize("dataset", ["standardized"], indirect=True)
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_content_type_and_file_name(dataset, fmt):
+    app = FastAPI()
+    app.include_router(endpoints.router)
+    response = TestClient(app).get(f"/export/standardized?format={fmt}")
+    media_type, extension = EXPORT_FORMATS[fmt]
+    assert response.status_code == 200
+    assert response.headers["content-type"].split(";")[0] == media_type
+    assert response.headers["content-disposition"] == f'attachment; filename="standardized_prices.{extension}"'
+    assert response.content == b"".join(export_bytes("standardized", fmt))
+
+
+def test_unknown_dataset_and_format():
+    app = FastAPI()
+    app.include_router(endpoints.router)
+    client = TestClient(app)
+    assert client.get("/export/nothing").status_code == 404
+    assert client.get("/export/raw?format=xlsx").status_code == 400
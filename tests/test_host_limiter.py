@@ -0,0 +1,215 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from etl_pipeline.core.extract import host_limiter as host_limiter_module
+from etl_pipeline.core.extract.host_limiter import (
+    ERROR,
+    HOST_MAX_RETRY_AFTER_SECONDS,
+    HOST_SLOT_LEASE_SECONDS,
+    OK,
+    THROTTLED,
+    HostLimiter,
+    SharedHostLimits,
+    host_limiter,
+    outcome_for_status,
+    parse_retry_after,
+    share_host_limits,
+)
+from utility.cache import InMemoryRedis
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return HostLimiter("example.test", initial=2, min_limit=1, max_limit=4, clock=clock)
+
+
+def fill(limiter: HostLimiter, slots: int) -> None:
+    for _ in range(slots):
+        limiter.acquire()
+
+
+def test_outcome_for_status():
+    assert outcome_for_status(200) == OK and outcome_for_status(304) == OK
+    assert outcome_for_status(404) == ERROR
+    assert outcome_for_status(429) == THROTTLED and outcome_for_status(503) == THROTTLED
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None and parse_retry_after("soon") is None
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("-5") == 0.0
+    assert parse_retry_after("86400") == HOST_MAX_RETRY_AFTER_SECONDS
+    in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 <= parse_retry_after(in_a_minute) <= 60
+
+
+def test_grows_only_while_the_limit_binds(limiter, clock):
+    # One request at a time never uses both slots
+    for _ in range(5):
+        fill(limiter, 1)
+        limiter.release(0.1, OK)
+        clock.now += 2
+    assert limiter.limit == 2
+
+    fill(limiter, 2)
+    limiter.release(0.1, OK)
+    assert limiter.limit == 3
+    limiter.release(0.1, OK)
+    assert limiter.in_flight == 0
+
+
+def test_grows_once_per_window_up_to_max_limit(limiter, clock):
+    fill(limiter, 2)
+    limiter.release(0.1, OK)
+    assert limiter.limit == 3
+    fill(limiter, 2)
+    # Binding again, but within the same window
+    limiter.release(0.1, OK)
+    assert limiter.limit == 3
+
+    for _ in range(5):
+        clock.now += 1.0
+        fill(limiter, int(limiter.limit) - limiter.in_flight)
+        limiter.release(0.1, OK)
+    assert limiter.limit == 4
+
+
+def test_slow_responses_hold_the_limit(limiter, clock):
+    fill(limiter, 1)
+    limiter.release(0.1, OK)
+    fill(limiter, 2)
+    clock.now += 5
+    limiter.release(1.0, OK)
+    assert limiter.limit == 2
+
+
+def test_one_cut_per_window_down_to_min_limit(clock):
+    limiter = HostLimiter("example.test", initial=4, min_limit=1, max_limit=4, clock=clock)
+    fill(limiter, 4)
+    # The requests in flight when the host pushed back fail together and count once
+    for _ in range(4):
+        limiter.release(0.1, THROTTLED)
+    assert limiter.limit == 2
+
+    for _ in range(3):
+        clock.now += 60
+        fill(limiter, 1)
+        limiter.release(0.1, THROTTLED)
+    assert limiter.limit == 1
+    assert limiter.counts == {OK: 0, THROTTLED: 7, ERROR: 0}
+
+
+def test_backoff_without_retry_after(limiter, clock):
+    fill(limiter, 2)
+    limiter.release(0.1, THROTTLED)
+    assert limiter.paused_until == clock.now + 1.0
+    limiter.release(0.1, THROTTLED)
+    assert limiter.paused_until == clock.now + 2.0
+    assert limiter._wait_seconds() == 2.0
+    clock.now += 2.0
+    assert limiter._wait_seconds() is None
+    # A success ends the streak
+    fill(limiter, 1)
+    limiter.release(0.1, OK)
+    fill(limiter, 1)
+    limiter.release(0.1, THROTTLED)
+    assert limiter.paused_until == clock.now + 1.0
+
+
+def test_retry_after_is_honoured_and_capped(limiter, clock):
+    fill(limiter, 2)
+    limiter.release(0.1, THROTTLED, retry_after=10)
+    assert limiter._wait_seconds() == 10
+    limiter.release(0.1, THROTTLED, retry_after=10 ** 6)
+    assert limiter.paused_until == clock.now + HOST_MAX_RETRY_AFTER_SECONDS
+    clock.now += HOST_MAX_RETRY_AFTER_SECONDS
+    assert limiter._wait_seconds() is None
+
+
+def test_errors_leave_the_limit_alone(limiter, clock):
+    fill(limiter, 2)
+    limiter.release(0.1, ERROR)
+    limiter.release(0.1, ERROR)
+    assert limiter.limit == 2 and limiter.paused_until == 0.0
+    assert limiter.stats() == {"limit": 2, "in_flight": 0, "baseline_latency": None, OK: 0, THROTTLED: 0, ERROR: 2}
+
+
+def test_initial_limit_is_bounded():
+    assert HostLimiter("a", initial=100, min_limit=1, max_limit=8).limit == 8
+    assert HostLimiter("b", initial=0, min_limit=2, max_limit=8).limit == 2
+
+
+def process_limiter(client, limit: int = 2) -> HostLimiter:
+    """The limiter one worker process of a fleet sharing `client` would have."""
+    return HostLimiter("example.test", initial=4, max_limit=4, shared=SharedHostLimits("example.test", client, limit=limit))
+
+
+def test_shared_cap_holds_across_processes():
+    client = InMemoryRedis()
+    first, second = process_limiter(client), process_limiter(client)
+    fill(first, 2)
+    # The second process has free local slots, but the fleet's are taken
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: (second.acquire(), acquired.set()))
+    waiter.start()
+    assert not acquired.wait(0.3)
+    assert second.in_flight == 0
+
+    first.release(0.1, OK)
+    assert acquired.wait(2)
+    waiter.join()
+    assert client.zcard("pr:host:example.test:slots") == 2
+    first.release(0.1, OK)
+    second.release(0.1, OK)
+    assert client.zcard("pr:host:example.test:slots") == 0
+
+
+def test_throttling_pauses_every_process():
+    client = InMemoryRedis()
+    first, second = process_limiter(client), process_limiter(client)
+    fill(first, 1)
+    first.release(0.1, THROTTLED, retry_after=10)
+    assert 9 < second.shared.paused_for() <= 10
+    assert 9 < second._take_shared() <= 10 and second._tokens == []
+    # A shorter pause does not cut a longer one short
+    second.shared.pause(1)
+    assert second.shared.paused_for() > 9
+
+
+def test_slot_of_a_dead_process_lapses(clock):
+    clock.now = 1000.0
+    client = InMemoryRedis()
+    shared = SharedHostLimits("example.test", client, limit=1, clock=clock)
+    assert shared.try_acquire() is not None
+    assert shared.try_acquire() is None
+    clock.now += HOST_SLOT_LEASE_SECONDS + 1
+    assert shared.try_acquire() is not None
+
+
+def test_share_host_limits(monkeypatch):
+    monkeypatch.setattr(host_limiter_module, "_limiters", {})
+    monkeypatch.setattr(host_limiter_module, "_shared_client", None)
+    assert host_limiter("https://alone.test/page").shared is None
+    client = InMemoryRedis()
+    share_host_limits(client)
+    limiter = host_limiter("https://alone.test/page")
+    assert limiter.shared is not None and limiter.shared.client is client
+    # Sharing again with the same client keeps the limiters in use
+    share_host_limits(client)
+    assert host_limiter("https://alone.test/page") is limiter
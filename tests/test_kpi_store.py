@@ -0,0 +1,102 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from api_server.app.dashboard import service
+from api_server.app.dashboard.api import endpoints
+from api_server.app.dashboard.crud import KPI_REFRESH_LOCK_KEY
+from api_server.app.dashboard.service import KPI_WINDOW_DAYS, KpiStore, refresh_kpis
+from api_server.core.database import dispose_async_engine
+
+# Days before today with a standardized price
+PRICE_DAYS = (1, 3)
+
+
+@pytest.fixture
+def source(database, monkeypatch):
+    """
+    A source with prices on PRICE_DAYS, KPIs marked stale and a fresh store. A refresh
+    computes KPIs of every source, the rows it adds for other sources are removed too.
+    """
+    store = KpiStore()
+    monkeypatch.setattr(service, "kpi_store", store)
+    monkeypatch.setattr(endpoints, "kpi_store", store)
+    session = database.get_session()
+    existing = session.execute(text("SELECT source_id FROM transformed.source_kpi")).scalars().all()
+    try:
+        ids = {
+            table: session.execute(text(f"INSERT INTO metadata.{table} (name) VALUES ('test-kpi') RETURNING id")).scalar()
+            for table in ("source", "product", "location")
+        }
+        for days in PRICE_DAYS:
+            session.execute(text(
+                "INSERT INTO transformed.products_standard_data (source_id, product_id, location_id, price_usd, source_date) "
+                "VALUES (:source, :product, :location, 10, :day)"
+            ), {**ids, "day": date.today() - timedelta(days=days)})
+        session.commit()
+        mark_stale(session)
+        yield session, ids["source"], store
+    finally:
+        session.rollback()
+        session.execute(text("DELETE FROM transformed.source_kpi WHERE NOT (source_id = ANY(:existing))"), {"existing": existing})
+        session.execute(text("DELETE FROM transformed.products_standard_data WHERE source_id IN (SELECT id FROM metadata.source WHERE name = 'test-kpi')"))
+        for table in ("source", "product", "location"):
+            session.execute(text(f"DELETE FROM metadata.{table} WHERE name = 'test-kpi'"))
+        session.commit()
+        session.close()
+
+
+def mark_stale(session) -> None:
+    session.execute(text("UPDATE transformed.source_kpi SET computed_at = now() - interval '1 day'"))
+    session.commit()
+
+
+def refresh() -> bool:
+    async def scenario():
+        try:
+            return await refresh_kpis()
+        finally:
+            await dispose_async_engine()
+
+    return asyncio.run(scenario())
+
+
+def test_refresh_computes_and_serves_the_kpis(source):
+    _, source_id, store = source
+    assert refresh() is True
+    kpis = store.get(source_id)
+    assert kpis["latest_source_date"] == date.today() - timedelta(days=min(PRICE_DAYS))
+    assert kpis["daily_counts"] == {(date.today() - timedelta(days=days)).isoformat(): 1 for days in PRICE_DAYS}
+    assert kpis["missing_days"] == KPI_WINDOW_DAYS - len(PRICE_DAYS)
+    assert (kpis["latest_raw_date"], kpis["transform_lag_days"], kpis["untransformed_rows"]) == (None, None, 0)
+
+    app = FastAPI()
+    app.include_router(endpoints.router)
+    client = TestClient(app)
+    served = client.get(f"/kpis/{source_id}").json()
+    assert (served["source_id"], served["missing_days"]) == (source_id, kpis["missing_days"])
+    assert source_id in [row["source_id"] for row in client.get("/kpis").json()]
+    assert client.get("/kpis/0").status_code == 404
+
+    # Within the interval the table is only reloaded, not recomputed
+    assert refresh() is False
+    assert store.get(source_id)["computed_at"] == kpis["computed_at"]
+
+
+def test_refresh_skips_while_another_worker_holds_the_lock(source, database):
+    _, source_id, store = source
+    other = database.get_session()
+    try:
+        other.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": KPI_REFRESH_LOCK_KEY})
+        # The stale table is served as it is rather than waiting for the lock
+        assert refresh() is False
+        assert store.loaded_at is not None and store.get(source_id) is None
+    finally:
+        other.rollback()
+        other.close()
+    assert refresh() is True
+    assert store.get(source_id) is not None
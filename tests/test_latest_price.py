@@ -0,0 +1,88 @@
+from datetime import date
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from etl_pipeline.core.loader.transformed_data_store import StandardizedPriceWriter
+
+STORED_DATE = date(2025, 3, 10)
+
+
+@pytest.fixture
+def key(database):
+    """A snapshot key holding a price of 100 on STORED_DATE."""
+    session = database.get_session()
+    try:
+        ids = {
+            table: session.execute(text(f"INSERT INTO metadata.{table} (name) VALUES ('test-latest') RETURNING id")).scalar()
+            for table in ("source", "product", "location")
+        }
+        session.commit()
+        upsert(session, snapshot(ids, 100, STORED_DATE))
+        yield session, ids
+    finally:
+        session.rollback()
+        session.execute(text("DELETE FROM transformed.latest_price WHERE source_id IN (SELECT id FROM metadata.source WHERE name LIKE 'test-latest%')"))
+        for table in ("source", "product", "location"):
+            session.execute(text(f"DELETE FROM metadata.{table} WHERE name LIKE 'test-latest%'"))
+        session.commit()
+        session.close()
+
+
+def snapshot(ids: dict, price: int, source_date: date) -> dict:
+    return {
+        "source_id": ids["source"],
+        "product_id": ids["product"],
+        "location_id": ids["location"],
+        "quantity": None,
+        "unit_id": None,
+        "price_usd": price,
+        "source_date": source_date,
+        "standard_data_id": None,
+    }
+
+
+def upsert(session, *snapshots: dict) -> int:
+    return StandardizedPriceWriter(df=pd.DataFrame(), source_name="test-latest", session=session).upsert_latest_prices(list(snapshots))
+
+
+def stored(session, ids: dict) -> list:
+    return session.execute(text(
+        "SELECT price_usd, source_date FROM transformed.latest_price "
+        "WHERE source_id = :source AND product_id = :product AND location_id = :location"
+    ), ids).all()
+
+
+def test_newer_price_replaces_the_snapshot(key):
+    session, ids = key
+    assert upsert(session, snapshot(ids, 120, date(2025, 3, 11))) == 1
+    assert stored(session, ids) == [(Decimal("120.0000"), date(2025, 3, 11))]
+
+
+def test_older_price_is_ignored(key):
+    session, ids = key
+    # A late backfill does not overwrite a fresher price
+    upsert(session, snapshot(ids, 80, date(2025, 3, 9)))
+    assert stored(session, ids) == [(Decimal("100.0000"), STORED_DATE)]
+
+
+def test_same_day_price_keeps_the_stored_one(key):
+    session, ids = key
+    upsert(session, snapshot(ids, 90, STORED_DATE))
+    assert stored(session, ids) == [(Decimal("100.0000"), STORED_DATE)]
+
+
+def test_new_key_is_inserted(key):
+    session, ids = key
+    other = {**ids, "location": session.execute(text("INSERT INTO metadata.location (name) VALUES ('test-latest-other') RETURNING id")).scalar()}
+    session.commit()
+    assert upsert(session, snapshot(other, 70, date(2025, 1, 1)), snapshot(ids, 110, date(2025, 3, 12))) == 2
+    assert stored(session, other) == [(Decimal("70.0000"), date(2025, 1, 1))]
+    assert stored(session, ids) == [(Decimal("110.0000"), date(2025, 3, 12))]
+
+
+def test_nothing_to_upsert(key):
+    session, _ = key
+    assert upsert(session) == 0
@@ -0,0 +1,105 @@
+import asyncio
+
+from api_server.app.data.service import get_all_input_data
+from api_server.core.metadata_cache import MetadataCache
+
+
+def config_row(config_id: int) -> dict:
+    return {
+        "id": config_id,
+        "source_id": 1,
+        "source_url": f"https://example.test/{config_id}",
+        "product_id": 1,
+        "upload_on_pr": True,
+        "input_currency_id": 1,
+        "input_unit_id": 1,
+        "expected_unit_id": 1,
+        "input_quantity": 1.0,
+        "location_id": 1,
+        "last_update": None,
+    }
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return [dict(row) for row in self.rows]
+
+
+class FakeDb:
+    """Serves the cached tables by name; `on_load` runs while a table is being read."""
+
+    def __init__(self, tables: dict):
+        self.tables = tables
+        self.on_load = {}
+
+    async def execute(self, query):
+        table = query.selected_columns[0].table.name
+        name = "input_config" if table == "products_input_data" else table
+        rows = list(self.tables.get(name, []))
+        hook = self.on_load.pop(name, None)
+        if hook is not None:
+            hook()
+        return FakeResult(rows)
+
+
+def test_load_raced_by_an_invalidation_is_not_kept():
+    cache = MetadataCache()
+    db = FakeDb({"source": [{"id": 1, "name": "old"}]})
+
+    def notify():
+        cache.invalidate("source")
+        db.tables["source"] = [{"id": 1, "name": "new"}]
+
+    db.on_load["source"] = notify
+
+    async def scenario():
+        raced = await cache.snapshot(db, "source")
+        return raced, await cache.id_of(db, "source", "new"), await cache.id_of(db, "source", "old")
+
+    raced, new, old = asyncio.run(scenario())
+    # The caller still gets the load it asked for, consistent in itself
+    assert raced.rows == {1: {"id": 1, "name": "old"}} and raced.by_name == {"old": 1}
+    assert new == 1 and old is None
+    assert cache.loads == 2
+
+
+def test_snapshot_ids_after():
+    cache = MetadataCache()
+    db = FakeDb({"input_config": [config_row(i) for i in (5, 1, 3)]})
+    configs = asyncio.run(cache.snapshot(db, "input_config"))
+    assert configs.ids == [1, 3, 5]
+    assert configs.ids_after(None) == [1, 3, 5] and configs.ids_after(1) == [3, 5] and configs.ids_after(5) == []
+
+
+def test_input_data_page_survives_a_notify_between_tables(monkeypatch):
+    cache = MetadataCache()
+    monkeypatch.setattr("api_server.app.data.service.metadata_cache", cache)
+    dimensions = {
+        "source": [{"id": 1, "name": "sunsirs"}],
+        "product": [{"id": 1, "name": "urea"}],
+        "location": [{"id": 1, "name": "China", "region": "Asia"}],
+        "unit": [{"id": 1, "code": "t", "description": "tonne"}],
+        "currency": [{"id": 1, "code": "CNY", "name": "Yuan"}],
+    }
+    db = FakeDb({"input_config": [config_row(1), config_row(2)], **dimensions})
+
+    def notify():
+        # A config is added while the page reads the dimension tables
+        cache.invalidate("input_config")
+        db.tables["input_config"] = [config_row(1), config_row(2), config_row(3)]
+
+    db.on_load["product"] = notify
+
+    page = asyncio.run(get_all_input_data(db, fields=["source", "product"]))
+    assert page == {
+        "items": [{"id": 1, "source": "sunsirs", "product": "urea"}, {"id": 2, "source": "sunsirs", "product": "urea"}],
+        "next_cursor": None,
+    }
+    page = asyncio.run(get_all_input_data(db, after_id=2, fields=["source"]))
+    assert page == {"items": [{"id": 3, "source": "sunsirs"}], "next_cursor": None}
@@ -0,0 +1,102 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from api_server.app.data.service import get_price_series
+from api_server.core.database import dispose_async_engine, run_in_session
+
+# Price of each day from 2025-01-01 on: neither sorted nor the extreme on the last day of a bucket
+PRICES = [5, 3, 8, 1, 9, 2, 7, 4, 10, 6]
+FIRST_DAY = date(2025, 1, 1)
+
+
+@pytest.fixture
+def series(database):
+    """Ten daily prices of one product and location, inserted newest first."""
+    session = database.get_session()
+    try:
+        ids = {
+            table: session.execute(text(f"INSERT INTO metadata.{table} (name) VALUES ('test-series') RETURNING id")).scalar()
+            for table in ("source", "product", "location")
+        }
+        for day in reversed(range(len(PRICES))):
+            session.execute(text(
+                "INSERT INTO transformed.products_standard_data (source_id, product_id, location_id, price_usd, source_date) "
+                "VALUES (:source, :product, :location, :price, :day)"
+            ), {**ids, "price": PRICES[day], "day": FIRST_DAY + timedelta(days=day)})
+        session.commit()
+        yield ids
+    finally:
+        session.rollback()
+        session.execute(text("DELETE FROM transformed.products_standard_data WHERE source_id IN (SELECT id FROM metadata.source WHERE name = 'test-series')"))
+        for table in ("source", "product", "location"):
+            session.execute(text(f"DELETE FROM metadata.{table} WHERE name = 'test-series'"))
+        session.commit()
+        session.close()
+
+
+def fetch(series: dict, start_date: date = FIRST_DAY, end_date: date = date(2025, 1, 10), **options) -> list:
+    async def scenario():
+        try:
+            return await run_in_session(lambda db: get_price_series(
+                db, product_ids=[series["product"]], start_date=start_date, end_date=end_date, source_id=series["source"], **options
+            ))
+        finally:
+            await dispose_async_engine()
+
+    (result,) = asyncio.run(scenario())
+    assert (result["product_id"], result["location_id"]) == (series["product"], series["location"])
+    return result["points"]
+
+
+def point(bucket: date, days: range) -> dict:
+    prices = [PRICES[day] for day in days]
+    return {
+        "date": bucket,
+        "min": min(prices),
+        "max": max(prices),
+        "avg": sum(prices) / len(prices),
+        # The price of the latest day of the bucket, whatever the insertion order
+        "last": prices[-1],
+        "count": len(prices),
+    }
+
+
+def test_daily_points(series):
+    assert fetch(series) == [point(FIRST_DAY + timedelta(days=day), range(day, day + 1)) for day in range(10)]
+
+
+def test_max_points_buckets_are_anchored_at_start_date(series):
+    # Ten days in at most three points: buckets of four days, the last one partial
+    assert fetch(series, max_points=3) == [
+        point(date(2025, 1, 1), range(0, 4)),
+        point(date(2025, 1, 5), range(4, 8)),
+        point(date(2025, 1, 9), range(8, 10)),
+    ]
+    # Rows outside the range are left out of the edge buckets
+    assert fetch(series, start_date=date(2025, 1, 3), end_date=date(2025, 1, 6), max_points=2) == [
+        point(date(2025, 1, 3), range(2, 4)),
+        point(date(2025, 1, 5), range(4, 6)),
+    ]
+
+
+def test_one_point_covers_the_whole_range(series):
+    assert fetch(series, max_points=1) == [point(FIRST_DAY, range(0, 10))]
+    assert fetch(series, max_points=1000) == fetch(series)
+
+
+def test_calendar_buckets(series):
+    # 2025-01-01 is a Wednesday: the first week starts before the range
+    assert fetch(series, resolution="week") == [point(date(2024, 12, 30), range(0, 5)), point(date(2025, 1, 6), range(5, 10))]
+    assert fetch(series, resolution="month") == [point(date(2025, 1, 1), range(0, 10))]
+
+
+def test_invalid_options(series):
+    with pytest.raises(ValueError, match="either"):
+        fetch(series, resolution="week", max_points=3)
+    with pytest.raises(ValueError, match="resolution"):
+        fetch(series, resolution="hour")
+    with pytest.raises(ValueError, match="before"):
+        fetch(series, start_date=date(2025, 1, 10), end_date=date(2025, 1, 1))
@@ -0,0 +1,110 @@
+import pandas as pd
+import pytest
+
+from etl_pipeline.core.loader import raw_data_store
+from etl_pipeline.core.loader.raw_data_store import RawPriceSink
+from utility.checkpoint import DONE, FAILED
+
+
+class StubWriter:
+    """Stands in for RawPriceWriter: records every save instead of touching the database."""
+
+    saves = []
+    fail = False
+
+    def __init__(self, df, source_name, session=None):
+        self.df = df
+        self.counts = {"inserted": 0, "skipped": 0, "failed": 0}
+        self.write_failed = False
+
+    def save(self):
+        StubWriter.saves.append(self.df)
+        if StubWriter.fail:
+            self.write_failed = True
+            self.counts["failed"] = len(self.df)
+            return False
+        self.counts["inserted"] = len(self.df)
+        return True
+
+
+class FakeCheckpoints:
+    def __init__(self):
+        self.marked = []
+
+    def mark(self, unit_keys, status, detail=None):
+        self.marked.append((list(unit_keys), status))
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    monkeypatch.setattr(raw_data_store, "RawPriceWriter", StubWriter)
+    StubWriter.saves, StubWriter.fail = [], False
+    return StubWriter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(raw_data_store.time, "monotonic", lambda: now[0])
+    return now
+
+
+def page(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"product": ["urea"] * rows, "price_value": ["1,000.00"] * rows})
+
+
+def test_flushes_by_rows(writer, clock):
+    checkpoints = FakeCheckpoints()
+    sink = RawPriceSink("Sunsirs ", flush_rows=10, flush_seconds=None, checkpoints=checkpoints)
+    assert sink.source_name == "sunsirs"
+    assert sink.add(["d1"], page(4)) == 0
+    assert sink.add(["d2"], page(4)) == 0 and writer.saves == []
+    # The page that crosses the threshold flushes everything buffered, itself included
+    assert sink.add(["d3"], page(4)) == 12
+    assert [len(df) for df in writer.saves] == [12]
+    assert checkpoints.marked == [(["d1", "d2", "d3"], DONE)]
+
+    assert sink.add(["d4"], page(1)) == 0
+    assert sink.close() == 1
+    assert sink.close() == 0
+    assert sink.stats() == {"flushes": 2, "rows": 13, "peak_buffered_rows": 12, "inserted": 13, "skipped": 0, "failed": 0}
+
+
+def test_flushes_by_age(writer, clock):
+    sink = RawPriceSink("sunsirs", flush_rows=1000, flush_seconds=30)
+    assert not sink.due()
+    sink.add(["d1"], page(2))
+    clock[0] += 29
+    assert not sink.due()
+    assert sink.add(["d2"], page(2)) == 0
+    clock[0] += 1
+    # Age counts from the oldest buffered page, not the latest one
+    assert sink.due()
+    assert sink.add(["d3"], page(2)) == 6
+    clock[0] += 100
+    assert not sink.due()
+
+
+def test_empty_pages_are_checkpointed_without_a_write(writer, clock):
+    checkpoints = FakeCheckpoints()
+    sink = RawPriceSink("sunsirs", flush_rows=10, checkpoints=checkpoints)
+    sink.add(["d1"], page(0))
+    assert sink.close() == 0
+    assert writer.saves == [] and sink.flushes == 0
+    assert checkpoints.marked == [(["d1"], DONE)]
+
+
+def test_failed_write_marks_the_pages_failed(writer, clock):
+    writer.fail = True
+    checkpoints = FakeCheckpoints()
+    flushed = []
+    sink = RawPriceSink("sunsirs", flush_rows=5, checkpoints=checkpoints, on_flush=lambda keys, stored: flushed.append((keys, stored)))
+    sink.add(["d1", "d2"], page(5))
+    assert checkpoints.marked == [(["d1", "d2"], FAILED)]
+    assert flushed == [(["d1", "d2"], False)]
+    assert sink.counts["failed"] == 5
+
+    writer.fail = False
+    sink.add(["d3"], page(5))
+    assert flushed[-1] == (["d3"], True)
+    assert checkpoints.marked[-1] == (["d3"], DONE)
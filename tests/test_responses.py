@@ -0,0 +1,31 @@
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from api_server.core.responses import FastJSONResponse, dumps
+
+
+def test_fast_response_matches_the_stdlib_encoding():
+    rows = [
+        {"price_usd": Decimal("1234.5600"), "source_date": date(2025, 4, 1), "last_update": datetime(2025, 4, 1, 8, 30), "location_id": None},
+        {"price_usd": Decimal("0.0100"), "source_date": date(2025, 4, 2), "last_update": datetime(2025, 4, 2, 8, 30, 15, 250000), "location_id": 3},
+    ]
+    assert json.loads(FastJSONResponse(rows).body) == json.loads(json.dumps(jsonable_encoder(rows)))
+
+
+def test_dumps_handles_rows_and_models():
+    Row = namedtuple("Row", ["id", "price_usd"])
+
+    class Item(BaseModel):
+        id: int
+
+    assert json.loads(dumps([Row(1, Decimal("2.5")), Item(id=2), {3: "int key"}])) == [
+        {"id": 1, "price_usd": 2.5}, {"id": 2}, {"3": "int key"},
+    ]
+    with pytest.raises(TypeError):
+        dumps(object())
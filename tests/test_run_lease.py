@@ -0,0 +1,64 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from utility.run_lease import acquire_lease, release_lease, run_lease
+
+SOURCE = "test-lease"
+APRIL = (date(2025, 4, 1), date(2025, 4, 7))
+
+
+@pytest.fixture
+def leases(database):
+    yield
+    session = database.get_session()
+    session.execute(text("DELETE FROM metadata.run_lease WHERE source = :source"), {"source": SOURCE})
+    session.commit()
+    session.close()
+
+
+def test_active_lease_blocks_overlapping_slices(leases):
+    lease_id = acquire_lease(SOURCE, "extract", *APRIL)
+    assert lease_id is not None
+    assert acquire_lease(SOURCE, "extract", date(2025, 4, 7), date(2025, 4, 9)) is None
+    assert acquire_lease(SOURCE, "extract", None, None) is None
+    assert acquire_lease(SOURCE, "transform", *APRIL) is not None
+    other = acquire_lease(SOURCE, "extract", date(2025, 4, 8), date(2025, 4, 9))
+    assert other is not None
+
+    release_lease(lease_id)
+    release_lease(other)
+    # Released without completing: the next run may take the slice
+    assert acquire_lease(SOURCE, "extract", *APRIL) is not None
+
+
+def test_completed_slice_keeps_blocking(leases):
+    with run_lease(SOURCE, "extract", *APRIL) as lease:
+        assert lease
+        lease.complete()
+
+    with run_lease(SOURCE, "extract", *APRIL) as again:
+        assert not again
+    assert acquire_lease(SOURCE, "extract", date(2025, 4, 2), date(2025, 4, 3)) is None
+    # Dates outside the completed slice, open-ended slices and reruns are not blocked
+    for range_start, range_end, rerun in (
+        (date(2025, 4, 5), date(2025, 4, 10), False),
+        (None, None, False),
+        (*APRIL, True),
+    ):
+        lease_id = acquire_lease(SOURCE, "extract", range_start, range_end, rerun=rerun)
+        assert lease_id is not None
+        release_lease(lease_id)
+
+
+def test_failed_block_does_not_complete(leases):
+    with pytest.raises(RuntimeError):
+        with run_lease(SOURCE, "extract", *APRIL) as lease:
+            lease.complete()
+            raise RuntimeError("extraction failed")
+    with run_lease(SOURCE, "extract", *APRIL) as lease:
+        assert lease
+    # Not completed either: the block never called complete()
+    with run_lease(SOURCE, "extract", *APRIL) as lease:
+        assert lease
@@ -0,0 +1,197 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import httpx
+import pandas as pd
+import pytest
+from swiftshadow.models import Proxy
+
+from etl_pipeline.core import runner as runner_module
+from etl_pipeline.core.extract.host_limiter import ERROR, OK, THROTTLED, host_limiter
+from etl_pipeline.core.runner import PipelineRunner, outcome_for_transport_error
+
+
+class FakeExtractor:
+    source_name = "test"
+    session = None
+    spec = {"headers": {}}
+
+    def __init__(self, pages: int):
+        self.pages = pages
+
+    def plan_targets(self, start_date, end_date):
+        return [(start_date + timedelta(days=i), f"https://example.test/{i}") for i in range(self.pages)]
+
+    def unit_key(self, date):
+        return date.strftime("%Y-%m-%d")
+
+    def get_proxy_interface(self):
+        raise AssertionError("the proxy pool must not be used without use_proxy")
+
+
+class ProxiedExtractor(FakeExtractor):
+    class ProxyPool:
+        proxies = [Proxy(ip="10.0.0.1", protocol="https", port=8080), Proxy(ip="10.0.0.2", protocol="http", port=3128)]
+
+    def get_proxy_interface(self):
+        return self.ProxyPool()
+
+
+class FakeCheckpoints:
+    def __init__(self):
+        self.marked = []
+
+    def mark(self, keys, status, note=None):
+        self.marked.append((keys, status))
+
+
+def parse_page(html_content, target_date, spec):
+    return pd.DataFrame({"price": [1.0], "date": [target_date]})
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(runner_module, "ProcessPoolExecutor", lambda max_workers, mp_context: ThreadPoolExecutor(max_workers))
+    monkeypatch.setattr(runner_module, "parse_table_page", parse_page)
+
+    def build(pages: int) -> PipelineRunner:
+        runner = PipelineRunner(FakeExtractor(pages), workers=2, parse_workers=1, queue_size=1, use_proxy=False)
+        runner.checkpoints = FakeCheckpoints()
+
+        async def fetch(url):
+            return b"<html></html>"
+
+        runner._fetch = fetch
+        return runner
+
+    return build
+
+
+def test_run_drains_every_stage(pipeline):
+    runner = pipeline(pages=5)
+    added = []
+    runner.sink.add = lambda keys, df: added.extend(keys) or len(df)
+    runner.sink.close = lambda: 0
+
+    report = asyncio.run(runner.run(datetime(2025, 1, 1), datetime(2025, 1, 5)))
+
+    assert report["pages"] == 5 and report["remaining_pages"] == 0
+    assert sorted(added) == [f"2025-01-0{day}" for day in range(1, 6)]
+
+
+def test_writer_failure_stops_the_run(pipeline):
+    # With a dead writer and queues of one item the producer would block on fetch_q.put forever
+    runner = pipeline(pages=50)
+
+    def add(keys, df):
+        raise RuntimeError("database is gone")
+
+    runner.sink.add = add
+
+    async def scenario():
+        return await asyncio.wait_for(runner.run(datetime(2025, 1, 1), datetime(2025, 2, 19)), timeout=10)
+
+    with pytest.raises(RuntimeError, match="database is gone"):
+        asyncio.run(scenario())
+
+
+def test_run_through_the_proxy_pool(monkeypatch):
+    monkeypatch.setattr(runner_module, "ProcessPoolExecutor", lambda max_workers, mp_context: ThreadPoolExecutor(max_workers))
+    monkeypatch.setattr(runner_module, "parse_table_page", parse_page)
+    proxies = []
+    real_client = httpx.AsyncClient
+
+    def client(proxy=None, **kwargs):
+        # Built for real first, so a proxy URL httpx refuses fails the test like it fails a run
+        real_client(proxy=proxy, **kwargs)
+        proxies.append(proxy)
+        return real_client(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=b"<html></html>")))
+
+    monkeypatch.setattr(runner_module.httpx, "AsyncClient", client)
+    runner = PipelineRunner(ProxiedExtractor(4), workers=2, parse_workers=1, use_proxy=True)
+    runner.checkpoints = FakeCheckpoints()
+    added = []
+    runner.sink.add = lambda keys, df: added.extend(keys) or len(df)
+    runner.sink.close = lambda: 0
+
+    report = asyncio.run(runner.run(datetime(2025, 1, 1), datetime(2025, 1, 4)))
+
+    assert runner._proxies == ["http://10.0.0.1:8080", "http://10.0.0.2:3128"]
+    assert proxies and set(proxies) <= set(runner._proxies)
+    assert report["stages"]["fetch"]["items"] == 4 and report["stages"]["fetch"]["failed"] == 0
+    assert len(added) == 4 and runner.checkpoints.marked == []
+
+
+class BrokenClient:
+    def __init__(self, error: BaseException = None):
+        self.error = error
+
+    async def get(self, url):
+        if self.error is not None:
+            raise self.error
+        await asyncio.sleep(3600)
+
+
+def test_fetch_gives_the_slot_back_on_any_error():
+    runner = PipelineRunner(FakeExtractor(1), use_proxy=False)
+    runner._client = lambda proxy: BrokenClient(RuntimeError("bad proxy URL"))
+    limiter = host_limiter("https://leak.test/page")
+    errors = limiter.counts[ERROR]
+
+    with pytest.raises(RuntimeError, match="bad proxy URL"):
+        asyncio.run(runner._fetch("https://leak.test/page"))
+    assert limiter.in_flight == 0 and limiter.counts[ERROR] == errors + 1
+
+
+def test_cancelled_fetch_gives_the_slot_back():
+    runner = PipelineRunner(FakeExtractor(1), use_proxy=False)
+    runner._client = lambda proxy: BrokenClient()
+    limiter = host_limiter("https://cancel.test/page")
+
+    async def scenario():
+        task = asyncio.create_task(runner._fetch("https://cancel.test/page"))
+        await asyncio.sleep(0.01)
+        assert limiter.in_flight == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert limiter.in_flight == 0
+
+
+def test_transport_error_outcomes():
+    assert outcome_for_transport_error(httpx.ProxyError("tunnel refused"), proxied=True) == ERROR
+    assert outcome_for_transport_error(httpx.ConnectError("proxy unreachable"), proxied=True) == ERROR
+    assert outcome_for_transport_error(httpx.ConnectTimeout("proxy unreachable"), proxied=True) == ERROR
+    # Without a proxy the connection is the host's own
+    assert outcome_for_transport_error(httpx.ConnectError("refused"), proxied=False) == THROTTLED
+    assert outcome_for_transport_error(httpx.ReadTimeout("slow host"), proxied=True) == THROTTLED
+
+
+class FlakyProxyClient:
+    def __init__(self, proxy, used):
+        self.proxy = proxy
+        self.used = used
+
+    async def get(self, url):
+        self.used.append(self.proxy)
+        if len(self.used) == 1:
+            raise httpx.ProxyError("tunnel refused")
+        return httpx.Response(200, content=b"<html></html>", request=httpx.Request("GET", url))
+
+
+def test_failing_proxy_is_an_error_and_is_rotated():
+    runner = PipelineRunner(FakeExtractor(1), use_proxy=False)
+    runner._proxies = ["http://10.0.0.1:8080", "http://10.0.0.2:3128"]
+    used = []
+    runner._client = lambda proxy: FlakyProxyClient(proxy, used)
+    limiter = host_limiter("https://proxy-failure.test/page")
+    before = dict(limiter.counts)
+
+    assert asyncio.run(runner._fetch("https://proxy-failure.test/page")) == b"<html></html>"
+    assert len(used) == 2 and used[0] != used[1]
+    assert limiter.counts[ERROR] == before[ERROR] + 1 and limiter.counts[OK] == before[OK] + 1
+    # The host was never paused for the proxy's failure
+    assert limiter.counts[THROTTLED] == before[THROTTLED] and limiter.paused_until == 0.0
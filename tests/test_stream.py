@@ -0,0 +1,156 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from api_server.app.data.service import CHANGE_FEED_SETTLE_SECONDS, decode_change_cursor, encode_change_cursor, get_price_changes
+from api_server.app.data.stream import _sse_event, stream_prices
+from api_server.core.price_feed import price_feed
+
+
+def parse_events(chunks):
+    """(cursor, row) of every price event among SSE chunks."""
+    events = []
+    for chunk in chunks:
+        lines = chunk.decode().split("\n")
+        if lines[0].startswith("id: "):
+            events.append((decode_change_cursor(lines[0][len("id: "):]), json.loads(lines[2][len("data: "):])))
+    return events
+
+
+def test_sse_event_id_is_the_change_feed_cursor():
+    # Live events carry last_update as the text the NOTIFY trigger wrote
+    event = {"id": 42, "source_id": 1, "price_usd": 10.5, "last_update": "2025-06-01T08:30:00.250000"}
+    id_line, event_line, data_line, *_ = _sse_event(event).decode().split("\n")
+    assert event_line == "event: price"
+    assert decode_change_cursor(id_line[len("id: "):]) == (datetime(2025, 6, 1, 8, 30, 0, 250000), 42)
+    assert json.loads(data_line[len("data: "):]) == event
+
+    replayed = {**event, "last_update": datetime(2025, 6, 1, 8, 30, 0, 250000)}
+    assert _sse_event(replayed).split(b"\n")[0] == id_line.encode()
+
+
+def test_sse_event_id_is_held_back_to_the_settled_point():
+    settled = datetime(2025, 6, 1, 8, 30)
+    old = {"id": 7, "last_update": "2025-06-01T08:29:59"}
+    recent = {"id": 8, "last_update": "2025-06-01T08:30:02"}
+    assert _sse_event(old, settled_before=settled).split(b"\n")[0] == _sse_event(old).split(b"\n")[0]
+    # A later commit may still carry a last_update between the settled point and this row
+    ((cursor, _),) = parse_events([_sse_event(recent, settled_before=settled)])
+    assert cursor == (settled, 0)
+
+
+@pytest.fixture
+def prices(database):
+    """Three prices of a source of their own, written an hour ago."""
+    session = database.get_session()
+    try:
+        source_id = session.execute(text("INSERT INTO metadata.source (name) VALUES ('test-feed') RETURNING id")).scalar()
+        product_id = session.execute(text("INSERT INTO metadata.product (name) VALUES ('test-feed') RETURNING id")).scalar()
+        stamp = datetime.utcnow() - timedelta(hours=1)
+        for day in range(3):
+            session.execute(text(
+                "INSERT INTO transformed.products_standard_data (source_id, product_id, price_usd, source_date, last_update) "
+                "VALUES (:source_id, :product_id, 1, DATE '2025-01-01' + :day, :stamp)"
+            ), {"source_id": source_id, "product_id": product_id, "day": day, "stamp": stamp})
+        session.commit()
+        yield {"source_id": source_id, "product_id": product_id}
+    finally:
+        session.rollback()
+        session.execute(text("DELETE FROM transformed.products_standard_data WHERE product_id IN (SELECT id FROM metadata.product WHERE name = 'test-feed')"))
+        session.execute(text("DELETE FROM metadata.source WHERE name = 'test-feed'"))
+        session.execute(text("DELETE FROM metadata.product WHERE name = 'test-feed'"))
+        session.commit()
+        session.close()
+
+
+def test_last_update_is_never_null(database, prices):
+    session = database.get_session()
+    try:
+        with pytest.raises(IntegrityError):
+            session.execute(text(
+                "INSERT INTO transformed.products_standard_data (source_id, product_id, price_usd, source_date, last_update) "
+                "VALUES (:source_id, :product_id, 1, DATE '2024-01-01', NULL)"
+            ), prices)
+    finally:
+        session.rollback()
+        session.close()
+
+
+def test_change_feed_pages_through_every_row(database, prices):
+    from api_server.core.database import AsyncSessionLocal, dispose_async_engine, get_async_engine
+
+    async def sync_all():
+        get_async_engine()
+        seen, since = [], None
+        async with AsyncSessionLocal() as db:
+            while True:
+                page = await get_price_changes(db, since=since, limit=2, source_id=prices["source_id"])
+                seen += [item["id"] for item in page["items"]]
+                since = page["next_cursor"]
+                if not page["has_more"]:
+                    break
+            again = await get_price_changes(db, since=since, limit=2, source_id=prices["source_id"])
+        await dispose_async_engine()
+        return seen, again
+
+    seen, again = asyncio.run(sync_all())
+    assert len(seen) == 3 and seen == sorted(seen)
+    assert again["items"] == [] and not again["has_more"]
+
+
+def test_reconnect_inside_the_settle_window_loses_nothing(database, prices):
+    from api_server.core.database import dispose_async_engine
+
+    insert = text(
+        "INSERT INTO transformed.products_standard_data (source_id, product_id, price_usd, source_date, last_update) "
+        "VALUES (:source_id, :product_id, 2, :source_date, :stamp) RETURNING id"
+    )
+
+    def write(source_date, stamp):
+        session = database.get_session()
+        try:
+            row_id = session.execute(insert, {**prices, "source_date": source_date, "stamp": stamp}).scalar()
+            session.commit()
+            return row_id
+        finally:
+            session.close()
+
+    def live(row_id, stamp):
+        price_feed.publish({"id": row_id, **prices, "price_usd": 2, "last_update": stamp.isoformat()})
+
+    session = database.get_session()
+    first = session.execute(
+        text("SELECT last_update, id FROM transformed.products_standard_data WHERE source_id = :source_id ORDER BY id LIMIT 1"),
+        prices,
+    ).one()
+    session.close()
+
+    async def reconnect():
+        # Committed a second before the client comes back: too fresh for the settled feed
+        just_before = write("2025-02-01", datetime.utcnow() - timedelta(seconds=1))
+        stream = stream_prices(source_ids=[prices["source_id"]], last_event_id=encode_change_cursor(*first))
+        chunks = [await stream.__anext__()]
+        # Committed after subscribing: read by the replay and queued live as well
+        during = write("2025-02-02", datetime.utcnow())
+        live(during, datetime.utcnow())
+        later = 10 ** 9
+        live(later, datetime.utcnow())
+        for _ in range(5):
+            chunks.append(await stream.__anext__())
+        await stream.aclose()
+        await dispose_async_engine()
+        return just_before, during, later, chunks
+
+    just_before, during, later, chunks = asyncio.run(reconnect())
+    events = parse_events(chunks)
+    ids = [row["id"] for _, row in events]
+    assert ids[2:] == [just_before, during, later]
+    assert len(set(ids)) == 5
+    # Ids of the unsettled rows point back far enough to replay anything committed late
+    horizon = datetime.utcnow() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+    assert all(cursor[1] == 0 and cursor[0] <= horizon for cursor, _ in events[2:])
+    assert [cursor for cursor, _ in events[:2]] == sorted(cursor for cursor, _ in events[:2]) and events[0][0] > tuple(first)
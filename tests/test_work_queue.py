@@ -0,0 +1,156 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from etl_pipeline.core.queue_worker import QueueWorker
+from utility import database
+from utility.cache import InMemoryRedis
+from utility.work_queue import WorkQueue, consume
+
+
+def make_queue(**kwargs) -> WorkQueue:
+    return WorkQueue("test", client=InMemoryRedis(), **kwargs)
+
+
+def test_enqueue_claim_ack():
+    queue = make_queue()
+    assert queue.enqueue([{"id": "a", "url": "x"}, {"id": "b"}]) == 2
+    # Planning twice does not queue a unit twice
+    assert queue.enqueue([{"id": "a"}]) == 0
+    assert queue.claim() == {"id": "a", "url": "x", "attempts": 1}
+    assert queue.stats() == {"ready": 1, "processing": 1, "dead": 0}
+    assert queue.ack("a") is True
+    assert queue.claim()["id"] == "b"
+    assert queue.claim() is None
+    assert queue.ack("b") is True
+    assert queue.stats() == {"ready": 0, "processing": 0, "dead": 0}
+    # Acked units are forgotten, so they can be queued again
+    assert queue.enqueue([{"id": "a"}]) == 1
+
+
+def test_nack_waits_for_the_retry_delay():
+    queue = make_queue(retry_delay_seconds=60)
+    queue.enqueue([{"id": "a"}])
+    queue.claim()
+    queue.nack("a", "fetch failed")
+    assert queue.requeue_expired() == 0 and queue.claim() is None
+
+    queue = make_queue(retry_delay_seconds=0)
+    queue.enqueue([{"id": "a"}])
+    queue.claim()
+    queue.nack("a", "fetch failed")
+    assert queue.requeue_expired() == 1
+    assert queue.claim() == {"id": "a", "attempts": 2}
+
+
+def test_lapsed_claim_is_requeued_once():
+    queue = make_queue(visibility_seconds=0)
+    queue.enqueue([{"id": "a"}])
+    queue.claim()
+    assert queue.requeue_expired() == 1
+    assert queue.requeue_expired() == 0
+    assert queue.stats() == {"ready": 1, "processing": 0, "dead": 0}
+    # The slow first holder acks after all: the requeued copy is dropped
+    assert queue.ack("a") is False
+    assert queue.claim() is None and queue.stats()["ready"] == 0
+
+
+def test_claim_without_lease_gets_one():
+    queue = make_queue(visibility_seconds=60)
+    queue.enqueue([{"id": "a"}])
+    # A worker that died between LMOVE and ZADD
+    queue.client.lmove(queue._key("ready"), queue._key("processing"), "RIGHT", "LEFT")
+    assert queue.requeue_expired() == 0
+    assert queue.client.zscore(queue._key("leases"), "a") is not None
+    assert queue.stats() == {"ready": 0, "processing": 1, "dead": 0}
+
+
+def test_dead_letter_after_max_attempts():
+    queue = make_queue(visibility_seconds=0, max_attempts=2, retry_delay_seconds=0)
+    queue.enqueue([{"id": "a", "url": "x"}])
+    queue.claim()
+    queue.nack("a", "HTTP 500")
+    queue.requeue_expired()
+    assert queue.claim()["attempts"] == 2
+    assert queue.requeue_expired() == 1
+    assert queue.stats() == {"ready": 0, "processing": 0, "dead": 1}
+    assert queue.dead_letters() == {"a": {"unit": {"id": "a", "url": "x"}, "attempts": 2, "error": "HTTP 500"}}
+
+
+def test_consume_threads_handle_every_unit():
+    queue = make_queue(retry_delay_seconds=0)
+    queue.enqueue([{"id": str(i)} for i in range(200)])
+    done, failed_once, lock = [], set(), threading.Lock()
+
+    def handle(unit):
+        with lock:
+            # Every tenth unit fails on its first attempt
+            if int(unit["id"]) % 10 == 0 and unit["id"] not in failed_once:
+                failed_once.add(unit["id"])
+                raise RuntimeError("flaky")
+            done.append(unit["id"])
+        queue.ack(unit["id"])
+
+    with ThreadPoolExecutor(4) as pool:
+        handled = sum(pool.map(lambda _: consume(queue, handle, drain=True, idle_seconds=0.01, reap_seconds=0), range(4)))
+
+    assert handled == 220
+    assert sorted(done, key=int) == [str(i) for i in range(200)]
+    assert queue.stats() == {"ready": 0, "processing": 0, "dead": 0}
+
+
+def test_consume_calls_before_claim_and_on_idle():
+    queue = make_queue()
+    queue.enqueue([{"id": "a"}, {"id": "b"}])
+    calls = []
+
+    def handle(unit):
+        calls.append(unit["id"])
+        queue.ack(unit["id"])
+
+    consume(
+        queue,
+        handle,
+        on_idle=lambda: calls.append("idle"),
+        before_claim=lambda: calls.append("before"),
+        drain=True,
+        idle_seconds=0,
+    )
+    assert calls == ["before", "a", "before", "b", "before", "idle"]
+
+
+class FakeSink:
+    def __init__(self, due: bool):
+        self._due = due
+        self.flushes = 0
+
+    def due(self) -> bool:
+        return self._due
+
+    def flush(self) -> int:
+        self.flushes += 1
+        return 0
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    """A QueueWorker whose lazy database session never connects."""
+    monkeypatch.setenv("PR_DATABASE_URL", "postgresql://user@localhost/unused")
+    database.dispose_engine()
+    instance = QueueWorker(make_queue(), flush_seconds=30)
+    yield instance
+    instance.session.close()
+    database.dispose_engine()
+
+
+def test_worker_flushes_due_sinks_before_claiming(worker):
+    due, idle = FakeSink(due=True), FakeSink(due=False)
+    worker._sources = {"due": (None, due), "idle": (None, idle)}
+    worker.flush_due()
+    assert due.flushes == 1 and idle.flushes == 0
+
+
+def test_worker_flush_must_beat_the_visibility_timeout():
+    with pytest.raises(ValueError, match="visibility"):
+        QueueWorker(make_queue(visibility_seconds=30), flush_seconds=30)
@@ -0,0 +1,303 @@
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from decouple import config
+
+from utility.logger import get_logger
+
+logger = get_logger()
+
+REDIS_URL = config("REDIS_URL", default="redis://redis:6379/0")
+CACHE_ENABLED = config("PR_CACHE_ENABLED", default=True, cast=bool)
+CACHE_TTL = config("PR_CACHE_TTL", default=300, cast=int)
+
+# Generation counters: cached keys embed the current generation, so bumping it
+# invalidates every dependent entry without scanning Redis.
+GLOBAL_GENERATION_KEY = "pr:cache:gen:all"
+SOURCE_GENERATION_KEY = "pr:cache:gen:source:{source_id}"
+HITS_KEY = "pr:cache:stats:hits"
+MISSES_KEY = "pr:cache:stats:misses"
+
+
+def _encode(value) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class InMemoryRedis:
+    """
+    In-process stand-in for the subset of Redis commands the cache and the work queue use.
+    Useful for local runs and tests without a Redis server:
+        set_redis(InMemoryRedis())
+    or REDIS_URL=memory:// (state is then private to the process).
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expiry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _alive(self, key: str) -> bool:
+        expires = self._expiry.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._data
+
+    def get(self, key: str):
+        with self._lock:
+            return self._data[key] if self._alive(key) else None
+
+    def mget(self, keys):
+        with self._lock:
+            return [self._data[key] if self._alive(key) else None for key in keys]
+
+    def set(self, key: str, value, ex: Optional[int] = None):
+        with self._lock:
+            self._data[key] = value if isinstance(value, bytes) else str(value).encode()
+            if ex:
+                self._expiry[key] = time.monotonic() + ex
+            else:
+                self._expiry.pop(key, None)
+            return True
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            value = int(self._data[key]) + amount if self._alive(key) else amount
+            self._data[key] = str(value).encode()
+            return value
+
+    def delete(self, *keys) -> int:
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._alive(key):
+                    del self._data[key]
+                    self._expiry.pop(key, None)
+                    removed += 1
+            return removed
+
+    def _container(self, key: str, factory):
+        """The list / hash / sorted set stored at `key`, created when missing."""
+        if not self._alive(key):
+            self._data[key] = factory()
+        return self._data[key]
+
+    # Lists
+
+    def lpush(self, key: str, *values) -> int:
+        with self._lock:
+            items = self._container(key, list)
+            for value in values:
+                items.insert(0, _encode(value))
+            return len(items)
+
+    def rpush(self, key: str, *values) -> int:
+        with self._lock:
+            items = self._container(key, list)
+            items.extend(_encode(value) for value in values)
+            return len(items)
+
+    def lmove(self, first_list: str, second_list: str, src: str = "LEFT", dest: str = "RIGHT"):
+        with self._lock:
+            items = self._container(first_list, list)
+            if not items:
+                return None
+            value = items.pop(0 if src == "LEFT" else -1)
+            target = self._container(second_list, list)
+            target.insert(0 if dest == "LEFT" else len(target), value)
+            return value
+
+    def lrem(self, key: str, count: int, value) -> int:
+        # Only count >= 0 (from the head) is supported
+        with self._lock:
+            items = self._container(key, list)
+            value, removed = _encode(value), 0
+            while value in items and (count == 0 or removed < count):
+                items.remove(value)
+                removed += 1
+            return removed
+
+    def llen(self, key: str) -> int:
+        with self._lock:
+            return len(self._container(key, list))
+
+    def lrange(self, key: str, start: int, end: int) -> list:
+        with self._lock:
+            items = self._container(key, list)
+            return list(items[start:None if end == -1 else end + 1])
+
+    # Hashes
+
+    def hset(self, key: str, field=None, value=None, mapping: Optional[dict] = None) -> int:
+        with self._lock:
+            fields = self._container(key, dict)
+            items = dict(mapping or {})
+            if field is not None:
+                items[field] = value
+            added = 0
+            for name, item in items.items():
+                added += _encode(name) not in fields
+                fields[_encode(name)] = _encode(item)
+            return added
+
+    def hsetnx(self, key: str, field, value) -> int:
+        with self._lock:
+            fields = self._container(key, dict)
+            if _encode(field) in fields:
+                return 0
+            fields[_encode(field)] = _encode(value)
+            return 1
+
+    def hget(self, key: str, field):
+        with self._lock:
+            return self._container(key, dict).get(_encode(field))
+
+    def hgetall(self, key: str) -> dict:
+        with self._lock:
+            return dict(self._container(key, dict))
+
+    def hincrby(self, key: str, field, amount: int = 1) -> int:
+        with self._lock:
+            fields = self._container(key, dict)
+            value = int(fields.get(_encode(field), 0)) + amount
+            fields[_encode(field)] = str(value).encode()
+            return value
+
+    def hdel(self, key: str, *fields) -> int:
+        with self._lock:
+            items = self._container(key, dict)
+            return sum(items.pop(_encode(field), None) is not None for field in fields)
+
+    def hlen(self, key: str) -> int:
+        with self._lock:
+            return len(self._container(key, dict))
+
+    # Sorted sets
+
+    def zadd(self, key: str, mapping: dict, nx: bool = False, xx: bool = False) -> int:
+        with self._lock:
+            scores = self._container(key, dict)
+            added = 0
+            for member, score in mapping.items():
+                member = _encode(member)
+                if (nx and member in scores) or (xx and member not in scores):
+                    continue
+                added += member not in scores
+                scores[member] = float(score)
+            return added
+
+    def zrem(self, key: str, *members) -> int:
+        with self._lock:
+            scores = self._container(key, dict)
+            return sum(scores.pop(_encode(member), None) is not None for member in members)
+
+    def zscore(self, key: str, member) -> Optional[float]:
+        with self._lock:
+            return self._container(key, dict).get(_encode(member))
+
+    def zrangebyscore(self, key: str, min, max, start: Optional[int] = None, num: Optional[int] = None) -> list:
+        with self._lock:
+            low, high = float(min), float(max)
+            members = sorted(
+                (score, member) for member, score in self._container(key, dict).items() if low <= score <= high
+            )
+            members = [member for _, member in members]
+            if start is not None and num is not None:
+                members = members[start:start + num]
+            return members
+
+    def zcard(self, key: str) -> int:
+        with self._lock:
+            return len(self._container(key, dict))
+
+
+class AsyncInMemoryRedis:
+    """Async facade over an `InMemoryRedis`, so the API and ETL can share one stand-in store."""
+
+    def __init__(self, store: Optional[InMemoryRedis] = None):
+        self.store = store or InMemoryRedis()
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def mget(self, keys):
+        return self.store.mget(keys)
+
+    async def set(self, key, value, ex=None):
+        return self.store.set(key, value, ex=ex)
+
+    async def incr(self, key, amount=1):
+        return self.store.incr(key, amount)
+
+    async def delete(self, *keys):
+        return self.store.delete(*keys)
+
+
+_redis = None
+_async_redis = None
+
+
+def set_redis(client) -> None:
+    """Replace the Redis clients, i.e. with an `InMemoryRedis` in tests or local runs."""
+    global _redis, _async_redis
+    _redis = client
+    _async_redis = AsyncInMemoryRedis(client) if isinstance(client, InMemoryRedis) else None
+
+
+def get_redis():
+    """Synchronous Redis client used by the ETL side, created lazily."""
+    global _redis
+    if _redis is None:
+        if REDIS_URL.startswith("memory://"):
+            set_redis(InMemoryRedis())
+        else:
+            import redis
+
+            _redis = redis.Redis.from_url(REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+    return _redis
+
+
+def get_async_redis():
+    """Asyncio Redis client used by the API, created lazily."""
+    global _async_redis
+    if _async_redis is None and REDIS_URL.startswith("memory://"):
+        get_redis()
+    if _async_redis is None:
+        import redis.asyncio
+
+        _async_redis = redis.asyncio.Redis.from_url(REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+    return _async_redis
+
+
+def generation_key(source_id: Optional[int] = None) -> str:
+    return SOURCE_GENERATION_KEY.format(source_id=source_id) if source_id is not None else GLOBAL_GENERATION_KEY
+
+
+def invalidate_source(source_id: Optional[int] = None) -> bool:
+    """
+    Invalidate cached API responses after new data was committed for a source.
+    Bumps the source generation and the global one (unscoped queries may include the source).
+    Never raises: a missing cache must not fail an ETL run.
+    """
+    return invalidate_sources([source_id] if source_id is not None else [])
+
+
+def invalidate_sources(source_ids: Iterable[int]) -> bool:
+    """
+    `invalidate_source` for several sources at once, i.e. after an edit of shared metadata
+    (a product or unit name) that shows up in the responses of every source.
+    """
+    if not CACHE_ENABLED:
+        return False
+    source_ids = list(source_ids)
+    try:
+        client = get_redis()
+        for source_id in source_ids:
+            client.incr(generation_key(source_id))
+        client.incr(GLOBAL_GENERATION_KEY)
+        logger.info(f"Invalidated API cache for source_ids={source_ids}")
+        return True
+    except Exception as e:
+        logger.warning(f"Could not invalidate API cache for source_ids={source_ids}: {e}")
+        return False
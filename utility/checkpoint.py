@@ -0,0 +1,107 @@
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from db.models.metadata import RunCheckpoint
+from utility.database import get_session
+from utility.logger import get_logger
+
+logger = get_logger()
+
+DONE = "done"
+EMPTY = "empty"
+FAILED = "failed"
+
+
+class CheckpointStore:
+    """
+    Durable record of the units of work (a date, a currency pair window, ...) a source has
+    completed. Checkpoints are written in their own session and committed immediately, so
+    they survive the run's transaction being rolled back or the process dying.
+    Only `done` units are skipped on resume; `empty` and `failed` ones are retried.
+
+    Example:
+        checkpoints = CheckpointStore("sunsirs")
+        pending = checkpoints.pending(["2025-04-01", "2025-04-02"])
+        ...
+        checkpoints.mark(["2025-04-01"], DONE)
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+
+    def completed(self, unit_keys: Optional[Iterable[str]] = None) -> Set[str]:
+        """Keys already done, optionally restricted to `unit_keys`."""
+        session = get_session()
+        try:
+            query = session.query(RunCheckpoint.unit_key).filter(
+                RunCheckpoint.source == self.source, RunCheckpoint.status == DONE
+            )
+            if unit_keys is not None:
+                query = query.filter(RunCheckpoint.unit_key.in_(list(unit_keys)))
+            return {key for (key,) in query.all()}
+        finally:
+            session.close()
+
+    def pending(self, unit_keys: List[str]) -> List[str]:
+        """`unit_keys` minus the completed ones, in their original order."""
+        done = self.completed(unit_keys)
+        if done:
+            logger.info(f"Resuming {self.source}: {len(done)} of {len(unit_keys)} units already done.")
+        return [key for key in unit_keys if key not in done]
+
+    def mark(self, unit_keys: Iterable[str], status: str, detail: Optional[str] = None) -> None:
+        """Upsert the status of units, counting one more attempt for each."""
+        rows = [{"source": self.source, "unit_key": key, "status": status, "attempts": 1, "detail": detail} for key in unit_keys]
+        if not rows:
+            return
+        session = get_session()
+        try:
+            stmt = insert(RunCheckpoint.__table__).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_checkpoint_source_unit",
+                set_={
+                    "status": stmt.excluded.status,
+                    "attempts": RunCheckpoint.__table__.c.attempts + 1,
+                    "detail": stmt.excluded.detail,
+                    "last_update": stmt.excluded.last_update,
+                },
+            )
+            session.execute(stmt)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error writing checkpoints for {self.source}: {str(e)}")
+        finally:
+            session.close()
+
+    def summary(self) -> Dict[str, int]:
+        session = get_session()
+        try:
+            rows = (
+                session.query(RunCheckpoint.status, func.count())
+                .filter(RunCheckpoint.source == self.source)
+                .group_by(RunCheckpoint.status)
+                .all()
+            )
+            return dict(rows)
+        finally:
+            session.close()
+
+
+class WallClockBudget:
+    """Stop signal for runs limited to `seconds` of wall-clock time (None: unlimited)."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.started = time.monotonic()
+
+    def exhausted(self) -> bool:
+        return self.seconds is not None and time.monotonic() - self.started >= self.seconds
+
+    def remaining(self) -> Optional[float]:
+        if self.seconds is None:
+            return None
+        return max(0.0, self.seconds - (time.monotonic() - self.started))
@@ -1,30 +1,110 @@
-import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from decouple import config
 from db.models.base import Base
 
-# Read DB URL
-PR_DATABASE_URL = config("PR_DATABASE_URL")
-if not PR_DATABASE_URL:
-    raise ValueError("PR_DATABASE_URL environment variable not set")
+# Pool settings, overridable from the environment / .env
+POOL_SIZE = config("PR_DB_POOL_SIZE", default=5, cast=int)
+MAX_OVERFLOW = config("PR_DB_MAX_OVERFLOW", default=10, cast=int)
+POOL_RECYCLE = config("PR_DB_POOL_RECYCLE", default=1800, cast=int)
+POOL_TIMEOUT = config("PR_DB_POOL_TIMEOUT", default=30, cast=int)
+
+# Session factory, bound to the engine on first use
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def get_database_url() -> str:
+    """Read the ETL database URL, failing loudly when it is not configured."""
+    url = config("PR_DATABASE_URL", default=None)
+    if not url:
+        raise ValueError("PR_DATABASE_URL environment variable not set")
+    return url
+
+
+def get_engine() -> Engine:
+    """
+    Return the process-wide engine, creating it on first call.
+    Nothing connects to the database (or runs DDL) at import time; the pool is sized from
+    `PR_DB_POOL_SIZE`, `PR_DB_MAX_OVERFLOW`, `PR_DB_POOL_RECYCLE` and `PR_DB_POOL_TIMEOUT`.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    get_database_url(),
+                    echo=False,
+                    pool_pre_ping=True,
+                    pool_size=POOL_SIZE,
+                    max_overflow=MAX_OVERFLOW,
+                    pool_recycle=POOL_RECYCLE,
+                    pool_timeout=POOL_TIMEOUT,
+                )
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def dispose_engine() -> None:
+    """Close all pooled connections, i.e. at the end of a run or after forking a worker."""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
 
-# Create engine
-engine = create_engine(
-    PR_DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,
-)
 
-Base.metadata.create_all(bind=engine)
+def get_session() -> Session:
+    """Open a new session bound to the lazily created engine. The caller must close it."""
+    get_engine()
+    return SessionLocal()
+
+
+def init_db() -> None:
+    """Create any missing tables. Migrations are owned by Alembic; this is for local setups only."""
+    Base.metadata.create_all(bind=get_engine())
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Unit of work shared by every component of one run.
+    Commits when the block succeeds, rolls back on error and always closes the session.
+
+    Example:
+        with session_scope() as session:
+            SunsirsExtractor(session=session).extract()
+            SunsirsTransformer(session=session).transform()
+    """
+    session = get_session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Dependency for FastAPI
 def get_db() -> Session:
-    db = SessionLocal()
+    db = get_session()
     try:
         yield db
     finally:
         db.close()
+
+
+def __getattr__(name: str):
+    # Backwards compatible `from utility.database import engine`, resolved lazily.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
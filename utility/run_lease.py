@@ -0,0 +1,187 @@
+import socket
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional
+
+from decouple import config
+from sqlalchemy import and_, or_, text
+
+from db.models.metadata import RunLease
+from utility.database import get_session
+from utility.logger import get_logger
+
+logger = get_logger()
+
+# A crashed run's lease lapses after this long, so its slice is not blocked forever
+LEASE_TTL_SECONDS = config("PR_RUN_LEASE_TTL_SECONDS", default=6 * 60 * 60, cast=int)
+LEASE_POLL_SECONDS = 10
+
+
+def _overlapping(
+    source: str,
+    stage: str,
+    range_start: Optional[date],
+    range_end: Optional[date],
+    include_completed: bool = True,
+):
+    """
+    Filter for the leases of the source and stage that block the given date range: active
+    ones overlapping it, and completed ones covering all of it. Only bounded slices count as
+    completed; an open-ended one stands for "whatever is pending", which changes over time.
+    """
+    now = datetime.utcnow()
+    active = [RunLease.released_at.is_(None), RunLease.expires_at > now]
+    # Null bounds are open ended
+    if range_end is not None:
+        active.append(or_(RunLease.range_start.is_(None), RunLease.range_start <= range_end))
+    if range_start is not None:
+        active.append(or_(RunLease.range_end.is_(None), RunLease.range_end >= range_start))
+    blocking = and_(*active)
+    if include_completed and range_start is not None and range_end is not None:
+        blocking = or_(blocking, and_(
+            RunLease.completed_at.isnot(None),
+            RunLease.range_start <= range_start,
+            RunLease.range_end >= range_end,
+        ))
+    return and_(RunLease.source == source, RunLease.stage == stage, blocking)
+
+
+def acquire_lease(
+    source: str,
+    stage: str,
+    range_start: Optional[date] = None,
+    range_end: Optional[date] = None,
+    holder: Optional[str] = None,
+    ttl_seconds: int = LEASE_TTL_SECONDS,
+    rerun: bool = False,
+) -> Optional[int]:
+    """
+    Try to take the lease on a slice of work (source + stage + date range).
+    Acquisitions for the same source and stage are serialised with a transaction-scoped
+    advisory lock, so two runs can never both see the slice as free. A slice an earlier run
+    completed stays taken.
+    Args:
+        source (str): Source name, i.e. 'sunsirs'.
+        stage (str): Pipeline stage, i.e. 'extract' or 'transform'.
+        range_start (Optional[date]): First date of the slice, None for unbounded.
+        range_end (Optional[date]): Last date of the slice (inclusive), None for unbounded.
+        holder (Optional[str]): Who owns the lease, for diagnostics. Defaults to the hostname.
+        ttl_seconds (int): Lifetime after which an unreleased lease is ignored.
+        rerun (bool): Take the slice even if an earlier run completed it.
+    Returns:
+        Optional[int]: The lease id, or None when an overlapping lease is held by another run
+                       or the slice was completed.
+    """
+    session = get_session()
+    try:
+        session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+            {"key": f"run_lease:{source}:{stage}"},
+        )
+        held = session.query(RunLease).filter(
+            _overlapping(source, stage, range_start, range_end, include_completed=not rerun)
+        ).first()
+        if held is not None:
+            session.rollback()
+            if held.completed_at is not None:
+                logger.info(f"{source}/{stage} {range_start}..{range_end} was completed by {held.holder}, skipping.")
+            else:
+                logger.info(f"Lease on {source}/{stage} {range_start}..{range_end} is held by {held.holder}, skipping.")
+            return None
+
+        now = datetime.utcnow()
+        lease = RunLease(
+            source=source,
+            stage=stage,
+            range_start=range_start,
+            range_end=range_end,
+            holder=(holder or socket.gethostname())[:255],
+            acquired_at=now,
+            expires_at=now + timedelta(seconds=ttl_seconds),
+        )
+        session.add(lease)
+        session.commit()
+        logger.info(f"Acquired lease {lease.id} on {source}/{stage} {range_start}..{range_end}.")
+        return lease.id
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def release_lease(lease_id: int, completed: bool = False) -> None:
+    """
+    Release a lease. An incomplete slice can be taken by the next run; a `completed` one
+    keeps blocking runs of the dates it covers.
+    """
+    now = datetime.utcnow()
+    values = {RunLease.released_at: now}
+    if completed:
+        values[RunLease.completed_at] = now
+    session = get_session()
+    try:
+        session.query(RunLease).filter(RunLease.id == lease_id).update(values, synchronize_session=False)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error releasing lease {lease_id}: {str(e)}")
+    finally:
+        session.close()
+
+
+class Lease:
+    """
+    Handle of a `run_lease` block, truthy when this run owns the slice.
+    Call `complete()` once the whole slice is done so later runs skip it.
+    """
+
+    def __init__(self, lease_id: Optional[int]):
+        self.id = lease_id
+        self.completed = False
+
+    def __bool__(self) -> bool:
+        return self.id is not None
+
+    def complete(self) -> None:
+        self.completed = True
+
+
+@contextmanager
+def run_lease(
+    source: str,
+    stage: str,
+    range_start: Optional[date] = None,
+    range_end: Optional[date] = None,
+    holder: Optional[str] = None,
+    wait_seconds: float = 0,
+    ttl_seconds: int = LEASE_TTL_SECONDS,
+    rerun: bool = False,
+) -> Iterator[Lease]:
+    """
+    Hold the lease on a slice of work for the duration of the block.
+    Yields a `Lease` that is truthy when this run owns the slice and falsy when another run
+    does (after waiting up to `wait_seconds` for it to be released) or completed it already
+    (unless `rerun`). The lease is released on exit, as completed if the block called
+    `complete()` and did not raise.
+
+    Example:
+        with run_lease("sunsirs", "extract", start, end) as lease:
+            if lease:
+                SunsirsExtractor(session=session).extract(start, end)
+                lease.complete()
+    """
+    deadline = time.monotonic() + wait_seconds
+    lease_id = acquire_lease(source, stage, range_start, range_end, holder, ttl_seconds, rerun)
+    while lease_id is None and time.monotonic() < deadline:
+        time.sleep(min(LEASE_POLL_SECONDS, max(0, deadline - time.monotonic())))
+        lease_id = acquire_lease(source, stage, range_start, range_end, holder, ttl_seconds, rerun)
+    lease = Lease(lease_id)
+    succeeded = False
+    try:
+        yield lease
+        succeeded = True
+    finally:
+        if lease_id is not None:
+            release_lease(lease_id, completed=succeeded and lease.completed)
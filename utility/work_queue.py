@@ -0,0 +1,221 @@
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from decouple import config
+
+from utility.cache import get_redis
+from utility.logger import get_logger
+
+logger = get_logger()
+
+# A claimed unit that is neither acked nor nacked within this long is handed to another worker
+QUEUE_VISIBILITY_SECONDS = config("PR_QUEUE_VISIBILITY_SECONDS", default=300, cast=int)
+# Claims per unit before it is moved to the dead letters
+QUEUE_MAX_ATTEMPTS = config("PR_QUEUE_MAX_ATTEMPTS", default=3, cast=int)
+# A nacked unit becomes claimable again after this long
+QUEUE_RETRY_DELAY_SECONDS = config("PR_QUEUE_RETRY_DELAY_SECONDS", default=30, cast=int)
+# How often each worker looks for expired claims
+QUEUE_REAP_SECONDS = 10
+
+QUEUE_KEY = "pr:queue:{name}:{part}"
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class WorkQueue:
+    """
+    At-least-once work queue on Redis, shared by worker processes on any number of hosts.
+
+    Keys (all under pr:queue:<name>:):
+        ready       list of unit ids waiting to be claimed (FIFO)
+        processing  list of claimed unit ids
+        leases      sorted set: unit id -> time its claim lapses
+        units       hash: unit id -> JSON payload
+        attempts    hash: unit id -> number of claims
+        errors      hash: unit id -> last error
+        dead        hash: unit id -> JSON payload and error, once out of attempts
+
+    Only single-key atomic commands are used (no Lua), so the in-process `InMemoryRedis`
+    stand-in works too. A unit is claimed with LMOVE ready -> processing; LREM on
+    processing then decides which of ack / requeue gets to own it, so a unit whose claim
+    lapsed is requeued exactly once. Work must be idempotent: a slow worker may finish a
+    unit that was already handed to another one.
+    """
+
+    def __init__(
+        self,
+        name: str = "fetch",
+        client=None,
+        visibility_seconds: int = QUEUE_VISIBILITY_SECONDS,
+        max_attempts: int = QUEUE_MAX_ATTEMPTS,
+        retry_delay_seconds: int = QUEUE_RETRY_DELAY_SECONDS,
+    ):
+        self.name = name
+        self.client = client if client is not None else get_redis()
+        self.visibility_seconds = visibility_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+
+    def _key(self, part: str) -> str:
+        return QUEUE_KEY.format(name=self.name, part=part)
+
+    def enqueue(self, units: Iterable[dict]) -> int:
+        """
+        Add units, each a JSON serialisable dict with a unique "id".
+        Units already queued or claimed are left alone, so planning twice is harmless.
+        Returns:
+            int: Number of units added.
+        """
+        added = 0
+        for unit in units:
+            if self.client.hsetnx(self._key("units"), unit["id"], json.dumps(unit)):
+                self.client.lpush(self._key("ready"), unit["id"])
+                added += 1
+        return added
+
+    def claim(self) -> Optional[dict]:
+        """
+        Claim the oldest ready unit for `visibility_seconds`.
+        Returns:
+            Optional[dict]: The unit payload with its "attempts" so far, None when nothing is ready.
+        """
+        while True:
+            unit_id = self.client.lmove(self._key("ready"), self._key("processing"), "RIGHT", "LEFT")
+            if unit_id is None:
+                return None
+            self.client.zadd(self._key("leases"), {unit_id: time.time() + self.visibility_seconds})
+            attempts = self.client.hincrby(self._key("attempts"), unit_id, 1)
+            payload = self.client.hget(self._key("units"), unit_id)
+            if payload is None:
+                # Acked by an earlier holder after it had been requeued
+                self._forget(unit_id)
+                continue
+            return {**json.loads(payload), "attempts": attempts}
+
+    def ack(self, unit_id: str) -> bool:
+        """
+        Mark a unit as done and drop it.
+        Returns:
+            bool: False if the claim had lapsed and the unit was requeued in the meantime.
+        """
+        owned = self._forget(unit_id)
+        if not owned:
+            self.client.lrem(self._key("ready"), 1, unit_id)
+        return owned
+
+    def nack(self, unit_id: str, error: str) -> None:
+        """
+        Report a failed attempt. The unit stays claimed until `retry_delay_seconds` have
+        passed; it is then requeued, or moved to the dead letters once out of attempts.
+        """
+        self.client.hset(self._key("errors"), unit_id, error)
+        self.client.zadd(self._key("leases"), {unit_id: time.time() + self.retry_delay_seconds}, xx=True)
+
+    def _forget(self, unit_id) -> bool:
+        owned = self.client.lrem(self._key("processing"), 1, unit_id) == 1
+        self.client.zrem(self._key("leases"), unit_id)
+        self.client.hdel(self._key("units"), unit_id)
+        self.client.hdel(self._key("attempts"), unit_id)
+        self.client.hdel(self._key("errors"), unit_id)
+        return owned
+
+    def requeue_expired(self) -> int:
+        """
+        Requeue (or dead-letter) units whose claim lapsed; safe to run from every worker.
+        Returns:
+            int: Number of units requeued or dead-lettered.
+        """
+        now = time.time()
+        # A worker that died between LMOVE and ZADD left a claim without lease; give it one
+        for unit_id in self.client.lrange(self._key("processing"), 0, -1):
+            if self.client.zscore(self._key("leases"), unit_id) is None:
+                self.client.zadd(self._key("leases"), {unit_id: now + self.visibility_seconds}, nx=True)
+
+        moved = 0
+        for unit_id in self.client.zrangebyscore(self._key("leases"), "-inf", now):
+            self.client.zrem(self._key("leases"), unit_id)
+            if self.client.lrem(self._key("processing"), 1, unit_id) != 1:
+                # Acked, or requeued by another worker
+                continue
+            moved += 1
+            attempts = int(self.client.hget(self._key("attempts"), unit_id) or 0)
+            if attempts < self.max_attempts:
+                self.client.lpush(self._key("ready"), unit_id)
+                continue
+            error = _text(self.client.hget(self._key("errors"), unit_id) or b"claim expired")
+            payload = self.client.hget(self._key("units"), unit_id)
+            self.client.hset(self._key("dead"), unit_id, json.dumps({
+                "unit": json.loads(payload) if payload else None,
+                "attempts": attempts,
+                "error": error,
+            }))
+            self.client.hdel(self._key("units"), unit_id)
+            self.client.hdel(self._key("attempts"), unit_id)
+            self.client.hdel(self._key("errors"), unit_id)
+            logger.error(f"Unit {_text(unit_id)} of queue {self.name} dead-lettered after {attempts} attempts: {error}")
+        return moved
+
+    def dead_letters(self) -> Dict[str, dict]:
+        return {_text(unit_id): json.loads(value) for unit_id, value in self.client.hgetall(self._key("dead")).items()}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "ready": self.client.llen(self._key("ready")),
+            "processing": self.client.llen(self._key("processing")),
+            "dead": self.client.hlen(self._key("dead")),
+        }
+
+
+def consume(
+    queue: WorkQueue,
+    handle: Callable[[dict], None],
+    on_idle: Optional[Callable[[], None]] = None,
+    drain: bool = False,
+    idle_seconds: float = 2.0,
+    reap_seconds: float = QUEUE_REAP_SECONDS,
+    stop: Optional[threading.Event] = None,
+    before_claim: Optional[Callable[[], None]] = None,
+) -> int:
+    """
+    Worker loop: claim units and pass them to `handle`, which must ack or nack each one.
+    Args:
+        on_idle (Optional[Callable]): Called whenever the queue is empty, i.e. to flush
+                                      buffered work so its units get acked.
+        before_claim (Optional[Callable]): Called before every claim, i.e. to flush buffered
+                                           work that is due before its claims lapse.
+        drain (bool): Return once nothing is ready or claimed anymore, instead of waiting
+                      for new units.
+        stop (Optional[threading.Event]): Return once set.
+    Returns:
+        int: Number of units handled.
+    """
+    handled = 0
+    last_reap = 0.0
+    while stop is None or not stop.is_set():
+        if time.monotonic() - last_reap >= reap_seconds:
+            queue.requeue_expired()
+            last_reap = time.monotonic()
+        if before_claim is not None:
+            before_claim()
+        unit = queue.claim()
+        if unit is None:
+            if on_idle is not None:
+                on_idle()
+            stats = queue.stats()
+            if drain and not stats["ready"] and not stats["processing"]:
+                break
+            time.sleep(idle_seconds)
+            # Units nacked or lapsed meanwhile are due again
+            last_reap = 0.0 if stats["processing"] else last_reap
+            continue
+        try:
+            handle(unit)
+        except Exception as e:
+            logger.error(f"Error handling unit {unit['id']}: {str(e)}")
+            queue.nack(unit["id"], str(e))
+        handled += 1
+    return handled